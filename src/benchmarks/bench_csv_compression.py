@@ -0,0 +1,86 @@
+"""benchmarks.bench_csv_compression
+
+BookClockLogのCSVを非圧縮・gzip・zstd（zstandardがある場合）で保存し、
+ファイルサイズと全件の読み込み時間を比較する。
+
+Usage:
+    $ cd src && python -m benchmarks.bench_csv_compression
+"""
+#########################################################
+# Builtin packages
+#########################################################
+import os
+import tempfile
+import timeit
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookClockLog
+from repositories import CsvBaseRepository, CsvConfig
+from repositories import csv_compression
+
+ROWS = 100_000
+ROWS_PER_APPEND = 1_000
+
+
+def build_repository(base_path: str, compression: str | None) -> CsvBaseRepository:
+    """圧縮形式ごとのBookClockLog用リポジトリを作成する"""
+    suffix = f".{compression}" if compression else ""
+    return CsvBaseRepository(CsvConfig(
+        file_name=f"BookClockLogs.csv{suffix}",
+        base_path=base_path,
+        columns=["id", "book_id", "clock_start", "clock_end", "duration_min"],
+        key_map={
+            "id": "id",
+            "book_id": "book_id",
+            "clock_start": "clock_start",
+            "clock_end": "clock_end",
+            "duration_min": "duration_min"
+        },
+        model_type=BookClockLog,
+        compression=compression
+    ))
+
+
+def fill(repository: CsvBaseRepository) -> None:
+    """同期と同じくROWS_PER_APPEND件ずつ追記する"""
+    for start in range(0, ROWS, ROWS_PER_APPEND):
+        repository.add([
+            BookClockLog(id=i + 1, book_id=1 + i % 300,
+                         clock_start=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00",
+                         clock_end=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:{i % 60:02d}",
+                         duration_min=i % 60)
+            for i in range(start, start + ROWS_PER_APPEND)
+        ])
+
+
+def main():
+    """main"""
+    compressions = [None, "gzip"]
+    if csv_compression.zstandard is not None:
+        compressions.append("zstd")
+
+    with tempfile.TemporaryDirectory() as base_path:
+        results = []
+        for compression in compressions:
+            repository = build_repository(base_path, compression)
+            fill(repository)
+            assert sum(1 for _ in repository.iter_all(columns=["id"])) == ROWS
+            size = os.path.getsize(repository._path)
+            seconds = min(timeit.repeat(lambda: sum(1 for _ in repository.iter_all()), number=1, repeat=3))
+            results.append((compression or "plain", size, seconds))
+
+    plain_size = results[0][1]
+    print(f"{ROWS} rows, appended {ROWS_PER_APPEND} rows at a time")
+    for name, size, seconds in results:
+        print(f"{name:6}: {size / 1024:9.1f} KiB ({size / plain_size:6.1%}) load {seconds * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""benchmarks.bench_csv_write
+
+少量ずつの追記を繰り返したときのファイルオープン・statの回数と時間を、
+毎回ヘッダーを読み直していた以前の実装（LegacyCsvRepository）と比較する。
+
+Usage:
+    $ cd src && python -m benchmarks.bench_csv_write
+"""
+#########################################################
+# Builtin packages
+#########################################################
+import builtins
+import csv
+import os
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookClockLog
+from repositories import CsvBaseRepository, CsvConfig
+
+BATCHES = 2000
+ROWS_PER_BATCH = 5
+
+
+class LegacyCsvRepository(CsvBaseRepository):
+    """比較用: 追記のたびに_has_header()でファイルを開いてヘッダーを確認する実装"""
+
+    def add(self, data):
+        inputs = [self._adapter.from_model(model) for model in data]
+        if not self._has_header():
+            self._write_header()
+        with open(self._path, encoding="utf-8", mode="a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self._header)
+            writer.writerows(inputs)
+
+
+def build_config(base_path: str, file_name: str) -> CsvConfig:
+    """キーインデックス・キャッシュなしのBookClockLog用設定を作成する"""
+    return CsvConfig(
+        file_name=file_name,
+        base_path=base_path,
+        columns=["id", "book_id", "clock_start", "clock_end", "duration_min"],
+        key_map={
+            "id": "id",
+            "book_id": "book_id",
+            "clock_start": "clock_start",
+            "clock_end": "clock_end",
+            "duration_min": "duration_min"
+        },
+        model_type=BookClockLog
+    )
+
+
+@contextmanager
+def count_syscalls(counter: Counter):
+    """open / os.stat / os.fstat の呼び出し回数を数える"""
+    originals = {"open": builtins.open, "stat": os.stat, "fstat": os.fstat}
+
+    def wrap(name):
+        def counted(*args, **kwargs):
+            counter[name] += 1
+            return originals[name](*args, **kwargs)
+        return counted
+
+    builtins.open, os.stat, os.fstat = wrap("open"), wrap("stat"), wrap("fstat")
+    try:
+        yield counter
+    finally:
+        builtins.open, os.stat, os.fstat = originals["open"], originals["stat"], originals["fstat"]
+
+
+def measure(repository: CsvBaseRepository) -> tuple[Counter, float]:
+    """BATCHES回の追記にかかる呼び出し回数と時間（秒）を計測する"""
+    batches = [
+        [
+            BookClockLog(id=b * ROWS_PER_BATCH + i, book_id=1,
+                         clock_start="2025-04-10 10:00", clock_end="2025-04-10 10:30", duration_min=30)
+            for i in range(ROWS_PER_BATCH)
+        ]
+        for b in range(BATCHES)
+    ]
+    counter = Counter()
+    start = time.perf_counter()
+    with count_syscalls(counter):
+        for batch in batches:
+            repository.add(batch)
+    return counter, time.perf_counter() - start
+
+
+def main():
+    """main"""
+    with tempfile.TemporaryDirectory() as base_path:
+        legacy = LegacyCsvRepository(build_config(base_path, "legacy.csv"))
+        current = CsvBaseRepository(build_config(base_path, "current.csv"))
+        results = {"legacy": measure(legacy), "current": measure(current)}
+        with open(os.path.join(base_path, "legacy.csv"), mode="rb") as f:
+            legacy_bytes = f.read()
+        with open(os.path.join(base_path, "current.csv"), mode="rb") as f:
+            assert f.read() == legacy_bytes
+
+    print(f"{BATCHES} appends x {ROWS_PER_BATCH} rows")
+    for name, (counter, seconds) in results.items():
+        print(f"{name:8}: open={counter['open']:5d} stat={counter['stat']:5d} "
+              f"fstat={counter['fstat']:5d} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""benchmarks.bench_org_reader
+
+本のノード1件あたりの抽出時間を、以前の実装（LegacyOrgReader）と比較する。
+
+Usage:
+    $ cd src && python -m benchmarks.bench_org_reader
+"""
+#########################################################
+# Builtin packages
+#########################################################
+import timeit
+from datetime import datetime
+
+#########################################################
+# 3rd party packages
+#########################################################
+import orgparse
+
+#########################################################
+# Own packages
+#########################################################
+from repositories.org import OrgReader
+
+NODE_TEMPLATE = """* DONE 本{index} :book:
+  CLOSED: [2025-04-12 Sat 21:00] SCHEDULED: <2025-04-10 Thu> DEADLINE: <2025-04-20 Sun>
+  :PROPERTIES:
+  :Effort:   3:00
+  :END:
+  CREATED_AT: [2025-04-10 Thu 10:00]
+  :LOGBOOK:
+  - State "DONE"       from "READING"    [2025-04-12 Sat 21:00]
+  - State "READING"    from "TODO"       [2025-04-11 Fri 09:00]
+{clocks}  :END:
+** URL
+   https://example.com/book/{index}
+** Notes
+   メモ
+"""
+CLOCK_LINE = "  CLOCK: [2025-04-{day:02d} Fri 10:00]--[2025-04-{day:02d} Fri 10:30] =>  0:30\n"
+
+
+class LegacyOrgReader(OrgReader):
+    """比較用: 単一パス化する前の抽出処理"""
+
+    def _parse_book_node(self, node):
+        return {
+            "title": node.heading.strip(),
+            "effort": node.get_property("Effort"),
+            "created_at": self._extract_created_at(node),
+            "ended_at": self._format_datetime(node.closed.start),
+            "scheduled_at": self._format_datetime(node.scheduled.start),
+            "deadline_at": self._format_datetime(node.deadline.start),
+            "url": self._extract_child_body(node, "URL"),
+            "tags": ":".join(node.tags) if node.tags else None,
+            "notes": self._extract_child_body(node, "Notes"),
+        }
+
+    def _parse_book_logs(self, node, book):
+        logs = []
+        for task in node.repeated_tasks:
+            if not (task.before and task.after):
+                continue
+            timestamp = None
+            if task.start:
+                timestamp = (
+                    task.start.strftime(self.DATE_FORMAT)
+                    if task.has_time
+                    else task.start.strftime("%Y-%m-%d 00:00")
+                )
+            logs.append({"state": task.after, "from_status": task.before,
+                         "timestamp": timestamp, "book": book})
+        return logs
+
+    def _extract_created_at(self, node):
+        if not node.body:
+            return None
+        for line in node.body.splitlines():
+            line = line.strip()
+            if line.startswith(self.CREATED_AT_PREFIX):
+                raw_date = line[len(self.CREATED_AT_PREFIX):].strip()
+                try:
+                    clean_date = raw_date.strip('[]').split()
+                    if len(clean_date) >= 3:
+                        date_str = f"{clean_date[0]} {clean_date[2]}"
+                        parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M")
+                        return parsed_date.strftime(self.DATE_FORMAT)
+                    return None
+                except ValueError:
+                    return None
+        return None
+
+    def _extract_child_body(self, node, title):
+        for child in node.children:
+            if child.heading.strip() == title:
+                return child.body.strip() if child.body else None
+        return None
+
+    def _format_datetime(self, org_date):
+        return org_date.strftime(self.DATE_FORMAT) if org_date else None
+
+
+def build_nodes(count: int, clocks_per_node: int) -> list:
+    """ベンチマーク用の本のノードを作成する"""
+    clocks = "".join(CLOCK_LINE.format(day=1 + i % 28) for i in range(clocks_per_node))
+    text = "".join(NODE_TEMPLATE.format(index=i, clocks=clocks) for i in range(count))
+    root = orgparse.loads(text)
+    return [node for node in root[1:] if node.level == 1]
+
+
+def measure(reader: OrgReader, nodes: list, number: int) -> float:
+    """ノード1件あたりの抽出時間（マイクロ秒）を計測する"""
+    def run():
+        for node in nodes:
+            book = reader._parse_book_node(node)
+            reader._parse_book_logs(node, book)
+            reader._parse_book_clock_logs(node, book)
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    return seconds / (number * len(nodes)) * 1_000_000
+
+
+def main():
+    """main"""
+    nodes = build_nodes(count=200, clocks_per_node=20)
+    legacy = LegacyOrgReader([])
+    current = OrgReader([])
+    for node in nodes[:3]:
+        book = current._parse_book_node(node)
+        assert book == legacy._parse_book_node(node)
+        assert current._parse_book_logs(node, book) == legacy._parse_book_logs(node, book)
+        assert current._parse_book_clock_logs(node, book) == legacy._parse_book_clock_logs(node, book)
+
+    legacy_us = measure(legacy, nodes, number=10)
+    current_us = measure(current, nodes, number=10)
+    print(f"legacy : {legacy_us:8.1f} us/node")
+    print(f"current: {current_us:8.1f} us/node ({legacy_us / current_us:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,16 +15,23 @@ import requests
 # Own packages
 #########################################################
 from common.log import error, warn
+from common.google_spreadsheet import gss_rate_limiter
 from common.exceptions import (
     MyGssException,
     MyGssInvalidArgumentException,
     MyGssResourceExhaustedException
 )
 
+# クォータ超過のエラーを受けた後、リクエストを止める秒数（Sheets APIのクォータは1分単位）
+QUOTA_PENALTY_SEC = 60
+
 
 def __handle_error(exc: Exception) -> int:
     """例外に応じた待機秒数を返すハンドラ
 
+    クォータ超過の場合は共有のレートリミッターを止め、他のGSSリポジトリのリクエストも待たせる。
+    シートの行数不足は行を追加済みのため待たずにリトライする。
+
     Args:
         exc (Exception): 発生した例外
 
@@ -35,9 +42,9 @@ def __handle_error(exc: Exception) -> int:
         warn("Connection error: {}: {}", exc.__class__.__name__, exc)
         return 30
     elif isinstance(exc, MyGssInvalidArgumentException):
-        return 5
+        return 0
     elif isinstance(exc, MyGssResourceExhaustedException):
-        return 60
+        return QUOTA_PENALTY_SEC
     elif isinstance(exc, MyGssException):
         return 1
     else:
@@ -69,5 +76,9 @@ def gss_module(func):
                     raise MyGssException(mes) from exc
                 wait_sec = __handle_error(exc)
                 warn("Attempt {0} failed; waiting {1} sec", attempt, wait_sec)
-                time.sleep(wait_sec)
+                if isinstance(exc, MyGssResourceExhaustedException):
+                    # 次のリクエストがレートリミッターで待つ
+                    gss_rate_limiter().penalize(wait_sec)
+                elif wait_sec:
+                    time.sleep(wait_sec)
     return wrapper
@@ -1,2 +1,4 @@
 """common.google_spreadsheet"""
 from .gss_accessor import GssAccessor
+from .rate_limiter import TokenBucket, gss_rate_limiter
+from .spreadsheet_registry import SpreadsheetRegistry, spreadsheet_registry
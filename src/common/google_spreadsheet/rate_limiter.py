@@ -0,0 +1,163 @@
+"""common.google_spreadsheet.rate_limiter"""
+#########################################################
+# Builtin packages
+#########################################################
+import threading
+import time
+from typing import Callable
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.config import Config
+from common.log import debug, info
+
+# Sheets APIの既定のクォータ（ユーザーごとの1分あたりのリクエスト数）
+DEFAULT_REQUESTS_PER_MINUTE = 60
+# 連続して送れるリクエスト数
+DEFAULT_REQUEST_BURST = 10
+_EPSILON_SEC = 1e-6
+
+
+class TokenBucket:
+    """トークンバケット方式のレートリミッター。
+
+    トークンがある間は待たずにリクエストを通し、空の場合だけ補充されるまで待つ。
+    待った時間は throttled_sec に積算する。スレッドセーフ。
+
+    Usage:
+        limiter = TokenBucket(capacity=10, rate=50 / 60)
+        limiter.acquire()
+        worksheet.row_values(1)
+
+    Args:
+        capacity: バケットの容量（連続して通せるリクエスト数）。
+        rate: 1秒あたりに補充するトークン数。
+        clock: 現在時刻（秒）を返す関数。
+        sleep: 待機する関数。
+    """
+
+    def __init__(self, capacity: float, rate: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if capacity <= 0 or rate <= 0:
+            raise ValueError(f"capacity and rate must be positive: capacity={capacity}, rate={rate}")
+        self._capacity = capacity
+        self._rate = rate
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        # トークンの補充を始める時刻（penalize() で未来に延ばす）
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled_requests = 0
+        self.throttled_sec = 0.0
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: int, burst: int, **kwargs) -> "TokenBucket":
+        """1分あたりのクォータからレートリミッターを作成する。
+
+        どの60秒間でも burst + 補充分 がクォータを超えないよう、補充レートを (クォータ - burst) / 60 にする。
+
+        Args:
+            requests_per_minute: 1分あたりのリクエスト数の上限。
+            burst: 連続して通せるリクエスト数。
+            **kwargs: TokenBucketのその他の引数。
+
+        Returns:
+            TokenBucket: 作成したレートリミッター。
+        """
+        burst = max(1, min(burst, requests_per_minute - 1))
+        return cls(capacity=burst, rate=(requests_per_minute - burst) / 60, **kwargs)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """トークンを取得する。足りない場合は補充されるまで待つ。
+
+        Args:
+            tokens: 取得するトークン数。
+
+        Returns:
+            float: 待った秒数。
+        """
+        waited = 0.0
+        with self._lock:
+            while True:
+                now = self._clock()
+                self._refill(now)
+                wait = max(self._updated - now, 0.0) + max(tokens - self._tokens, 0.0) / self._rate
+                # 浮動小数点の誤差で極小の待ち時間が残り続けないよう、許容誤差以下は待たない
+                if wait <= _EPSILON_SEC:
+                    self._tokens = max(self._tokens - tokens, 0.0)
+                    break
+                self._sleep(wait)
+                waited += wait
+            self.requests += 1
+            if waited:
+                self.throttled_requests += 1
+                self.throttled_sec += waited
+        if waited:
+            debug("Throttled GSS request for {:.2f} sec", waited)
+        return waited
+
+    def penalize(self, seconds: float) -> None:
+        """バケットを空にし、指定秒数はトークンを補充しない（クォータ超過のエラーを受けた場合）。
+
+        Args:
+            seconds: 補充を止める秒数。
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = 0.0
+            self._updated = max(self._updated, now + seconds)
+
+    @property
+    def stats(self) -> dict:
+        """リクエスト数・待機したリクエスト数・待機した秒数"""
+        return {
+            "requests": self.requests,
+            "throttled_requests": self.throttled_requests,
+            "throttled_sec": self.throttled_sec,
+        }
+
+    def log_stats(self) -> None:
+        """リクエスト数と待機した時間をログに出力する。"""
+        info("GSS rate limiter: {} requests, {} throttled for {:.1f} sec",
+             self.requests, self.throttled_requests, self.throttled_sec)
+
+    def _refill(self, now: float) -> None:
+        """経過時間に応じてトークンを補充する。"""
+        if now <= self._updated:
+            return
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+# プロセス全体で共有するSheets APIのレートリミッター
+_GSS_RATE_LIMITER: TokenBucket | None = None
+_GSS_RATE_LIMITER_LOCK = threading.Lock()
+
+
+def gss_rate_limiter() -> TokenBucket:
+    """すべてのGSSリポジトリで共有するレートリミッターを取得する。
+
+    初回に [GSS] REQUESTS_PER_MINUTE / REQUEST_BURST から作成する。
+
+    Returns:
+        TokenBucket: 共有のレートリミッター。
+    """
+    global _GSS_RATE_LIMITER
+    with _GSS_RATE_LIMITER_LOCK:
+        if _GSS_RATE_LIMITER is None:
+            config = Config().config
+            _GSS_RATE_LIMITER = TokenBucket.per_minute(
+                config.getint("GSS", "REQUESTS_PER_MINUTE", fallback=DEFAULT_REQUESTS_PER_MINUTE),
+                config.getint("GSS", "REQUEST_BURST", fallback=DEFAULT_REQUEST_BURST),
+            )
+        return _GSS_RATE_LIMITER
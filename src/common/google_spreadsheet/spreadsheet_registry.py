@@ -0,0 +1,150 @@
+"""common.google_spreadsheet.spreadsheet_registry"""
+#########################################################
+# Builtin packages
+#########################################################
+import threading
+from typing import Callable
+
+#########################################################
+# 3rd party packages
+#########################################################
+import gspread
+
+#########################################################
+# Own packages
+#########################################################
+from common.google_spreadsheet.gss_accessor import GssAccessor
+from common.google_spreadsheet.rate_limiter import TokenBucket, gss_rate_limiter
+from common.log import info
+
+
+class SpreadsheetRegistry:
+    """スプレッドシートとシートの情報をキャッシュするクラス
+
+    スプレッドシートはキーごとに一度だけ開き、全シートのメタデータを1回の取得でまとめて保持する。
+    ヘッダー行も全シート分を1回の values.batchGet で取得してキャッシュする。
+    Google Spreadsheetへの接続は、最初にシートを使うときまで行わない。
+
+    Usage:
+        registry = spreadsheet_registry()
+        worksheet = registry.worksheet(sheet_key, "Books")
+        header = registry.header(sheet_key, "Books")
+
+    Args:
+        connect: gspreadのクライアントを返す関数。
+        rate_limiter: APIを呼ぶ前にトークンを取得するレートリミッター。
+    """
+
+    def __init__(self, connect: Callable[[], gspread.Client] | None = None,
+                 rate_limiter: TokenBucket | None = None):
+        self._connect = connect or (lambda: GssAccessor().connection)
+        self._rate_limiter = rate_limiter or gss_rate_limiter()
+        self._client: gspread.Client | None = None
+        self._workbooks: dict[str, gspread.Spreadsheet] = {}
+        self._worksheets: dict[str, dict[str, gspread.Worksheet]] = {}
+        self._headers: dict[str, dict[str, list[str]]] = {}
+        self._lock = threading.RLock()
+
+    def workbook(self, sheet_key: str) -> gspread.Spreadsheet:
+        """スプレッドシートを取得する（初回のみ開いて全シートのメタデータを取得する）
+
+        Args:
+            sheet_key: スプレッドシートのキー
+
+        Returns:
+            gspread.Spreadsheet: スプレッドシート
+        """
+        with self._lock:
+            if sheet_key not in self._workbooks:
+                if self._client is None:
+                    self._client = self._connect()
+                self._rate_limiter.acquire()
+                workbook = self._client.open_by_key(sheet_key)
+                self._rate_limiter.acquire()
+                self._worksheets[sheet_key] = {
+                    worksheet.title: worksheet for worksheet in workbook.worksheets()
+                }
+                self._workbooks[sheet_key] = workbook
+                info("Opened spreadsheet {0} with {1} sheets", sheet_key, len(self._worksheets[sheet_key]))
+            return self._workbooks[sheet_key]
+
+    def worksheet(self, sheet_key: str, sheet_name: str) -> gspread.Worksheet:
+        """キャッシュしたメタデータからシートを取得する
+
+        Args:
+            sheet_key: スプレッドシートのキー
+            sheet_name: シート名
+
+        Returns:
+            gspread.Worksheet: シート
+
+        Raises:
+            gspread.exceptions.WorksheetNotFound: シートが存在しない場合
+        """
+        self.workbook(sheet_key)
+        try:
+            return self._worksheets[sheet_key][sheet_name]
+        except KeyError as exc:
+            raise gspread.exceptions.WorksheetNotFound(sheet_name) from exc
+
+    def header(self, sheet_key: str, sheet_name: str) -> list[str]:
+        """シートのヘッダー行（1行目）を取得する
+
+        初回は全シートのヘッダー行を1回のリクエストでまとめて取得する。
+
+        Args:
+            sheet_key: スプレッドシートのキー
+            sheet_name: シート名
+
+        Returns:
+            list[str]: ヘッダー行の値。空の場合は空リスト
+        """
+        workbook = self.workbook(sheet_key)
+        with self._lock:
+            if sheet_key not in self._headers:
+                titles = list(self._worksheets[sheet_key])
+                ranges = [f"'{title.replace(chr(39), chr(39) * 2)}'!1:1" for title in titles]
+                self._rate_limiter.acquire()
+                response = workbook.values_batch_get(ranges) if ranges else {}
+                value_ranges = response.get("valueRanges", [])
+                self._headers[sheet_key] = {
+                    title: (value_range.get("values") or [[]])[0]
+                    for title, value_range in zip(titles, value_ranges)
+                }
+            return list(self._headers[sheet_key].get(sheet_name, []))
+
+    def set_header(self, sheet_key: str, sheet_name: str, header: list[str]) -> None:
+        """ヘッダー行を書き込んだ後にキャッシュを更新する
+
+        Args:
+            sheet_key: スプレッドシートのキー
+            sheet_name: シート名
+            header: 書き込んだヘッダー行
+        """
+        with self._lock:
+            self._headers.setdefault(sheet_key, {})[sheet_name] = list(header)
+
+    def clear(self) -> None:
+        """キャッシュしたスプレッドシート・シート・ヘッダー行を破棄する"""
+        with self._lock:
+            self._workbooks.clear()
+            self._worksheets.clear()
+            self._headers.clear()
+
+
+# プロセス全体で共有するスプレッドシートのレジストリ
+_SPREADSHEET_REGISTRY: SpreadsheetRegistry | None = None
+_SPREADSHEET_REGISTRY_LOCK = threading.Lock()
+
+
+def spreadsheet_registry() -> SpreadsheetRegistry:
+    """すべてのGSSリポジトリで共有するスプレッドシートのレジストリを取得する
+
+    Returns:
+        SpreadsheetRegistry: 共有のレジストリ
+    """
+    global _SPREADSHEET_REGISTRY
+    with _SPREADSHEET_REGISTRY_LOCK:
+        if _SPREADSHEET_REGISTRY is None:
+            _SPREADSHEET_REGISTRY = SpreadsheetRegistry()
+        return _SPREADSHEET_REGISTRY
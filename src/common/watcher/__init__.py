@@ -0,0 +1,2 @@
+"""common.watcher"""
+from .file_watcher import FileWatcher
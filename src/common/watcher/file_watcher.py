@@ -0,0 +1,184 @@
+"""common.watcher.file_watcher"""
+#########################################################
+# Builtin packages
+#########################################################
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import info, warn
+
+# inotify(7) の定数
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileWatcher:
+    """ファイルの変更を監視し、連続した保存をまとめて通知する
+
+    Linuxではinotifyでファイルのあるディレクトリを監視し（エディタのリネーム保存にも対応）、
+    inotifyが使えない環境では更新時刻とサイズのポーリングにフォールバックする。
+
+    Usage:
+        from common.watcher import FileWatcher
+        watcher = FileWatcher(["/opt/org/agendas/journal.org"])
+        while True:
+            changed_paths = watcher.wait()
+
+    Args:
+        paths: 監視するファイルパス。
+        debounce_sec: 最後の変更からこの秒数だけ変更がなければ通知する。
+        poll_interval_sec: ポーリング時の確認間隔(秒)。
+    """
+
+    def __init__(self, paths: list[str], debounce_sec: float = 1.0, poll_interval_sec: float = 2.0):
+        self._paths = {os.path.abspath(path) for path in paths}
+        self._debounce_sec = debounce_sec
+        self._poll_interval_sec = poll_interval_sec
+        # inotifyのウォッチディスクリプタ -> 監視しているディレクトリ
+        self._watch_dirs: dict[int, str] = {}
+        self._fd = self._init_inotify()
+        self._snapshot = self._take_snapshot()
+
+    @property
+    def uses_inotify(self) -> bool:
+        """inotifyで監視しているか"""
+        return self._fd is not None
+
+    def wait(self, timeout_sec: float | None = None) -> set[str]:
+        """変更があるまで待ち、デバウンス後に変更されたファイルパスを返す
+
+        Args:
+            timeout_sec: 最初の変更を待つ最大秒数。Noneの場合は無期限。
+
+        Returns:
+            set[str]: 変更されたファイルパス。タイムアウトした場合は空。
+        """
+        changed = self._wait_for_change(timeout_sec)
+        while changed:
+            more = self._wait_for_change(self._debounce_sec)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self) -> None:
+        """inotifyのファイルディスクリプタを閉じる"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _wait_for_change(self, timeout_sec: float | None) -> set[str]:
+        """監視対象のファイルが変更されるまで待つ
+
+        同じディレクトリの監視対象外のファイル（エディタのロックファイルや自動保存、バックアップ）の
+        イベントでは返らず、残りの時間で待ち続ける。空を返すのはタイムアウトした場合だけ。
+        """
+        if self._fd is None:
+            return self._poll(timeout_sec)
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            changed = self._read_inotify(remaining)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def _init_inotify(self) -> int | None:
+        """inotifyを初期化する。使えない場合はNoneを返す"""
+        library = ctypes.util.find_library("c")
+        if library is None:
+            warn("libc is not found. Falling back to polling.")
+            return None
+        try:
+            libc = ctypes.CDLL(library, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError) as exc:
+            warn("inotify is not available. Falling back to polling: {}", exc)
+            return None
+        if fd < 0:
+            warn("inotify_init1 failed (errno={}). Falling back to polling.", ctypes.get_errno())
+            return None
+
+        for directory in {os.path.dirname(path) for path in self._paths}:
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                warn("inotify_add_watch failed for {} (errno={}). Falling back to polling.",
+                     directory, ctypes.get_errno())
+                os.close(fd)
+                self._watch_dirs.clear()
+                return None
+            self._watch_dirs[wd] = directory
+        info("Watching with inotify: {}", sorted(self._paths))
+        return fd
+
+    def _read_inotify(self, timeout_sec: float | None) -> set[str]:
+        """inotifyイベントを読み、監視対象のファイルに関するものだけを返す（なければ空）
+
+        イベントのウォッチディスクリプタからディレクトリを求め、ファイル名ではなくフルパスで照合する。
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout_sec)
+        if not readable:
+            return set()
+
+        changed = set()
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, _, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "replace")
+            offset += name_len
+            directory = self._watch_dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if path in self._paths:
+                changed.add(path)
+        return changed
+
+    def _poll(self, timeout_sec: float | None) -> set[str]:
+        """更新時刻とサイズを比較して変更を検知する"""
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        while True:
+            snapshot = self._take_snapshot()
+            changed = {path for path in self._paths if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait_sec = self._poll_interval_sec
+            if deadline is not None:
+                wait_sec = min(wait_sec, max(deadline - time.monotonic(), 0))
+            time.sleep(wait_sec)
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int] | None]:
+        """監視対象ファイルの (更新時刻, サイズ) を取得する"""
+        snapshot = {}
+        for path in self._paths:
+            try:
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                snapshot[path] = None
+        return snapshot
@@ -17,4 +17,34 @@ class OrgController:
                    book_logs: list[BookLog],
                    book_clock_logs: list[BookClockLog]) -> None:
         """本・本ログ・本クロックログを保存する"""
-        cls.org_service.save(books, book_logs, book_clock_logs)
\ No newline at end of file
+        cls.org_service.save(books, book_logs, book_clock_logs)
+
+    @classmethod
+    def sync_books(cls) -> tuple[int, int, int]:
+        """orgファイルの新しい本・本ログ・本クロックログを逐次保存する"""
+        return cls.org_service.sync_books()
+
+    @classmethod
+    def sync_gss(cls) -> tuple[int, int]:
+        """ローカルの本・本ログ・本クロックログのうちGSSにない行・異なる行を書き込む"""
+        return cls.org_service.sync_gss()
+
+    @classmethod
+    def import_csv_to_sqlite(cls) -> tuple[int, int, int]:
+        """既存のCSVの本・本ログ・本クロックログをSQLiteに取り込む"""
+        return cls.org_service.import_csv_to_sqlite()
+
+    @classmethod
+    def import_csv_to_partitioned(cls) -> tuple[int, int]:
+        """既存のCSVの本ログ・本クロックログを年月ごとのCSVに取り込む"""
+        return cls.org_service.import_csv_to_partitioned()
+
+    @classmethod
+    def export_parquet(cls) -> tuple[int, int, int]:
+        """保存済みの本・本ログ・本クロックログをParquetに書き出す"""
+        return cls.org_service.export_parquet()
+
+    @classmethod
+    def org_file_paths(cls) -> list[str]:
+        """読み込み対象のorgファイルパスを取得する"""
+        return cls.org_service.reader.org_file_paths
@@ -0,0 +1,62 @@
+"""Daemon entry point
+
+orgファイルの変更を監視し、保存のたびに差分を同期する。
+OrgControllerのサービス（API接続・各種キャッシュ）はプロセス内で使い回す。
+
+Usage:
+    $ python daemon.py
+"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.config import Config
+from common.log import initialize_logger, info, error_stack_trace
+from common.watcher import FileWatcher
+from controllers.org import OrgController
+
+
+def sync() -> None:
+    """orgファイルの新しいデータを同期する（失敗してもデーモンは止めない）"""
+    try:
+        books, book_logs, book_clock_logs = OrgController.sync_books()
+        info("Synced books: {}, book logs: {}, book clock logs: {}", books, book_logs, book_clock_logs)
+    except Exception as exc:
+        error_stack_trace(f"Failed to sync org files: {exc}")
+
+
+def main():
+    """main"""
+    initialize_logger()
+    config = Config().config
+    watcher = FileWatcher(
+        OrgController.org_file_paths(),
+        debounce_sec=config.getfloat("ORG", "WATCH_DEBOUNCE_SEC", fallback=1.0),
+        poll_interval_sec=config.getfloat("ORG", "WATCH_POLL_INTERVAL_SEC", fallback=2.0)
+    )
+
+    sync()
+    try:
+        while True:
+            changed_paths = watcher.wait()
+            if not changed_paths:
+                continue
+            info("Detected changes: {}", sorted(changed_paths))
+            sync()
+    except KeyboardInterrupt:
+        info("Stopped watching org files")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
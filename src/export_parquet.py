@@ -0,0 +1,34 @@
+"""Parquet export entry point
+
+保存済みの本・本ログ・本クロックログのうち、未書き出しの行を年月ごとのParquetに追記する。
+ノートブックからは ParquetBookClockLogRepository().read(start=..., end=...) で必要な月だけ読み込める。
+
+Usage:
+    $ python export_parquet.py
+"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import initialize_logger, info
+from controllers.org import OrgController
+
+
+def main():
+    """main"""
+    initialize_logger()
+    books, logs, clocks = OrgController.export_parquet()
+    info("Exported {} books, {} book logs, {} book clock logs to Parquet", books, logs, clocks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Partitioned CSV import entry point
+
+既存のCSVの本ログ・本クロックログを年月ごとのCSVに取り込む。
+[ORG] BACKEND を partitioned に切り替える前に一度実行する。
+
+Usage:
+    $ python import_partitioned.py
+"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import initialize_logger, info
+from controllers.org import OrgController
+
+
+def main():
+    """main"""
+    initialize_logger()
+    logs, clocks = OrgController.import_csv_to_partitioned()
+    info("Imported {} book logs, {} book clock logs into partitioned CSV", logs, clocks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""SQLite import entry point
+
+既存のCSVの本・本ログ・本クロックログをSQLiteに取り込む。
+[ORG] BACKEND を sqlite に切り替える前に一度実行する。
+
+Usage:
+    $ python import_sqlite.py
+"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import initialize_logger, info
+from controllers.org import OrgController
+
+
+def main():
+    """main"""
+    initialize_logger()
+    books, logs, clocks = OrgController.import_csv_to_sqlite()
+    info("Imported {} books, {} book logs, {} book clock logs into SQLite", books, logs, clocks)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,9 +19,7 @@ from controllers.org import OrgController
 def main():
     """main"""
     initialize_logger()
-    books, book_logs, book_clock_logs = OrgController.get_books_from_org()
-
-    OrgController.save_books(books, book_logs, book_clock_logs)
+    OrgController.sync_books()
 
 
 if __name__ == "__main__":
@@ -2,4 +2,8 @@
 
 from .model_adapter import ModelAdapter
 from .base_repository import BaseRepositoryInterface
+from .columnar_table import ColumnarTable
 from .csv_base_repository import CsvBaseRepository, CsvConfig
+from .key_index import KeyIndex, PartitionedKeyIndex
+from .partitioned_csv_repository import PartitionedCsvRepository, PartitionedCsvConfig
+from .sqlite_base_repository import SqliteBaseRepository, SqliteConfig
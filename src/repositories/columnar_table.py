@@ -0,0 +1,291 @@
+"""repositories.columnar_table"""
+#########################################################
+# Builtin packages
+#########################################################
+import sys
+from typing import Iterable
+
+#########################################################
+# 3rd party packages
+#########################################################
+import numpy as np
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import warn
+
+# 欠損値を表す値。datetime64のNaTと同じビット表現にする
+INT_NA = np.iinfo(np.int64).min
+DATETIME_UNIT = "datetime64[m]"
+COLUMN_KINDS = ("int", "datetime", "category", "str")
+
+
+class ColumnarTable:
+    """型付きのカラム指向テーブル。
+
+    CSVから読み込んだ文字列の辞書のリストの代わりに、カラムごとに連続した配列を保持する。
+    最大ID・集計を、行ごとのPythonループではなく配列演算で行う。
+    重複チェックは永続キーインデックス（KeyIndex / CsvKeyIndex）で行うため、このテーブルでは扱わない。
+
+    カラムの種類:
+        int: int64。空文字は INT_NA。
+        datetime: datetime64[m]。空文字は NaT。
+        category: int32のコード + インターン済みのカテゴリ文字列（state, tags など）。空文字はコード -1。
+        str: Pythonの文字列（object配列）。空文字は None。
+
+    Usage:
+        table = ColumnarTable.from_rows(rows, {"id": "int", "book_id": "int", "clock_start": "datetime"})
+        table.max("id")
+        table.aggregate("book_id", "clock_start", "max")
+
+    Args:
+        columns: カラム名 -> 配列。
+        kinds: カラム名 -> カラムの種類。
+        categories: categoryカラム名 -> カテゴリ文字列のリスト（コード順）。
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], kinds: dict[str, str],
+                 categories: dict[str, list[str]] | None = None):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {lengths}")
+        self._columns = columns
+        self._kinds = kinds
+        self._categories = categories or {}
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], schema: dict[str, str]) -> "ColumnarTable":
+        """文字列の辞書の行からテーブルを作成する。
+
+        Args:
+            rows: CSVから読み込んだ行（CsvBaseRepository.iter_all() の戻り値など）。
+            schema: カラム名 -> カラムの種類。
+
+        Returns:
+            ColumnarTable: 作成したテーブル。
+
+        Raises:
+            ValueError: 未知のカラムの種類が指定された場合。
+        """
+        unknown = {kind for kind in schema.values() if kind not in COLUMN_KINDS}
+        if unknown:
+            raise ValueError(f"Unknown column kinds: {unknown}")
+
+        raw = {column: [] for column in schema}
+        for row in rows:
+            for column, values in raw.items():
+                value = row.get(column)
+                values.append("" if value is None else str(value))
+
+        columns = {}
+        categories = {}
+        for column, kind in schema.items():
+            if kind == "int":
+                columns[column] = _to_int_array(raw[column], column)
+            elif kind == "datetime":
+                columns[column] = _to_datetime_array(raw[column], column)
+            elif kind == "category":
+                columns[column], categories[column] = _to_category_array(raw[column])
+            else:
+                columns[column] = np.array([value or None for value in raw[column]], dtype=object)
+        return cls(columns, dict(schema), categories)
+
+    @classmethod
+    def concat(cls, tables: list["ColumnarTable"], schema: dict[str, str]) -> "ColumnarTable":
+        """同じカラムを持つテーブルを縦に連結する。
+
+        categoryカラムはカテゴリ文字列を統合し、コードを振り直す。
+
+        Args:
+            tables: 連結するテーブル。
+            schema: カラム名 -> カラムの種類（テーブルが空の場合にも使う）。
+
+        Returns:
+            ColumnarTable: 連結したテーブル。
+        """
+        if not tables:
+            return cls.from_rows([], schema)
+        columns = {}
+        categories = {}
+        for column, kind in schema.items():
+            if kind != "category":
+                columns[column] = np.concatenate([table.column(column) for table in tables])
+                continue
+            numbering: dict[str, int] = {}
+            codes = []
+            for table in tables:
+                remap = np.array(
+                    [numbering.setdefault(value, len(numbering)) for value in table.categories(column)] + [-1],
+                    dtype=np.int32
+                )
+                codes.append(remap[table.column(column)])
+            columns[column] = np.concatenate(codes)
+            categories[column] = list(numbering)
+        return cls(columns, dict(schema), categories)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def column_names(self) -> list[str]:
+        """カラム名のリスト"""
+        return list(self._columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """カラムの配列を取得する（categoryカラムはコードの配列）。"""
+        return self._columns[name]
+
+    def categories(self, name: str) -> list[str]:
+        """categoryカラムのカテゴリ文字列を取得する。"""
+        return self._categories[name]
+
+    def decode(self, name: str) -> list:
+        """カラムをPythonの値のリストに変換する（categoryは文字列、欠損値はNone）。"""
+        values = self._columns[name]
+        kind = self._kinds[name]
+        if kind == "category":
+            categories = self._categories[name]
+            return [categories[code] if code >= 0 else None for code in values.tolist()]
+        if kind == "int":
+            return [None if value == INT_NA else value for value in values.tolist()]
+        if kind == "datetime":
+            return [None if value is None else value.strftime("%Y-%m-%d %H:%M")
+                    for value in values.astype("datetime64[m]").tolist()]
+        return values.tolist()
+
+    def select(self, columns: list[str]) -> "ColumnarTable":
+        """指定したカラムだけを持つテーブルを返す（配列はコピーしない）。"""
+        return ColumnarTable(
+            {name: self._columns[name] for name in columns},
+            {name: self._kinds[name] for name in columns},
+            {name: values for name, values in self._categories.items() if name in columns}
+        )
+
+    def filter(self, mask: np.ndarray) -> "ColumnarTable":
+        """真偽値の配列で行を絞り込んだテーブルを返す。"""
+        return ColumnarTable(
+            {name: values[mask] for name, values in self._columns.items()},
+            self._kinds,
+            self._categories
+        )
+
+    def max(self, name: str):
+        """int / datetime カラムの最大値を取得する。
+
+        Returns:
+            最大値（intまたはdatetime64）。欠損値を除いて値がない場合はNone。
+        """
+        values = self._valid_values(name)
+        if len(values) == 0:
+            return None
+        result = values.max()
+        return int(result) if self._kinds[name] == "int" else result
+
+    def aggregate(self, by: str, name: str, func: str = "sum") -> dict:
+        """byカラムの値ごとにnameカラムを集計する。
+
+        欠損値の行は集計から除く。
+
+        Args:
+            by: グループ化するint / categoryカラム。
+            name: 集計するint / datetimeカラム（countの場合は任意のカラム）。
+            func: "sum", "max", "min", "count" のいずれか。
+
+        Returns:
+            dict: グループの値 -> 集計結果。categoryはカテゴリ文字列、datetimeはdatetime64。
+
+        Raises:
+            ValueError: 未知の集計関数が指定された場合。
+        """
+        if func not in ("sum", "max", "min", "count"):
+            raise ValueError(f"Unknown aggregate function: {func}")
+        if func != "count" and self._kinds[name] not in ("int", "datetime"):
+            raise ValueError(f"Column {name} cannot be aggregated with {func}: {self._kinds[name]}")
+        groups = self._columns[by]
+        valid = groups >= 0 if self._kinds[by] == "category" else groups != INT_NA
+        if func != "count":
+            valid &= self._valid_mask(name)
+        groups = groups[valid]
+        if len(groups) == 0:
+            return {}
+
+        keys, inverse = np.unique(groups, return_inverse=True)
+        if func == "count":
+            results = np.bincount(inverse, minlength=len(keys))
+        else:
+            values = self._columns[name][valid].view(np.int64)
+            if func == "sum":
+                results = np.bincount(inverse, weights=values, minlength=len(keys)).astype(np.int64)
+            else:
+                initial = np.iinfo(np.int64).min if func == "max" else np.iinfo(np.int64).max
+                results = np.full(len(keys), initial, dtype=np.int64)
+                (np.maximum if func == "max" else np.minimum).at(results, inverse, values)
+
+        if func != "count" and self._kinds[name] == "datetime":
+            results = list(results.view(DATETIME_UNIT))
+        else:
+            results = results.tolist()
+        if self._kinds[by] == "category":
+            categories = self._categories[by]
+            keys = [categories[code] for code in keys.tolist()]
+        else:
+            keys = keys.tolist()
+        return dict(zip(keys, results))
+
+    def _valid_mask(self, name: str) -> np.ndarray:
+        """欠損値でない行をTrueにした配列を返す。"""
+        values = self._columns[name]
+        kind = self._kinds[name]
+        if kind == "int":
+            return values != INT_NA
+        if kind == "datetime":
+            return ~np.isnat(values)
+        if kind == "category":
+            return values >= 0
+        raise ValueError(f"Column {name} is not numeric: {kind}")
+
+    def _valid_values(self, name: str) -> np.ndarray:
+        """欠損値を除いたカラムの配列を返す。"""
+        return self._columns[name][self._valid_mask(name)]
+
+def _to_int_array(values: list[str], column: str) -> np.ndarray:
+    """文字列のリストをint64の配列に変換する。空文字・不正な値は INT_NA にする。"""
+    try:
+        return np.array([int(value) if value else INT_NA for value in values], dtype=np.int64)
+    except ValueError:
+        pass
+    result = np.full(len(values), INT_NA, dtype=np.int64)
+    for i, value in enumerate(values):
+        try:
+            result[i] = int(value) if value else INT_NA
+        except ValueError:
+            warn("Invalid int value in column {}: {}", column, value)
+    return result
+
+
+def _to_datetime_array(values: list[str], column: str) -> np.ndarray:
+    """文字列のリストをdatetime64[m]の配列に変換する。空文字・不正な値は NaT にする。"""
+    normalized = [value or "NaT" for value in values]
+    try:
+        return np.array(normalized, dtype=DATETIME_UNIT)
+    except ValueError:
+        pass
+    result = np.full(len(values), np.datetime64("NaT"), dtype=DATETIME_UNIT)
+    for i, value in enumerate(normalized):
+        try:
+            result[i] = np.datetime64(value, "m")
+        except ValueError:
+            warn("Invalid datetime value in column {}: {}", column, value)
+    return result
+
+
+def _to_category_array(values: list[str]) -> tuple[np.ndarray, list[str]]:
+    """文字列のリストをコードの配列とインターン済みのカテゴリ文字列に変換する。"""
+    codes: dict[str, int] = {}
+    array = np.array(
+        [codes.setdefault(value, len(codes)) if value else -1 for value in values],
+        dtype=np.int32
+    )
+    return array, [sys.intern(value) for value in codes]
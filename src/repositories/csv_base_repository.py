@@ -4,7 +4,9 @@
 #########################################################
 import csv
 import os
-from dataclasses import dataclass
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Iterator
 
 #########################################################
 # 3rd party packages
@@ -17,6 +19,10 @@ from dataclasses import dataclass
 from common.log import error, warn, info
 from models import Model
 from repositories.base_repository import BaseRepositoryInterface
+from repositories.columnar_table import ColumnarTable
+from repositories.csv_compression import open_compressed_text, validate_compression
+from repositories.csv_key_index import CsvKeyIndex, read_rows_at
+from repositories.csv_snapshot import CsvSnapshot
 from repositories.model_adapter import ModelAdapter
 
 
@@ -30,12 +36,38 @@ class CsvConfig:
         columns: CSVのカラムリスト。
         key_map: モデルとCSVカラムのマッピング。
         model_type: モデルクラス。
+        key_columns: 重複チェック用の複合キー。指定するとCSVの横に永続キーインデックスを作成する。
+        cached: Trueの場合、読み込んだ行をメモリに保持し、ファイルの更新時刻・サイズが変わるまで再利用する。
+        column_types: カラム名 -> ColumnarTableのカラムの種類。load_table() で使用する。
+        snapshot: Trueの場合、column_typesのカラムをCSVの横のバイナリスナップショットに保存し、
+            load_table() はCSVをパースせずにmmapで読み込む。
+        compression: "gzip" または "zstd"（zstandardが必要）。追記は独立したメンバー / フレームとして書き込む。
+            行のバイトオフセットを使えないため、キーインデックスは作成しない。
     """
     file_name: str
     base_path: str
     columns: list[str]
     key_map: dict
     model_type: type[Model]
+    key_columns: list[str] | None = field(default=None)
+    cached: bool = field(default=False)
+    column_types: dict[str, str] | None = field(default=None)
+    snapshot: bool = field(default=False)
+    compression: str | None = field(default=None)
+
+
+@dataclass
+class _RowCache:
+    """キャッシュモードで読み込んだ行と、読み込み時のファイルの状態。"""
+    rows: list[dict] | None = None
+    signature: tuple[int, int] | None = None
+
+
+# CSVファイルパス -> 行キャッシュ
+_ROW_CACHES: dict[str, _RowCache] = {}
+
+# CSVファイルパス -> ヘッダーが正しいことを確認した時点のファイルの (inode, 更新時刻, サイズ)
+_HEADER_STATES: dict[str, tuple[int, int, int]] = {}
 
 
 class CsvBaseRepository(BaseRepositoryInterface):
@@ -49,32 +81,173 @@ class CsvBaseRepository(BaseRepositoryInterface):
         self._path = os.path.join(config.base_path, config.file_name)
         self._header = config.columns
         self._adapter = ModelAdapter(model=config.model_type, key_map=config.key_map)
+        self._key_columns = config.key_columns
+        self._column_types = config.column_types or {"id": "int"}
+        self._snapshot = CsvSnapshot(self._path, self._column_types) if config.snapshot else None
+        validate_compression(config.compression)
+        self._compression = config.compression
+        # 圧縮ファイルは展開後の位置に直接シークできないため、キーインデックスは使わない
+        use_index = config.key_columns and config.compression is None
+        self._index = CsvKeyIndex(self._path, config.key_columns) if use_index else None
+        # 同じCSVを扱うインスタンス同士（Gcalリポジトリ内のCsvBookRepositoryなど）でキャッシュを共有する
+        self._row_cache = _ROW_CACHES.setdefault(self._path, _RowCache()) if config.cached else None
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def all(self) -> list[dict]:
         """CSVから全データを取得する。
 
+        キャッシュモードの場合、ファイルが変わっていなければメモリ上の行を返す。
+        返される辞書はキャッシュと共有されるため、変更しないこと。
+
         Returns:
             list[dict]: 全データレコードのリスト。ファイルが存在しない場合は空リスト。
         """
-        if not os.path.isfile(self._path):
-            self._write_header()
+        if self._row_cache is None:
+            return self._read_all()
+
+        if self._is_cache_valid():
+            self.cache_hits += 1
+            return list(self._row_cache.rows)
+
+        self.cache_misses += 1
+        rows = self._read_all()
+        self._row_cache.rows = rows
+        self._row_cache.signature = self._file_signature()
+        return list(rows)
+
+    def iter_all(self, columns: list[str] | None = None) -> Iterator[dict]:
+        """CSVのデータを1行ずつ取得する。
+
+        全行をリストにせず、指定したカラムだけを辞書にして返すため、
+        notesのような大きなカラムを持つCSVでもメモリ使用量を抑えられる。
+        キャッシュモードでキャッシュが有効な場合はメモリ上の行から返す。
+
+        Args:
+            columns: 取得するカラム名のリスト。Noneの場合は全カラム。
+                CSVに存在しないカラムはNoneになる。
+
+        Yields:
+            dict: 指定したカラムだけを持つデータレコード。
+        """
+        if self._is_cache_valid():
+            self.cache_hits += 1
+            for row in self._row_cache.rows:
+                yield row if columns is None else {column: row.get(column) for column in columns}
+            return
+
+        if self._row_cache is not None:
+            self.cache_misses += 1
+        if not self._prepare_read():
+            return
+        with self._open_text("r", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            if columns is None:
+                columns = header
+            positions = {column: i for i, column in enumerate(header)}
+            projection = [(column, positions.get(column)) for column in columns]
+            for values in reader:
+                if not values:
+                    continue
+                yield {
+                    column: values[i] if i is not None and i < len(values) else None
+                    for column, i in projection
+                }
+
+    def load_table(self, columns: list[str] | None = None) -> ColumnarTable:
+        """CSVのデータを型付きのカラム指向テーブルとして読み込む。
+
+        Args:
+            columns: 読み込むカラム名のリスト。Noneの場合はcolumn_typesの全カラム。
+                column_typesにないカラムは文字列として読み込む。
+
+        Returns:
+            ColumnarTable: 読み込んだテーブル。
+        """
+        columns = columns or list(self._column_types)
+        if self._snapshot is not None and all(column in self._column_types for column in columns):
+            table = self._snapshot.load()
+            if table is None:
+                # スナップショットがない、またはCSVより古い場合は作り直す
+                table = self._rebuild_snapshot()
+            return table.select(columns)
+
+        schema = {column: self._column_types.get(column, "str") for column in columns}
+        return ColumnarTable.from_rows(self.iter_all(columns=columns), schema)
+
+    def refresh_snapshot(self) -> None:
+        """スナップショットがCSVより古い場合に作り直す。
+
+        同期の完了後に呼び出し、次回の起動時にCSVをパースせずに済むようにする。
+        """
+        if self._snapshot is not None and not self._snapshot.is_fresh():
+            self._rebuild_snapshot()
+
+    @property
+    def cache_stats(self) -> dict:
+        """キャッシュのヒット数・ミス数を取得する。
+
+        Returns:
+            dict: {"hits": ヒット数, "misses": ミス数}
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
+    def _read_all(self) -> list[dict]:
+        """CSVファイルから全データを読み込む。"""
+        if not self._prepare_read():
             return []
-        if not self._has_header():
-            self._write_header()
 
-        with open(self._path, encoding="utf-8", mode="r") as f:
+        with self._open_text("r") as f:
             reader = csv.DictReader(f)
             return [row for row in reader]
 
+    def _prepare_read(self) -> bool:
+        """読み込み前にCSVファイルとヘッダーを確認する。
+
+        Returns:
+            bool: 読み込むデータがある可能性がある場合はTrue。ファイルを新規作成した場合はFalse。
+        """
+        if not os.path.isfile(self._path):
+            self._write_header()
+            return False
+        return self._ensure_header()
+
+    def _ensure_header(self) -> bool:
+        """ヘッダーが正しいことを確認し、正しくなければ書き直す。
+
+        確認済みのファイルの (inode, 更新時刻, サイズ) を記録しておき、
+        ファイルが変わっていなければファイルを開かずに済ませる。
+
+        Returns:
+            bool: ヘッダーが正しかった場合はTrue。書き直した場合はFalse。
+        """
+        identity = self._file_identity()
+        if identity is not None and _HEADER_STATES.get(self._path) == identity:
+            return True
+        if self._has_header():
+            if identity is not None:
+                _HEADER_STATES[self._path] = identity
+            return True
+        self._write_header()
+        return False
+
     def find_by_id(self, id_: int) -> dict | None:
         """指定されたIDのデータを取得する。
 
+        キーインデックスが有効な場合は、記録済みのバイトオフセットから1行だけ読み込む。
+
         Args:
             id_: 取得するデータのID。
 
         Returns:
             dict | None: 該当するデータ。見つからない場合はNone。
         """
+        if self._index is not None and not self._is_cache_valid():
+            return self.find_by_ids([id_]).get(int(id_))
+
         for data in self.all():
             try:
                 if int(data.get("id", -1)) == int(id_):
@@ -83,6 +256,34 @@ class CsvBaseRepository(BaseRepositoryInterface):
                 continue
         return None
 
+    def find_by_ids(self, ids: list[int]) -> dict[int, dict]:
+        """複数IDのデータをまとめて取得する。
+
+        キーインデックスが有効な場合は、オフセット順に1回のファイル走査で読み込む。
+
+        Args:
+            ids: 取得するデータのIDのリスト。
+
+        Returns:
+            dict[int, dict]: ID -> データ。見つからないIDは含まない。
+        """
+        offsets = self._with_index(lambda index: index.offsets_of(ids))
+        if offsets is not None:
+            found = list(offsets.items())
+            rows = read_rows_at(self._path, [offset for _, offset in found]) if found else []
+            return {id_: row for (id_, _), row in zip(found, rows) if row is not None}
+
+        wanted = {int(id_) for id_ in ids}
+        result = {}
+        for data in self.all():
+            try:
+                id_ = int(data.get("id", -1))
+            except (KeyError, ValueError):
+                continue
+            if id_ in wanted and id_ not in result:
+                result[id_] = data
+        return result
+
     def add(self, data: list[Model]) -> None:
         """データをCSVに追記する。
 
@@ -91,16 +292,105 @@ class CsvBaseRepository(BaseRepositoryInterface):
         """
         if not data:
             return
+        self.add_rows([self._adapter.from_model(model) for model in data])
 
-        inputs = [self._adapter.from_model(model) for model in data]
-        if not self._has_header():
-            self._write_header()
+    def add_rows(self, inputs: list[dict]) -> None:
+        """行データ（カラム名 -> 値）をCSVに追記する。
 
-        with open(self._path, encoding="utf-8", mode="a", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=self._header)
-            writer.writerows(inputs)
+        Args:
+            inputs: 追記する行データのリスト。
+        """
+        if not inputs:
+            return
+
+        identity = self._file_identity()
+        cache_was_valid = self._is_cache_valid(identity)
+        # 空でないファイルのヘッダーは、前回の確認以降に変更された場合だけ読み直す
+        if identity is not None and identity[2] > 0 and _HEADER_STATES.get(self._path) != identity:
+            self._ensure_header()
+        # 追記前にインデックスがCSVと一致していることを確認する
+        self._with_index(lambda index: index.ensure_fresh())
+
+        offsets, identity = self._append(inputs, write_header=identity is None or identity[2] == 0)
+        _HEADER_STATES[self._path] = identity
         info("Added data to CSV file: {}", self._path)
 
+        if cache_was_valid:
+            # CSVから読み直した場合と同じ形（全カラムの文字列）でキャッシュに追加する
+            self._row_cache.rows.extend(
+                {column: "" if row.get(column) is None else str(row[column]) for column in self._header}
+                for row in inputs
+            )
+            self._row_cache.signature = identity[1:]
+        elif self._row_cache is not None:
+            self._row_cache.rows = None
+
+        entries = [
+            (row["id"], offset, row)
+            for row, offset in zip(inputs, offsets)
+            if row.get("id") is not None
+        ]
+        self._with_index(lambda index: index.append(entries))
+
+    def _append(self, inputs: list[dict], write_header: bool) -> tuple[list[int], tuple[int, int, int]]:
+        """行をファイル末尾に1回のオープンで書き込む。
+
+        新規・空のファイルには同じファイルハンドルでヘッダーから書き込む。
+
+        Args:
+            inputs: 書き込む行データ。
+            write_header: ヘッダーを先に書き込むか（非圧縮の場合は書き込み位置で判定する）。
+
+        Returns:
+            tuple[list[int], tuple[int, int, int]]:
+                (各行のバイトオフセット（圧縮時は空）, 書き込み後のファイルの (inode, 更新時刻, サイズ))
+        """
+        if self._compression is not None:
+            with self._open_text("a") as f:
+                writer = csv.DictWriter(f, fieldnames=self._header)
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(inputs)
+            return [], self._file_identity()
+
+        with open(self._path, mode="ab") as f:
+            position = f.tell()
+            recorder = _OffsetRecorder(f, position)
+            writer = csv.DictWriter(recorder, fieldnames=self._header)
+            if position == 0:
+                writer.writeheader()
+                recorder.offsets.clear()
+            writer.writerows(inputs)
+            f.flush()
+            stat = os.fstat(f.fileno())
+        return recorder.offsets, (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def find_keys(self) -> dict[tuple, int]:
+        """重複チェック用の複合キーとIDのマッピングを取得する。
+
+        キーインデックスが有効な場合はCSVをパースせずにインデックスから取得する。
+
+        Returns:
+            dict[tuple, int]: 複合キー -> ID。空文字のカラムはNoneになる。
+
+        Raises:
+            ValueError: key_columnsが設定されていない場合。
+        """
+        if not self._key_columns:
+            raise ValueError(f"key_columns is not configured: {self._path}")
+        keys = self._with_index(lambda index: index.items())
+        if keys is not None:
+            return keys
+
+        keys = {}
+        for record in self.iter_all(columns=["id", *self._key_columns]):
+            try:
+                key = tuple(record.get(column) or None for column in self._key_columns)
+                keys[key] = int(record["id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return keys
+
     def delete_by_id(self, id_: int) -> None:
         """指定されたIDのデータを削除する（未実装）。
 
@@ -119,14 +409,12 @@ class CsvBaseRepository(BaseRepositoryInterface):
         Returns:
             int: 次に使用するID。データが存在しない場合は1。
         """
-        records = self.all()
-        if not records:
-            return 1
-        try:
-            max_id = max(int(record["id"]) for record in records if record.get("id"))
+        max_id = self._with_index(lambda index: index.max_id())
+        if max_id is not None:
             return max_id + 1
-        except (ValueError, KeyError):
-            return 1
+
+        max_id = self.load_table(["id"]).max("id")
+        return 1 if max_id is None else max_id + 1
 
     def _has_header(self) -> bool:
         """CSVファイルに正しいヘッダーが存在するか確認する。
@@ -136,7 +424,7 @@ class CsvBaseRepository(BaseRepositoryInterface):
         """
         if not os.path.isfile(self._path):
             return False
-        with open(self._path, encoding="utf-8", mode="r") as f:
+        with self._open_text("r") as f:
             reader = csv.DictReader(f)
             header = reader.fieldnames
             if header is None:
@@ -148,9 +436,105 @@ class CsvBaseRepository(BaseRepositoryInterface):
                 return False
         return True
 
+    def _rebuild_snapshot(self) -> ColumnarTable:
+        """CSVを読み込んでスナップショットを作り直す。
+
+        スナップショットは高速化のためのものなので、書き込みに失敗した場合は警告だけ出す。
+
+        Returns:
+            ColumnarTable: CSVから読み込んだテーブル。
+        """
+        # 読み込み中にCSVが変わった場合は、次回に古いと判定されて作り直される
+        signature = self._snapshot.csv_signature()
+        table = ColumnarTable.from_rows(self.iter_all(columns=list(self._column_types)), self._column_types)
+        if signature is not None:
+            try:
+                self._snapshot.write(table, signature)
+            except OSError as exc:
+                warn("Failed to write snapshot for {}: {}", self._path, exc)
+        return table
+
+    def _is_cache_valid(self, identity: tuple[int, int, int] | None = None) -> bool:
+        """キャッシュがファイルの現在の状態と一致しているか判定する。
+
+        Args:
+            identity: 取得済みのファイルの (inode, 更新時刻, サイズ)。Noneの場合はファイルから取得する。
+        """
+        if self._row_cache is None or self._row_cache.rows is None:
+            return False
+        signature = identity[1:] if identity else self._file_signature()
+        return self._row_cache.signature == signature
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        """ファイルの (更新時刻, サイズ)。ファイルが存在しない場合はNone。"""
+        identity = self._file_identity()
+        return identity[1:] if identity else None
+
+    def _file_identity(self) -> tuple[int, int, int] | None:
+        """ファイルの (inode, 更新時刻, サイズ)。ファイルが存在しない場合はNone。"""
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _with_index(self, operation):
+        """キーインデックスに対する操作を実行する。
+
+        インデックスは高速化のためのものなので、失敗した場合は警告を出して
+        このインスタンスでは無効化し、CSVを直接読む処理にフォールバックする。
+
+        Args:
+            operation: インデックスを受け取る関数。
+
+        Returns:
+            operationの戻り値。インデックスが無効な場合はNone。
+        """
+        if self._index is None:
+            return None
+        try:
+            return operation(self._index)
+        except (sqlite3.Error, OSError) as exc:
+            warn("Disabled key index for {}: {}", self._path, exc)
+            self._index.close()
+            self._index = None
+            return None
+
+    def _open_text(self, mode: str, newline: str | None = None):
+        """CSVファイルをテキストとして開く（圧縮設定に応じて展開・圧縮する）。"""
+        if self._compression is not None:
+            return open_compressed_text(self._path, mode, self._compression)
+        return open(self._path, encoding="utf-8", mode=mode, newline=newline)
+
     def _write_header(self) -> None:
         """CSVファイルにヘッダーを書き込む。"""
-        with open(self._path, encoding="utf-8", mode="w", newline="") as file:
+        with self._open_text("w", newline="") as file:
             writer = csv.DictWriter(file, fieldnames=self._header)
             writer.writeheader()
+        identity = self._file_identity()
+        if identity is not None:
+            _HEADER_STATES[self._path] = identity
         info("Wrote header to CSV file: {}. Header: {}", self._path, self._header)
+
+
+class _OffsetRecorder:
+    """csv.writerの書き込み先として、各行のバイトオフセットを記録するラッパー。
+
+    csv.writerは1行につき1回write()を呼ぶため、呼び出し時点の位置が行の先頭になる。
+
+    Args:
+        file: バイナリモードで開いたファイル。
+        position: 書き込み開始位置。
+    """
+
+    def __init__(self, file, position: int):
+        self._file = file
+        self._position = position
+        self.offsets: list[int] = []
+
+    def write(self, text: str) -> None:
+        """行を書き込み、その先頭位置を記録する。"""
+        data = text.encode("utf-8")
+        self.offsets.append(self._position)
+        self._file.write(data)
+        self._position += len(data)
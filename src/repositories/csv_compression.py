@@ -0,0 +1,62 @@
+"""repositories.csv_compression"""
+#########################################################
+# Builtin packages
+#########################################################
+import gzip
+import io
+from typing import IO
+
+#########################################################
+# 3rd party packages
+#########################################################
+try:
+    import zstandard
+except ImportError:  # zstdはオプション
+    zstandard = None
+
+#########################################################
+# Own packages
+#########################################################
+# (None)
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def validate_compression(compression: str | None) -> None:
+    """圧縮形式が使用可能か確認する。
+
+    Args:
+        compression: "gzip", "zstd" または None。
+
+    Raises:
+        ValueError: 未知の圧縮形式、またはzstandardがインストールされていないのにzstdを指定した場合。
+    """
+    if compression is None:
+        return
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Expected one of {COMPRESSIONS}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+
+
+def open_compressed_text(path: str, mode: str, compression: str) -> IO[str]:
+    """圧縮されたCSVをテキストとして開く。
+
+    追記（"a"）は独立した gzip メンバー / zstd フレームとしてファイル末尾に書き込むため、
+    既存の内容は書き換えない。読み込み（"r"）は全メンバー / フレームを続けて展開しながら返す。
+
+    Args:
+        path: ファイルパス。
+        mode: "r", "w", "a" のいずれか。
+        compression: "gzip" または "zstd"。
+
+    Returns:
+        IO[str]: UTF-8のテキストストリーム（newline=""）。
+    """
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    if mode == "r":
+        raw = open(path, mode="rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return zstandard.open(path, mode + "t", encoding="utf-8", newline="")
@@ -0,0 +1,250 @@
+"""repositories.csv_key_index"""
+#########################################################
+# Builtin packages
+#########################################################
+import csv
+import json
+import os
+import sqlite3
+from typing import Iterator
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import info, warn
+
+INDEX_SUFFIX = ".idx.sqlite3"
+QUERY_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS rows (
+    id INTEGER PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    key TEXT
+);
+"""
+
+
+class CsvKeyIndex:
+    """CSVファイルの横に置く永続キーインデックス（SQLite）。
+
+    重複チェック用の複合キー、最大ID、各行のバイトオフセットを保持し、
+    起動時にCSV全体をパースせずに既存データのキーを取得できるようにする。
+    CSVのサイズ・更新時刻を記録しておき、手動編集などでずれた場合は再構築する。
+
+    Args:
+        csv_path: 対象のCSVファイルパス。
+        key_columns: 複合キーを構成するカラム名のリスト。
+    """
+
+    def __init__(self, csv_path: str, key_columns: list[str]):
+        self._csv_path = csv_path
+        self._path = csv_path + INDEX_SUFFIX
+        self._key_columns = list(key_columns)
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def path(self) -> str:
+        """インデックスファイルのパス"""
+        return self._path
+
+    def items(self) -> dict[tuple, int]:
+        """複合キーからIDへのマッピングを取得する。
+
+        Returns:
+            dict[tuple, int]: 複合キー -> ID。空文字のカラムはNoneになる。
+        """
+        self.ensure_fresh()
+        cursor = self._connect().execute("SELECT key, id FROM rows")
+        return {tuple(json.loads(key)): id_ for key, id_ in cursor}
+
+    def max_id(self) -> int | None:
+        """最大IDを取得する。
+
+        Returns:
+            int | None: 最大ID。データが存在しない場合はNone。
+        """
+        self.ensure_fresh()
+        return self._connect().execute("SELECT MAX(id) FROM rows").fetchone()[0]
+
+    def offset_of(self, id_: int) -> int | None:
+        """指定されたIDの行のバイトオフセットを取得する。
+
+        Args:
+            id_: 対象のID。
+
+        Returns:
+            int | None: バイトオフセット。見つからない場合はNone。
+        """
+        self.ensure_fresh()
+        row = self._connect().execute("SELECT offset FROM rows WHERE id = ?", (int(id_),)).fetchone()
+        return row[0] if row else None
+
+    def offsets_of(self, ids: list[int]) -> dict[int, int]:
+        """複数IDの行のバイトオフセットをまとめて取得する。
+
+        Args:
+            ids: 対象のIDのリスト。
+
+        Returns:
+            dict[int, int]: ID -> バイトオフセット。見つからないIDは含まない。
+        """
+        self.ensure_fresh()
+        conn = self._connect()
+        ids = [int(id_) for id_ in ids]
+        offsets = {}
+        # SQLiteのプレースホルダ数の上限を超えないよう分割して問い合わせる
+        for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+            chunk = ids[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(f"SELECT id, offset FROM rows WHERE id IN ({placeholders})", chunk)
+            offsets.update(dict(cursor))
+        return offsets
+
+    def append(self, entries: list[tuple[int, int, dict]]) -> None:
+        """CSVに追記した行をインデックスに反映する。
+
+        add() の直前に ensure_fresh() が呼ばれている前提で、追記後のCSVの状態を記録する。
+
+        Args:
+            entries: (ID, バイトオフセット, 行データ) のリスト。
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows (id, offset, key) VALUES (?, ?, ?)",
+                [(int(id_), offset, self._encode_key(row)) for id_, offset, row in entries]
+            )
+            self._write_signature(conn)
+
+    def ensure_fresh(self) -> None:
+        """インデックスがCSVと一致しているか確認し、ずれていれば再構築する。"""
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM meta WHERE name = 'signature'").fetchone()
+        if row is None or row[0] != self._signature():
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """CSVを一度だけ走査してインデックスを再構築する。"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM rows")
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows (id, offset, key) VALUES (?, ?, ?)",
+                self._scan_csv()
+            )
+            self._write_signature(conn)
+        info("Rebuilt key index: {}", self._path)
+
+    def close(self) -> None:
+        """SQLite接続を閉じる。"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """SQLiteに接続する（初回のみスキーマを作成する）。"""
+        if self._conn is None:
+            conn = sqlite3.connect(self._path)
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _scan_csv(self) -> Iterator[tuple[int, int, str]]:
+        """CSVを走査して (ID, バイトオフセット, キー) を返す。"""
+        if not os.path.isfile(self._csv_path):
+            return
+        for offset, row in iter_rows_with_offset(self._csv_path):
+            try:
+                id_ = int(row.get("id"))
+            except (TypeError, ValueError):
+                warn("Skipped row without valid id in {}: {}", self._csv_path, row)
+                continue
+            yield id_, offset, self._encode_key(row)
+
+    def _encode_key(self, row: dict) -> str:
+        """行データから複合キーをJSON文字列にする。"""
+        values = [row.get(column) for column in self._key_columns]
+        return json.dumps([None if v in (None, "") else str(v) for v in values], ensure_ascii=False)
+
+    def _signature(self) -> str:
+        """CSVの状態を表す文字列（サイズ・更新時刻・キー定義）。"""
+        if os.path.isfile(self._csv_path):
+            stat = os.stat(self._csv_path)
+            state = f"{stat.st_size}:{stat.st_mtime_ns}"
+        else:
+            state = "missing"
+        return f"{state}:{','.join(self._key_columns)}"
+
+    def _write_signature(self, conn: sqlite3.Connection) -> None:
+        """現在のCSVの状態をメタ情報として記録する。"""
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('signature', ?)",
+            (self._signature(),)
+        )
+
+
+def iter_rows_with_offset(path: str) -> Iterator[tuple[int, dict]]:
+    """CSVの各行をバイトオフセット付きで返す。
+
+    ダブルクォート内の改行を含む行にも対応するため、csv.readerに1行ずつ渡しながら
+    レコードの先頭位置を記録する。
+
+    Args:
+        path: CSVファイルパス。
+
+    Yields:
+        tuple[int, dict]: (レコード先頭のバイトオフセット, 行データ)。
+    """
+    position = 0
+
+    def lines(file) -> Iterator[str]:
+        nonlocal position
+        for raw in file:
+            position += len(raw)
+            yield raw.decode("utf-8")
+
+    with open(path, mode="rb") as f:
+        reader = csv.reader(lines(f))
+        header = next(reader, None)
+        if header is None:
+            return
+        start = position
+        for values in reader:
+            if values:
+                yield start, dict(zip(header, values))
+            start = position
+
+
+def read_rows_at(path: str, offsets: list[int]) -> list[dict]:
+    """指定したバイトオフセットから1レコードずつ読み込む。
+
+    オフセットの昇順に1回のファイルオープンで読み込む。
+
+    Args:
+        path: CSVファイルパス。
+        offsets: レコード先頭のバイトオフセット。
+
+    Returns:
+        list[dict]: offsetsと同じ順の行データ。
+    """
+    rows = {}
+    with open(path, mode="rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]), None)
+        if header is None:
+            return []
+        for offset in sorted(set(offsets)):
+            f.seek(offset)
+            lines = (raw.decode("utf-8") for raw in iter(f.readline, b""))
+            values = next(csv.reader(lines), None)
+            rows[offset] = dict(zip(header, values)) if values else None
+    return [rows[offset] for offset in offsets]
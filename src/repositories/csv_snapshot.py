@@ -0,0 +1,220 @@
+"""repositories.csv_snapshot"""
+#########################################################
+# Builtin packages
+#########################################################
+import json
+import mmap
+import os
+import struct
+
+#########################################################
+# 3rd party packages
+#########################################################
+import numpy as np
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import info, warn
+from repositories.columnar_table import ColumnarTable, DATETIME_UNIT
+
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_MAGIC = b"IKSNAP01"
+SNAPSHOT_VERSION = 1
+PREAMBLE = struct.Struct("<8sQ")
+ALIGNMENT = 8
+# strカラムの欠損値を表す長さ
+STR_NA_LENGTH = np.iinfo(np.uint32).max
+
+
+class CsvSnapshot:
+    """CSVの横に置くバイナリスナップショット。
+
+    ColumnarTableを固定長のNumPy構造化配列と文字列ヒープとして1つのファイルに書き出し、
+    次回はmmapで開いてコピーせずに読み込む。
+    スナップショットには作成時のCSVのサイズ・更新時刻を記録し、CSVと一致しない場合は使わない。
+
+    ファイル構成:
+        マジック(8) + ヘッダー長(8) + ヘッダー(JSON) + 構造化配列 + 文字列ヒープ（UTF-8）
+        strカラムは構造化配列にヒープ内の (オフセット, 長さ) として格納する。
+
+    Args:
+        csv_path: 対象のCSVファイルパス。
+        schema: カラム名 -> ColumnarTableのカラムの種類。
+    """
+
+    def __init__(self, csv_path: str, schema: dict[str, str]):
+        self._csv_path = csv_path
+        self._path = csv_path + SNAPSHOT_SUFFIX
+        self._schema = dict(schema)
+        self._dtype = _record_dtype(self._schema)
+
+    @property
+    def path(self) -> str:
+        """スナップショットファイルのパス"""
+        return self._path
+
+    def is_fresh(self) -> bool:
+        """スナップショットがCSVの現在の状態と一致しているか判定する。"""
+        header = self._read_header()
+        return header is not None and header["signature"] == self.csv_signature()
+
+    def load(self) -> ColumnarTable | None:
+        """スナップショットをmmapで開いてテーブルとして読み込む。
+
+        int / datetime / category カラムはmmap上の配列をそのまま参照する。
+
+        Returns:
+            ColumnarTable | None: テーブル。スナップショットがない・古い・壊れている場合はNone。
+        """
+        try:
+            with open(self._path, mode="rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            header = _parse_header(buffer, self._schema)
+            if header is None or header["signature"] != self.csv_signature():
+                return None
+            records = np.frombuffer(buffer, dtype=self._dtype, count=header["rows"],
+                                    offset=header["records_offset"])
+            heap = memoryview(buffer)[header["heap_offset"]:]
+            columns = {}
+            for column, kind in self._schema.items():
+                if kind == "str":
+                    columns[column] = _decode_strings(records[f"{column}.offset"],
+                                                      records[f"{column}.length"], heap)
+                else:
+                    columns[column] = records[column]
+            return ColumnarTable(columns, self._schema, header["categories"])
+        except (KeyError, TypeError, ValueError) as exc:
+            warn("Ignored broken snapshot {}: {}", self._path, exc)
+            return None
+
+    def write(self, table: ColumnarTable, signature: list[int]) -> None:
+        """テーブルをスナップショットとして書き出す。
+
+        書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える。
+
+        Args:
+            table: schemaの全カラムを持つテーブル。
+            signature: テーブルを読み込む直前のCSVの [サイズ, 更新時刻]。
+        """
+        records = np.zeros(len(table), dtype=self._dtype)
+        heap = bytearray()
+        categories = {}
+        for column, kind in self._schema.items():
+            if kind == "str":
+                offsets, lengths = records[f"{column}.offset"], records[f"{column}.length"]
+                for i, value in enumerate(table.column(column).tolist()):
+                    if value is None:
+                        lengths[i] = STR_NA_LENGTH
+                        continue
+                    data = value.encode("utf-8")
+                    offsets[i] = len(heap)
+                    lengths[i] = len(data)
+                    heap += data
+            else:
+                records[column] = table.column(column)
+                if kind == "category":
+                    categories[column] = table.categories(column)
+
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "signature": list(signature),
+            "schema": self._schema,
+            "rows": len(table),
+            "categories": categories,
+        }
+        header_bytes = _encode_header(header, records.nbytes)
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(tmp_path, mode="wb") as f:
+            f.write(header_bytes)
+            f.write(records.tobytes())
+            f.write(heap)
+        os.replace(tmp_path, self._path)
+        info("Wrote snapshot: {} ({} rows)", self._path, len(table))
+
+    def _read_header(self) -> dict | None:
+        """スナップショットのヘッダーだけを読み込む。"""
+        try:
+            with open(self._path, mode="rb") as f:
+                preamble = f.read(PREAMBLE.size)
+                if len(preamble) < PREAMBLE.size:
+                    return None
+                magic, length = PREAMBLE.unpack(preamble)
+                if magic != SNAPSHOT_MAGIC:
+                    return None
+                return _validate_header(f.read(length), self._schema)
+        except OSError:
+            return None
+
+    def csv_signature(self) -> list[int] | None:
+        """CSVの [サイズ, 更新時刻]。ファイルが存在しない場合はNone。"""
+        try:
+            stat = os.stat(self._csv_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+
+def _record_dtype(schema: dict[str, str]) -> np.dtype:
+    """スキーマから構造化配列のdtypeを作成する。"""
+    fields = []
+    for column, kind in schema.items():
+        if kind == "int":
+            fields.append((column, "<i8"))
+        elif kind == "datetime":
+            fields.append((column, "<" + DATETIME_UNIT.replace("datetime64", "M8")))
+        elif kind == "category":
+            fields.append((column, "<i4"))
+        else:
+            fields += [(f"{column}.offset", "<u8"), (f"{column}.length", "<u4")]
+    return np.dtype(fields)
+
+
+def _encode_header(header: dict, records_size: int) -> bytes:
+    """ヘッダーをエンコードし、構造化配列とヒープの開始位置を書き込む。
+
+    開始位置を書き込むとヘッダー長が変わるため、長さが確定するまで繰り返す。
+    """
+    records_offset = 0
+    while True:
+        header["records_offset"] = records_offset
+        header["heap_offset"] = records_offset + records_size
+        body = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        end = PREAMBLE.size + len(body)
+        aligned = -(-end // ALIGNMENT) * ALIGNMENT
+        if aligned == records_offset:
+            return PREAMBLE.pack(SNAPSHOT_MAGIC, len(body)) + body + b" " * (aligned - end)
+        records_offset = aligned
+
+
+def _parse_header(buffer, schema: dict[str, str]) -> dict | None:
+    """mmapしたスナップショットからヘッダーを読み込む。"""
+    if len(buffer) < PREAMBLE.size:
+        return None
+    magic, length = PREAMBLE.unpack_from(buffer, 0)
+    if magic != SNAPSHOT_MAGIC:
+        return None
+    return _validate_header(buffer[PREAMBLE.size:PREAMBLE.size + length], schema)
+
+
+def _validate_header(body: bytes, schema: dict[str, str]) -> dict | None:
+    """ヘッダーを読み込み、バージョンとスキーマが一致する場合だけ返す。"""
+    try:
+        header = json.loads(body)
+    except ValueError:
+        return None
+    if header.get("version") != SNAPSHOT_VERSION or header.get("schema") != schema:
+        return None
+    return header
+
+
+def _decode_strings(offsets: np.ndarray, lengths: np.ndarray, heap: memoryview) -> np.ndarray:
+    """ヒープ内の (オフセット, 長さ) から文字列のobject配列を作成する。"""
+    values = np.empty(len(offsets), dtype=object)
+    for i, (offset, length) in enumerate(zip(offsets.tolist(), lengths.tolist())):
+        values[i] = None if length == STR_NA_LENGTH else str(heap[offset:offset + length], "utf-8")
+    return values
@@ -2,7 +2,8 @@
 #########################################################
 # Builtin packages
 #########################################################
-import time
+import re
+from typing import Iterable
 
 #########################################################
 # 3rd party packages
@@ -17,18 +18,31 @@ from common.decorator import gss_module
 from common.exceptions import (MyGssException,
                                MyGssInvalidArgumentException,
                                MyGssResourceExhaustedException)
-from common.google_spreadsheet import GssAccessor
+from common.google_spreadsheet import gss_rate_limiter, spreadsheet_registry
 from common.log import warn, info, debug
 from models import Model
 from repositories import BaseRepositoryInterface
 
 
 CONFIG = Config().config
-IS_OFFLINE = CONFIG["APP"]["OFFLINE"]
+IS_OFFLINE = CONFIG.getboolean("APP", "OFFLINE", fallback=False)
+
+# (スプレッドシートのキー, シート名) -> 次にデータを書き込む行番号
+_ROW_CURSORS: dict[tuple[str, str], int] = {}
+
+_INT_PATTERN = re.compile(r"^-?\d+$")
+_FLOAT_PATTERN = re.compile(r"^-?\d+\.\d+$")
 
 
 class GSSBase(BaseRepositoryInterface):
-    """Googleスプレッドシートの基本操作（CRUD）を提供するベースクラス"""
+    """Googleスプレッドシートの基本操作（CRUD）を提供するベースクラス
+
+    APIを呼ぶ前にプロセス全体で共有するレートリミッターからトークンを取得し、
+    クォータに余裕がある間は待たずにリクエストする。
+    次に書き込む行はシートごとにカーソルとして保持し、1列目の取得は初回とエラーの後だけ行う。
+    スプレッドシート・シート・ヘッダー行は共有のレジストリから取得し、最初の書き込みまで接続しない。
+    all() はシート全体を1回で読み込み、idをキーにしたスナップショットとして保持する。
+    """
 
     def __init__(self, sheet_key: str, sheet_name: str, columns: list, adapter):
         self.sheet_key = sheet_key
@@ -36,28 +50,112 @@ class GSSBase(BaseRepositoryInterface):
         self.columns = columns
         self.adapter = adapter
         self.worksheet = None
-
-        if not IS_OFFLINE:
-            self.gss = GssAccessor()
-            self.update_sheet_name(sheet_name)
+        self.rate_limiter = gss_rate_limiter()
+        self.registry = spreadsheet_registry()
+        # id -> (行番号, 行データ)。all() で作成する
+        self.snapshot: dict[str, tuple[int, dict]] | None = None
 
     @gss_module
     def update_sheet_name(self, sheet_name: str):
-        workbook = self.gss.connection.open_by_key(self.sheet_key)
         try:
-            self.worksheet = workbook.worksheet(sheet_name)
+            self.worksheet = self.registry.worksheet(self.sheet_key, sheet_name)
         except gspread.exceptions.WorksheetNotFound as exp:
             warn("sheet doens't exist.: {0}", sheet_name)
             raise exp
+        except gspread.exceptions.APIError as exc:
+            self.__handle_error(exc)
+        self.sheet_name = sheet_name
 
         if not self.__has_columns():
             self.__write_columns()
 
-    def all(self) -> list:
-        pass
+    def open_worksheet(self) -> None:
+        """シートを開く（初回の書き込み時に呼ばれ、2回目以降は何もしない）"""
+        if self.worksheet is None:
+            self.update_sheet_name(self.sheet_name)
 
-    def find_by_id(self, id_: int) -> dict:
-        pass
+    @gss_module
+    def all(self) -> list[dict]:
+        """シートの全データを1回のリクエストで取得し、idをキーにしたスナップショットを作り直す
+
+        シートの最終行がわかるため、行カーソルも合わせて更新する
+
+        Returns:
+            list[dict]: ヘッダー行のカラム名 -> 値（文字列）の辞書のリスト
+        """
+        if IS_OFFLINE:
+            warn("reading function doesn't work since it's offline mode")
+            return []
+
+        self.open_worksheet()
+        try:
+            self.rate_limiter.acquire()
+            values = self.worksheet.get_all_values()
+        except gspread.exceptions.APIError as exc:
+            self.__handle_error(exc)
+
+        header = values[0] if values else self.columns
+        records = []
+        snapshot = {}
+        for row_num, row in enumerate(values[1:], start=2):
+            if not any(row):
+                continue
+            record = dict(zip(header, row))
+            records.append(record)
+            id_ = record.get("id")
+            if id_ and id_ not in snapshot:
+                snapshot[id_] = (row_num, record)
+        self.snapshot = snapshot
+        # get_all_values() は末尾の空行を含まない
+        self._set_row_cursor(len(values) + 1 if values else 2)
+        return records
+
+    def find_by_id(self, id_: int) -> dict | None:
+        """スナップショットから指定されたIDのデータを取得する（スナップショットがない場合は作成する）
+
+        Args:
+            id_ (int): 取得するデータのID
+
+        Returns:
+            dict | None: 該当するデータ。見つからない場合はNone
+        """
+        if self.snapshot is None:
+            self.all()
+        found = (self.snapshot or {}).get(str(id_))
+        return found[1] if found else None
+
+    def diff_rows(self, rows: Iterable[dict]) -> tuple[list[list], dict[int, list]]:
+        """ローカルのデータとシートを比較し、追記する行と更新する行を求める
+
+        シート全体を all() で1回読み込んでから比較する。数値は表示形式の違い（"3" と "3.0"）を無視する。
+
+        Args:
+            rows (Iterable[dict]): ローカルのデータ（カラム名 -> 値）
+
+        Returns:
+            tuple[list[list], dict[int, list]]:
+                (シートにないidの行, シートの行番号 -> 内容が異なる行)。行はcolumnsの順の値のリスト。
+                オフラインモードでシートを読めない場合はどちらも空
+        """
+        self.all()
+        if IS_OFFLINE or self.snapshot is None:
+            return [], {}
+        missing = []
+        changed = {}
+        for row in rows:
+            id_ = row.get("id")
+            if id_ in (None, ""):
+                continue
+            values = [_to_sheet_value(row.get(column)) for column in self.columns]
+            found = self.snapshot.get(str(id_))
+            if found is None:
+                missing.append(values)
+                continue
+            row_num, record = found
+            if any(_normalize(value) != _normalize(record.get(column))
+                   for column, value in zip(self.columns, values)):
+                changed[row_num] = values
+        return missing, changed
 
     @gss_module
     def add(self, data: list[Model, ]) -> None:
@@ -81,16 +179,45 @@ class GSSBase(BaseRepositoryInterface):
             input_ = self.adapter.from_model_to_list(model)
             inputs.append(input_)
 
-        row_num = self.__find_next_available_row()
+        if not inputs:
+            return
+
+        self.open_worksheet()
+        row_num = self._take_row_cursor()
         try:
             debug("data: {0}, row_num: {1}", len(inputs), row_num)
+            self.rate_limiter.acquire()
             self.worksheet.insert_rows(inputs, row_num)
         except gspread.exceptions.APIError as exc:
             self.__handle_error(exc)
+        self._set_row_cursor(row_num + len(inputs))
 
     def delete_by_id(self, id_: int) -> None:
         pass
 
+    def _take_row_cursor(self) -> int:
+        """次にデータを書き込む行番号を取得する
+
+        カーソルは書き込みが成功した後に _set_row_cursor() で戻すため、
+        失敗した場合は次回シートの1列目から読み直す
+
+        Returns:
+            int: 次にデータを書き込む行番号
+        """
+        return _ROW_CURSORS.pop(self.__cursor_key(), None) or self.__find_next_available_row()
+
+    def _set_row_cursor(self, row_num: int) -> None:
+        """書き込みが成功した後、次にデータを書き込む行番号を記録する
+
+        Args:
+            row_num (int): 次にデータを書き込む行番号
+        """
+        _ROW_CURSORS[self.__cursor_key()] = row_num
+
+    def _reset_row_cursor(self) -> None:
+        """他の書き込みで末尾の行が変わった場合に、次回シートの1列目から読み直させる"""
+        _ROW_CURSORS.pop(self.__cursor_key(), None)
+
     def __has_columns(self) -> bool:
         """check the sheet has columns or not
 
@@ -98,8 +225,7 @@ class GSSBase(BaseRepositoryInterface):
             bool: the sheet has columns or not
         """
         try:
-            columns = self.worksheet.row_values(1)
-            time.sleep(1)
+            columns = self.registry.header(self.sheet_key, self.sheet_name)
             return bool(columns == self.columns)
         except gspread.exceptions.APIError as exc:
             self.__handle_error(exc)
@@ -107,11 +233,14 @@ class GSSBase(BaseRepositoryInterface):
     def __write_columns(self) -> None:
         """write columns on the sheet
         """
+        # ヘッダー行の挿入で既存の行がずれるため、カーソルを読み直す
+        self._reset_row_cursor()
         try:
+            self.rate_limiter.acquire()
             self.worksheet.insert_row(self.columns, index=1)
+            self.registry.set_header(self.sheet_key, self.sheet_name, self.columns)
             info("added columns in the gss({0}). value: {1}",
                  self.sheet_name, self.columns)
-            time.sleep(1)
         except gspread.exceptions.APIError as exc:
             self.__handle_error(exc)
 
@@ -125,13 +254,18 @@ class GSSBase(BaseRepositoryInterface):
         """
         try:
             # it is a list which contains all data on first column
-            fist_column_data = list(filter(None, self.worksheet.col_values(1)))
-            time.sleep(1)
+            # 途中に空のセルがあっても最後の値の次の行にする（col_valuesは最後の値までを返す）
+            self.rate_limiter.acquire()
+            fist_column_data = self.worksheet.col_values(1)
             available_row = int(len(fist_column_data)) + 1
             return available_row
         except gspread.exceptions.APIError as exc:
             self.__handle_error(exc)
 
+    def __cursor_key(self) -> tuple[str, str]:
+        """行カーソルのキー"""
+        return (self.sheet_key, self.sheet_name)
+
     def __handle_error(self, exc):
         err_status = exc.response.json()["error"]["status"]
 
@@ -141,6 +275,7 @@ class GSSBase(BaseRepositoryInterface):
         if is_sheet_size_err:
             warn("Sheet size is not enough for sheet {0}: {1}: {2}", self.sheet_name, exc.__class__.__name__, exc)
             rows_to_add = 1000
+            self.rate_limiter.acquire()
             self.worksheet.add_rows(rows_to_add)
             info("added {0} rows in the sheet({1})", rows_to_add, self.sheet_name)
             raise MyGssInvalidArgumentException(exc) from exc
@@ -150,3 +285,27 @@ class GSSBase(BaseRepositoryInterface):
         else:
             warn("Gspread API error for sheet {0}: {1}: {2}", self.sheet_name, exc.__class__.__name__, exc)
             raise MyGssException(exc) from exc
+
+
+def _to_sheet_value(value):
+    """CSVの文字列を、モデルから書き込む場合と同じ型の値にする"""
+    if value is None or value == "":
+        return ""
+    if isinstance(value, str):
+        if _INT_PATTERN.match(value):
+            return int(value)
+        if _FLOAT_PATTERN.match(value):
+            return float(value)
+    return value
+
+
+def _normalize(value) -> str:
+    """比較用に値を文字列にする（数値は "3" と "3.0" を同じ値として扱う）"""
+    if value is None:
+        return ""
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return repr(int(number)) if number.is_integer() else repr(number)
@@ -0,0 +1,233 @@
+"""repositories.gss_batch_writer"""
+#########################################################
+# Builtin packages
+#########################################################
+import json
+
+#########################################################
+# 3rd party packages
+#########################################################
+import gspread
+
+#########################################################
+# Own packages
+#########################################################
+from common.decorator import gss_module
+from common.exceptions import MyGssException, MyGssResourceExhaustedException
+from common.log import info, warn
+from models import Model
+from repositories import gss_base
+from repositories.gss_base import GSSBase
+
+# 1回のspreadsheets.batchUpdateで送るデータの上限（Sheets APIの推奨ペイロードは2MBまで）
+MAX_PAYLOAD_BYTES = 2 * 1024 * 1024
+# シートIDや行の区切りなどデータ以外の1行あたりのおおよそのバイト数
+REQUEST_OVERHEAD_BYTES = 64
+
+
+class GssBatchWriter:
+    """同じスプレッドシートの複数シートへの書き込みをまとめて行うクラス
+
+    stage() / stage_rows() で溜めた追記と stage_updates() で溜めた行の更新を、
+    flush() でシートごとの appendCells / updateCells にまとめて spreadsheets.batchUpdate で書き込む。
+    ペイロードが max_payload_bytes を超える場合は複数のリクエストに分ける。
+    追記は行番号を指定しないため、他のプロセスやシートの手動編集で行が増えていても既存の行を上書きしない。
+
+    Usage:
+        writer = GssBatchWriter()
+        writer.stage(gss_book_repository, books)
+        writer.stage(gss_book_log_repository, book_logs)
+        writer.flush()
+
+    Args:
+        max_payload_bytes: 1回のリクエストで送るデータの上限（バイト）。
+    """
+
+    def __init__(self, max_payload_bytes: int = MAX_PAYLOAD_BYTES):
+        self.max_payload_bytes = max_payload_bytes
+        self.requests = 0
+        # リポジトリ -> 追記待ちの行（stageした順）
+        self._pending: dict[GSSBase, list[list]] = {}
+        # リポジトリ -> 行番号 -> 更新待ちの行
+        self._updates: dict[GSSBase, dict[int, list]] = {}
+
+    @property
+    def pending_rows(self) -> int:
+        """書き込み待ちの行数"""
+        return (sum(len(rows) for rows in self._pending.values())
+                + sum(len(rows) for rows in self._updates.values()))
+
+    def stage(self, repository: GSSBase, data: list[Model]) -> None:
+        """追記する行を溜める
+
+        Args:
+            repository: 書き込み先のシートのリポジトリ
+            data: 書き込むデータのリスト
+
+        Raises:
+            ValueError: 溜めている行と異なるスプレッドシートのリポジトリを指定した場合
+        """
+        self.stage_rows(repository, [repository.adapter.from_model_to_list(model) for model in data])
+
+    def stage_rows(self, repository: GSSBase, rows: list[list]) -> None:
+        """追記する行（columnsの順の値のリスト）を溜める
+
+        Args:
+            repository: 書き込み先のシートのリポジトリ
+            rows: 書き込む行のリスト
+
+        Raises:
+            ValueError: 溜めている行と異なるスプレッドシートのリポジトリを指定した場合
+        """
+        if not rows:
+            return
+        self.__check_sheet_key(repository)
+        self._pending.setdefault(repository, []).extend(rows)
+
+    def stage_updates(self, repository: GSSBase, rows: dict[int, list]) -> None:
+        """既存の行を上書きする内容を溜める
+
+        Args:
+            repository: 書き込み先のシートのリポジトリ
+            rows: 行番号 -> columnsの順の値のリスト
+
+        Raises:
+            ValueError: 溜めている行と異なるスプレッドシートのリポジトリを指定した場合
+        """
+        if not rows:
+            return
+        self.__check_sheet_key(repository)
+        self._updates.setdefault(repository, {}).update(rows)
+
+    @gss_module
+    def flush(self) -> int:
+        """溜めた行を書き込む
+
+        追記はシートごとの appendCells で送るため、シートの既存の行を上書きすることはない。
+        spreadsheets.batchUpdate は1リクエスト単位で全体が反映されるか何も反映されないため、
+        失敗した場合は書き込めなかったリクエストの行だけが残り、リトライ時に送り直す。
+
+        Returns:
+            int: 書き込んだ行数
+        """
+        if not self._pending and not self._updates:
+            return 0
+        if gss_base.IS_OFFLINE:
+            warn("batch writing doesn't work since it's offline mode")
+            self._pending.clear()
+            self._updates.clear()
+            return 0
+
+        # (リポジトリ, 行番号, 行) を書き込む順に並べる（追記の行番号はNone）
+        entries = []
+        for repository, rows in self._pending.items():
+            repository.open_worksheet()
+            entries.extend((repository, None, row) for row in rows)
+        for repository, rows in self._updates.items():
+            repository.open_worksheet()
+            entries.extend((repository, row_num, row) for row_num, row in sorted(rows.items()))
+
+        written = 0
+        sheets = {entry[0] for entry in entries}
+        for chunk in self._chunks(entries):
+            spreadsheet = chunk[0][0].worksheet.spreadsheet
+            try:
+                chunk[0][0].rate_limiter.acquire()
+                spreadsheet.batch_update({"requests": _requests(chunk)})
+            except gspread.exceptions.APIError as exc:
+                self.__handle_error(exc)
+            self.requests += 1
+
+            # 書き込めた分を書き込み待ちから取り除く
+            appended: dict[GSSBase, int] = {}
+            for repository, row_num, _ in chunk:
+                if row_num is None:
+                    appended[repository] = appended.get(repository, 0) + 1
+                else:
+                    del self._updates[repository][row_num]
+            for repository, count in appended.items():
+                del self._pending[repository][:count]
+                # 追記した行数だけ末尾がずれるため、GSSBase.add の行カーソルは次回読み直させる
+                repository._reset_row_cursor()
+            written += len(chunk)
+
+        self._pending.clear()
+        self._updates.clear()
+        info("Wrote {} rows to {} sheets in {} requests", written, len(sheets), self.requests)
+        return written
+
+    def _chunks(self, entries: list[tuple]) -> list[list[tuple]]:
+        """書き込む行を、ペイロードの上限ごとのリストに分ける"""
+        chunks = []
+        chunk: list[tuple] = []
+        size = 0
+        for entry in entries:
+            row_size = len(json.dumps(_row_data(entry[2]), ensure_ascii=False).encode("utf-8"))
+            if chunk and size + row_size + REQUEST_OVERHEAD_BYTES > self.max_payload_bytes:
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(entry)
+            size += row_size + REQUEST_OVERHEAD_BYTES
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def __check_sheet_key(self, repository: GSSBase) -> None:
+        """溜めている行と同じスプレッドシートのリポジトリか確認する"""
+        sheet_keys = {pending.sheet_key for pending in [*self._pending, *self._updates]}
+        if sheet_keys and repository.sheet_key not in sheet_keys:
+            raise ValueError(f"All repositories must share one spreadsheet: {repository.sheet_name}")
+
+    def __handle_error(self, exc):
+        """APIのエラーをGSSBaseと同じ例外に変換する"""
+        err_status = exc.response.json()["error"]["status"]
+        if err_status == "RESOURCE_EXHAUSTED":
+            warn("Request quota exceeded for batch writing: {0}: {1}", exc.__class__.__name__, exc)
+            raise MyGssResourceExhaustedException(exc) from exc
+        warn("Gspread API error for batch writing: {0}: {1}", exc.__class__.__name__, exc)
+        raise MyGssException(exc) from exc
+
+
+def _requests(chunk: list[tuple]) -> list[dict]:
+    """spreadsheets.batchUpdate のリクエストを作る
+
+    追記はシートごとに1つの appendCells（シートの最後のデータの次の行に追記し、足りない行は追加される）、
+    更新は同じシートの連続した行を1つの updateCells にまとめる。
+    """
+    requests = []
+    previous = None
+    for repository, row_num, row in chunk:
+        sheet_id = repository.worksheet.id
+        if row_num is None:
+            if previous is not None and previous[0] is repository and previous[1] is None:
+                requests[-1]["appendCells"]["rows"].append(_row_data(row))
+            else:
+                requests.append({"appendCells": {
+                    "sheetId": sheet_id, "rows": [_row_data(row)], "fields": "userEnteredValue"
+                }})
+        elif (previous is not None and previous[0] is repository
+              and previous[1] is not None and previous[1] + 1 == row_num):
+            requests[-1]["updateCells"]["rows"].append(_row_data(row))
+        else:
+            requests.append({"updateCells": {
+                "start": {"sheetId": sheet_id, "rowIndex": row_num - 1, "columnIndex": 0},
+                "rows": [_row_data(row)], "fields": "userEnteredValue"
+            }})
+        previous = (repository, row_num)
+    return requests
+
+
+def _row_data(row: list) -> dict:
+    """行の値をSheets APIのRowDataにする（valueInputOption=RAW と同じく文字列は解釈しない）"""
+    return {"values": [_cell_data(value) for value in row]}
+
+
+def _cell_data(value) -> dict:
+    """値をSheets APIのCellDataにする（Noneと空文字は空のセル）"""
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
@@ -0,0 +1,161 @@
+"""repositories.key_index"""
+#########################################################
+# Builtin packages
+#########################################################
+from typing import Callable, Iterable, Iterator
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+# (None)
+
+
+class KeyIndex:
+    """複合キーをハッシュセットで保持する重複チェック用インデックス。
+
+    リポジトリの全レコードを一度だけ読み込み、キーの存在確認をO(1)で行う。
+    新規レコードにIDを割り当てた際は add() でインデックスを更新する。
+
+    Args:
+        key_columns: 複合キーを構成するカラム名のリスト。
+        converters: カラムごとの型変換関数（例: {"book_id": int}）。
+            CSVから読んだ文字列とorgから得た値の型を揃えるために使う。
+    """
+
+    def __init__(self, key_columns: list[str], converters: dict[str, Callable] | None = None):
+        self._key_columns = tuple(key_columns)
+        self._converters = converters or {}
+        self._keys: set[tuple] = set()
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], key_columns: list[str],
+                     converters: dict[str, Callable] | None = None) -> "KeyIndex":
+        """レコードの一覧からインデックスを作成する。
+
+        Args:
+            records: リポジトリから取得したレコード。
+            key_columns: 複合キーを構成するカラム名のリスト。
+            converters: カラムごとの型変換関数。
+
+        Returns:
+            KeyIndex: 作成したインデックス。
+        """
+        index = cls(key_columns, converters)
+        for record in records:
+            index.add(index.key_of(record))
+        return index
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[tuple], key_columns: list[str],
+                  converters: dict[str, Callable] | None = None) -> "KeyIndex":
+        """複合キーの一覧（永続キーインデックスの内容など）からインデックスを作成する。
+
+        Args:
+            keys: key_columnsと同じ並びの複合キー。
+            key_columns: 複合キーを構成するカラム名のリスト。
+            converters: カラムごとの型変換関数。
+
+        Returns:
+            KeyIndex: 作成したインデックス。
+        """
+        index = cls(key_columns, converters)
+        for key in keys:
+            index.add(index.key_of(dict(zip(key_columns, key))))
+        return index
+
+    @property
+    def key_columns(self) -> tuple[str, ...]:
+        """複合キーを構成するカラム名"""
+        return self._key_columns
+
+    def key_of(self, record: dict) -> tuple:
+        """レコードから複合キーを作成する。
+
+        Args:
+            record: キーを作成するレコード。
+
+        Returns:
+            tuple: 複合キー。
+        """
+        return tuple(self._convert(column, record.get(column)) for column in self._key_columns)
+
+    def add(self, key: tuple) -> None:
+        """キーをインデックスに追加する。
+
+        Args:
+            key: 追加する複合キー。
+        """
+        self._keys.add(key)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _convert(self, column: str, value):
+        """カラムの型変換を行う。空文字はNoneとして扱う。"""
+        if value is None or value == "":
+            return None
+        converter = self._converters.get(column)
+        if converter is None:
+            return value
+        try:
+            return converter(value)
+        except (TypeError, ValueError):
+            return value
+
+
+class PartitionedKeyIndex(KeyIndex):
+    """パーティションごとに既存キーを遅延読み込みする重複チェック用インデックス。
+
+    キーに含まれる日時カラムからパーティションを求め、そのパーティションのキーを
+    初めて確認するときにだけリポジトリから読み込む。orgの新しい月のエントリだけを確認する場合、
+    過去の月のCSVは読まない。
+
+    Args:
+        repository: partition_of() と find_keys(partitions) を持つパーティション分割リポジトリ。
+        key_columns: 複合キーを構成するカラム名のリスト（repositoryのpartition_columnを含む）。
+        converters: カラムごとの型変換関数。
+    """
+
+    def __init__(self, repository, key_columns: list[str], converters: dict[str, Callable] | None = None):
+        super().__init__(key_columns, converters)
+        self._repository = repository
+        self._partition_position = self._key_columns.index(repository.partition_column)
+        self._loaded: set[str] = set()
+
+    @property
+    def loaded_partitions(self) -> set[str]:
+        """既存キーを読み込んだパーティション名"""
+        return set(self._loaded)
+
+    def add(self, key: tuple) -> None:
+        """キーをインデックスに追加する（先にそのパーティションの既存キーを読み込む）。
+
+        Args:
+            key: 追加する複合キー。
+        """
+        self._load(key)
+        super().add(key)
+
+    def __contains__(self, key: tuple) -> bool:
+        self._load(key)
+        return super().__contains__(key)
+
+    def _load(self, key: tuple) -> None:
+        """キーが属するパーティションの既存キーを、未読み込みの場合だけ読み込む。"""
+        partition = self._repository.partition_of(key[self._partition_position])
+        if partition in self._loaded:
+            return
+        self._loaded.add(partition)
+        for existing in self._repository.find_keys(partitions=[partition]):
+            self._keys.add(self.key_of(dict(zip(self._key_columns, existing))))
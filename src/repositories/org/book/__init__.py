@@ -1,4 +1,5 @@
 """repositories"""
 
 from .csv_repository import CsvBookRepository
+from .sqlite_repository import SqliteBookRepository
 from .gss_repository import GssBookRepository
@@ -43,6 +43,19 @@ class CsvBookRepository(CsvBaseRepository):
                 "tags": "tags",
                 "notes": "notes"
             },
-            model_type=Book
+            model_type=Book,
+            key_columns=["title", "url", "created_at"],
+            cached=True,
+            column_types={
+                "id": "int",
+                "title": "str",
+                "created_at": "datetime",
+                "ended_at": "datetime",
+                "scheduled_at": "datetime",
+                "deadline_at": "datetime",
+                "url": "str",
+                "tags": "category"
+            },
+            snapshot=True
         )
         super().__init__(config)
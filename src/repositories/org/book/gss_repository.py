@@ -33,11 +33,3 @@ class GssBookRepository(GSSBase):
         self.sheet_clock_log_name = "BookClockLogs"
         adapter = ModelAdapter(model=Book, key_map=key_map)
         super().__init__(sheet_key=self.sheet_key, sheet_name=self.sheet_name, columns=columns, adapter=adapter)
-
-    def all(self) -> list[Book]:
-        # 仮データを返す
-        return [
-            Book(id=1, title="ゆるストイック", priority="B", effort=3.0, created_at="2025-04-10 10:00", ended_at=None, scheduled_at=None, deadline_at=None, tags=":book:", notes="メモ1"),
-            Book(id=2, title="オブジェクト指向設計", priority="A", effort=5.0, created_at="2025-04-10 11:00", ended_at=None, scheduled_at=None, deadline_at=None, tags=":book:study:", notes="メモ2"),
-            Book(id=3, title="自己管理大全", priority="C", effort=2.0, created_at="2025-04-10 12:00", ended_at=None, scheduled_at=None, deadline_at=None, tags=":book:", notes="メモ3"),
-        ]
\ No newline at end of file
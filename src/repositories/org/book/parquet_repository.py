@@ -0,0 +1,58 @@
+"""repository.org.book.parquet_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import Book
+from repositories.parquet_repository import ParquetRepository, ParquetConfig
+
+
+class ParquetBookRepository(ParquetRepository):
+    """Bookデータをcreated_atの年月で分割したParquetに書き出すリポジトリ。
+
+    ParquetRepositoryを継承し、Book専用のParquetConfigを設定する。
+    """
+
+    def __init__(self):
+        config = ParquetConfig(
+            base_path="/opt/work/src/parquet/org/book/Books",
+            columns=[
+                "id", "title", "effort",
+                "created_at", "ended_at", "scheduled_at",
+                "deadline_at", "url", "tags", "notes"
+            ],
+            key_map={
+                "id": "id",
+                "title": "title",
+                "effort": "effort",
+                "created_at": "created_at",
+                "ended_at": "ended_at",
+                "scheduled_at": "scheduled_at",
+                "deadline_at": "deadline_at",
+                "url": "url",
+                "tags": "tags",
+                "notes": "notes"
+            },
+            model_type=Book,
+            partition_column="created_at",
+            column_types={
+                "id": "int",
+                "title": "str",
+                "created_at": "datetime",
+                "ended_at": "datetime",
+                "scheduled_at": "datetime",
+                "deadline_at": "datetime",
+                "url": "str",
+                "tags": "category"
+            }
+        )
+        super().__init__(config)
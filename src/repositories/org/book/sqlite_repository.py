@@ -0,0 +1,60 @@
+"""repository.org.book.sqlite_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import Book
+from repositories import SqliteBaseRepository, SqliteConfig
+
+
+class SqliteBookRepository(SqliteBaseRepository):
+    """BookデータをSQLiteに保存するリポジトリ。
+
+    SqliteBaseを継承し、Book専用のSqliteConfigを設定する。
+    """
+
+    def __init__(self):
+        config = SqliteConfig(
+            file_name="org.sqlite3",
+            base_path="/opt/work/src/db/org",
+            table_name="books",
+            columns=[
+                "id", "title", "effort",
+                "created_at", "ended_at", "scheduled_at",
+                "deadline_at", "url", "tags", "notes"
+            ],
+            key_map={
+                "id": "id",
+                "title": "title",
+                "effort": "effort",
+                "created_at": "created_at",
+                "ended_at": "ended_at",
+                "scheduled_at": "scheduled_at",
+                "deadline_at": "deadline_at",
+                "url": "url",
+                "tags": "tags",
+                "notes": "notes"
+            },
+            model_type=Book,
+            key_columns=["title", "url", "created_at"],
+            column_types={
+                "id": "int",
+                "title": "str",
+                "created_at": "datetime",
+                "ended_at": "datetime",
+                "scheduled_at": "datetime",
+                "deadline_at": "datetime",
+                "url": "str",
+                "tags": "category"
+            }
+        )
+        super().__init__(config)
@@ -1,5 +1,7 @@
 """repositories"""
 
 from .csv_repository import CsvBookClockLogRepository
+from .partitioned_csv_repository import PartitionedCsvBookClockLogRepository
+from .sqlite_repository import SqliteBookClockLogRepository
 from .gss_repository import GssBookClockLogRepository
 from .gcal_repository import GcalBookClockLogRepository
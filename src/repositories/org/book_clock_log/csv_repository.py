@@ -36,6 +36,16 @@ class CsvBookClockLogRepository(CsvBaseRepository):
                 "clock_end": "clock_end",
                 "duration_min": "duration_min"
             },
-            model_type=BookClockLog
+            model_type=BookClockLog,
+            key_columns=["clock_start", "clock_end", "book_id"],
+            cached=True,
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "clock_start": "datetime",
+                "clock_end": "datetime",
+                "duration_min": "int"
+            },
+            snapshot=True
         )
         super().__init__(config)
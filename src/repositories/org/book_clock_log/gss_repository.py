@@ -26,11 +26,3 @@ class GssBookClockLogRepository(GSSBase):
 
         adapter = ModelAdapter(model=BookClockLog, key_map=key_map)
         super().__init__(sheet_key=self.sheet_key, sheet_name=self.sheet_name, columns=columns, adapter=adapter)
-
-    def all(self) -> list[BookClockLog]:
-        # 仮データを返す
-        return [
-            BookClockLog(id=1, book_id=1, clock_start="2025-04-10 10:00", clock_end="2025-04-10 10:30", duration=30),
-            BookClockLog(id=2, book_id=2, clock_start="2025-04-10 11:00", clock_end="2025-04-10 11:30", duration=30),
-            BookClockLog(id=3, book_id=3, clock_start="2025-04-10 12:00", clock_end="2025-04-10 12:30", duration=30),
-        ]
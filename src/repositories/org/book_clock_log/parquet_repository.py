@@ -0,0 +1,48 @@
+"""repository.org.book_clock_log.parquet_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookClockLog
+from repositories.parquet_repository import ParquetRepository, ParquetConfig
+
+
+class ParquetBookClockLogRepository(ParquetRepository):
+    """BookClockLogデータをclock_startの年月で分割したParquetに書き出すリポジトリ。
+
+    ParquetRepositoryを継承し、BookClockLog専用のParquetConfigを設定する。
+    """
+
+    def __init__(self):
+        config = ParquetConfig(
+            base_path="/opt/work/src/parquet/org/book/BookClockLogs",
+            columns=[
+                "id", "book_id", "clock_start", "clock_end", "duration_min"
+            ],
+            key_map={
+                "id": "id",
+                "book_id": "book_id",
+                "clock_start": "clock_start",
+                "clock_end": "clock_end",
+                "duration_min": "duration_min"
+            },
+            model_type=BookClockLog,
+            partition_column="clock_start",
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "clock_start": "datetime",
+                "clock_end": "datetime",
+                "duration_min": "int"
+            }
+        )
+        super().__init__(config)
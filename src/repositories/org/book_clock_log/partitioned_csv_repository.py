@@ -0,0 +1,51 @@
+"""repository.org.book_clock_log.partitioned_csv_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookClockLog
+from repositories import PartitionedCsvRepository, PartitionedCsvConfig
+
+
+class PartitionedCsvBookClockLogRepository(PartitionedCsvRepository):
+    """BookClockLogデータをclock_startの年月ごとのCSVに保存するリポジトリ。
+
+    PartitionedCsvを継承し、BookClockLog専用のPartitionedCsvConfigを設定する。
+    """
+
+    def __init__(self):
+        config = PartitionedCsvConfig(
+            base_path="/opt/work/src/csv/org/book/BookClockLogs",
+            columns=[
+                "id", "book_id", "clock_start", "clock_end", "duration_min"
+            ],
+            key_map={
+                "id": "id",
+                "book_id": "book_id",
+                "clock_start": "clock_start",
+                "clock_end": "clock_end",
+                "duration_min": "duration_min"
+            },
+            model_type=BookClockLog,
+            partition_column="clock_start",
+            key_columns=["clock_start", "clock_end", "book_id"],
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "clock_start": "datetime",
+                "clock_end": "datetime",
+                "duration_min": "int"
+            },
+            snapshot=True,
+            group_column="book_id"
+        )
+        super().__init__(config)
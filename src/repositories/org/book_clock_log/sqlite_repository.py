@@ -0,0 +1,50 @@
+"""repository.org.book_clock_log.sqlite_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookClockLog
+from repositories import SqliteBaseRepository, SqliteConfig
+
+
+class SqliteBookClockLogRepository(SqliteBaseRepository):
+    """BookClockLogデータをSQLiteに保存するリポジトリ。
+
+    SqliteBaseを継承し、BookClockLog専用のSqliteConfigを設定する。
+    """
+
+    def __init__(self):
+        config = SqliteConfig(
+            file_name="org.sqlite3",
+            base_path="/opt/work/src/db/org",
+            table_name="book_clock_logs",
+            columns=[
+                "id", "book_id", "clock_start", "clock_end", "duration_min"
+            ],
+            key_map={
+                "id": "id",
+                "book_id": "book_id",
+                "clock_start": "clock_start",
+                "clock_end": "clock_end",
+                "duration_min": "duration_min"
+            },
+            model_type=BookClockLog,
+            key_columns=["clock_start", "clock_end", "book_id"],
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "clock_start": "datetime",
+                "clock_end": "datetime",
+                "duration_min": "int"
+            }
+        )
+        super().__init__(config)
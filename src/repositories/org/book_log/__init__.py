@@ -1,5 +1,7 @@
 """repositories"""
 
 from .csv_repository import CsvBookLogRepository
+from .partitioned_csv_repository import PartitionedCsvBookLogRepository
+from .sqlite_repository import SqliteBookLogRepository
 from .gss_repository import GssBookLogRepository
 from .gcal_repository import GcalBookLogRepository
@@ -36,6 +36,16 @@ class CsvBookLogRepository(CsvBaseRepository):
                 "from_status": "from_status",
                 "timestamp": "timestamp"
             },
-            model_type=BookLog
+            model_type=BookLog,
+            key_columns=["state", "from_status", "timestamp", "book_id"],
+            cached=True,
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "state": "category",
+                "from_status": "category",
+                "timestamp": "datetime"
+            },
+            snapshot=True
         )
         super().__init__(config)
@@ -26,11 +26,3 @@ class GssBookLogRepository(GSSBase):
 
         adapter = ModelAdapter(model=BookLog, key_map=key_map)
         super().__init__(sheet_key=self.sheet_key, sheet_name=self.sheet_name, columns=columns, adapter=adapter)
-
-    def all(self) -> list[BookLog]:
-        # 仮データを返す
-        return [
-            BookLog(id=1, book_id=1, state="DONE", from_status="TODO", timestamp="2025-04-10 15:00"),
-            BookLog(id=2, book_id=2, state="DONE", from_status="TODO", timestamp="2025-04-10 16:00"),
-            BookLog(id=3, book_id=3, state="DONE", from_status="TODO", timestamp="2025-04-10 17:00"),
-        ]
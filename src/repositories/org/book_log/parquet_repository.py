@@ -0,0 +1,48 @@
+"""repository.org.book_log.parquet_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookLog
+from repositories.parquet_repository import ParquetRepository, ParquetConfig
+
+
+class ParquetBookLogRepository(ParquetRepository):
+    """BookLogデータをtimestampの年月で分割したParquetに書き出すリポジトリ。
+
+    ParquetRepositoryを継承し、BookLog専用のParquetConfigを設定する。
+    """
+
+    def __init__(self):
+        config = ParquetConfig(
+            base_path="/opt/work/src/parquet/org/book/BookLogs",
+            columns=[
+                "id", "book_id", "state", "from_status", "timestamp"
+            ],
+            key_map={
+                "id": "id",
+                "book_id": "book_id",
+                "state": "state",
+                "from_status": "from_status",
+                "timestamp": "timestamp"
+            },
+            model_type=BookLog,
+            partition_column="timestamp",
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "state": "category",
+                "from_status": "category",
+                "timestamp": "datetime"
+            }
+        )
+        super().__init__(config)
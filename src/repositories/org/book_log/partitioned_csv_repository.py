@@ -0,0 +1,51 @@
+"""repository.org.book_log.partitioned_csv_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookLog
+from repositories import PartitionedCsvRepository, PartitionedCsvConfig
+
+
+class PartitionedCsvBookLogRepository(PartitionedCsvRepository):
+    """BookLogデータをtimestampの年月ごとのCSVに保存するリポジトリ。
+
+    PartitionedCsvを継承し、BookLog専用のPartitionedCsvConfigを設定する。
+    """
+
+    def __init__(self):
+        config = PartitionedCsvConfig(
+            base_path="/opt/work/src/csv/org/book/BookLogs",
+            columns=[
+                "id", "book_id", "state", "from_status", "timestamp"
+            ],
+            key_map={
+                "id": "id",
+                "book_id": "book_id",
+                "state": "state",
+                "from_status": "from_status",
+                "timestamp": "timestamp"
+            },
+            model_type=BookLog,
+            partition_column="timestamp",
+            key_columns=["state", "from_status", "timestamp", "book_id"],
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "state": "category",
+                "from_status": "category",
+                "timestamp": "datetime"
+            },
+            snapshot=True,
+            group_column="book_id"
+        )
+        super().__init__(config)
@@ -0,0 +1,50 @@
+"""repository.org.book_log.sqlite_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from models.org import BookLog
+from repositories import SqliteBaseRepository, SqliteConfig
+
+
+class SqliteBookLogRepository(SqliteBaseRepository):
+    """BookLogデータをSQLiteに保存するリポジトリ。
+
+    SqliteBaseを継承し、BookLog専用のSqliteConfigを設定する。
+    """
+
+    def __init__(self):
+        config = SqliteConfig(
+            file_name="org.sqlite3",
+            base_path="/opt/work/src/db/org",
+            table_name="book_logs",
+            columns=[
+                "id", "book_id", "state", "from_status", "timestamp"
+            ],
+            key_map={
+                "id": "id",
+                "book_id": "book_id",
+                "state": "state",
+                "from_status": "from_status",
+                "timestamp": "timestamp"
+            },
+            model_type=BookLog,
+            key_columns=["state", "from_status", "timestamp", "book_id"],
+            column_types={
+                "id": "int",
+                "book_id": "int",
+                "state": "category",
+                "from_status": "category",
+                "timestamp": "datetime"
+            }
+        )
+        super().__init__(config)
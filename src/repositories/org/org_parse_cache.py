@@ -0,0 +1,129 @@
+"""repositories.org.org_parse_cache"""
+#########################################################
+# Builtin packages
+#########################################################
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass, field
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import warn
+
+# 抽出処理の仕様を変えた場合はバージョンを上げて既存キャッシュを無効にする
+CACHE_VERSION = 3
+
+
+@dataclass
+class OrgFileFingerprint:
+    """Orgファイルの状態を表すフィンガープリント。
+
+    Attributes:
+        path: Orgファイルパス。
+        mtime_ns: 更新時刻（ナノ秒）。
+        size: ファイルサイズ。
+        digest: 内容のSHA-256ハッシュ。未計算の場合はNone。
+    """
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str | None = None
+
+    @classmethod
+    def from_stat(cls, path: str) -> "OrgFileFingerprint":
+        """os.statからフィンガープリントを作成する。"""
+        stat = os.stat(path)
+        return cls(path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+    def same_stat(self, other: "OrgFileFingerprint") -> bool:
+        """パス・更新時刻・サイズが一致するか判定する。"""
+        return (self.path, self.mtime_ns, self.size) == (other.path, other.mtime_ns, other.size)
+
+
+def content_digest(data: bytes) -> str:
+    """ファイル内容のハッシュを計算する。"""
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class OrgCacheEntry:
+    """1ファイル分のキャッシュ内容。
+
+    Attributes:
+        fingerprint: キャッシュ作成時のフィンガープリント。
+        result: ファイル全体のパース結果 (books, book_logs, book_clock_logs)。
+        preamble_digest: プリアンブル（#+TODO などのファイル設定）のハッシュ。
+        subtrees: レベル1見出しのサブツリーのハッシュ -> パース結果。
+        watermarks: 抽出時に使った本ごとのウォーターマーク。
+    """
+    fingerprint: OrgFileFingerprint
+    result: tuple
+    preamble_digest: str | None = None
+    subtrees: dict = field(default_factory=dict)
+    watermarks: dict = field(default_factory=dict)
+
+
+class OrgParseCache:
+    """Orgファイルごとのパース結果キャッシュ。
+
+    パス・更新時刻・サイズが一致すればファイルを読まずに結果を使う。
+    更新時刻だけが変わった場合（touchや保存し直し）は内容のハッシュで判定する。
+    ファイルが変更された場合に備えて、レベル1見出しのサブツリーごとの結果も保持する。
+    結果はpickleで保存する。
+
+    Args:
+        cache_dir: キャッシュファイルを置くディレクトリ。
+    """
+
+    def __init__(self, cache_dir: str):
+        self._cache_dir = cache_dir
+
+    def read(self, org_path: str) -> OrgCacheEntry | None:
+        """キャッシュを読み込む。存在しない・壊れている場合はNoneを返す。
+
+        Args:
+            org_path: Orgファイルパス。
+
+        Returns:
+            OrgCacheEntry | None: キャッシュ内容。
+        """
+        path = self._entry_path(org_path)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, mode="rb") as f:
+                version, entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, ValueError) as exc:
+            warn("Ignored broken org parse cache: {}: {}", path, exc)
+            return None
+        if version != CACHE_VERSION or not isinstance(entry, OrgCacheEntry):
+            return None
+        return entry
+
+    def store(self, entry: OrgCacheEntry) -> None:
+        """キャッシュを保存する。
+
+        Args:
+            entry: digestを計算済みのフィンガープリントを持つキャッシュ内容。
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+        path = self._entry_path(entry.fingerprint.path)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, mode="wb") as f:
+                pickle.dump((CACHE_VERSION, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            warn("Failed to write org parse cache: {}: {}", path, exc)
+
+    def _entry_path(self, org_path: str) -> str:
+        """Orgファイルパスに対応するキャッシュファイルパス。"""
+        name = hashlib.sha1(os.path.abspath(org_path).encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, f"{name}.pickle")
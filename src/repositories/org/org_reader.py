@@ -1,9 +1,33 @@
 """repositories.org.org_reader"""
-from typing import List, Dict, Tuple, Optional
+import copy
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Iterator
 from datetime import datetime
 import orgparse
 from orgparse.node import OrgNode
 from orgparse.date import OrgDate
+from repositories.org.org_parse_cache import (OrgParseCache, OrgCacheEntry,
+                                               OrgFileFingerprint, content_digest)
+from repositories.org.org_splitter import split_level1, select_tagged_subtrees, text_digest
+
+CREATED_AT_DATE_PATTERN = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+CREATED_AT_TIME_PATTERN = re.compile(r"^(\d{1,2}):(\d{1,2})$")
+
+
+def watermarks_cover(stored: Dict, current: Dict) -> bool:
+    """storedのウォーターマークで抽出した結果を、currentのウォーターマークでも使えるか判定する
+
+    ウォーターマークが進んだだけなら、以前の抽出結果は必要なデータをすべて含んでいる。
+    """
+    for key, stored_marks in stored.items():
+        current_marks = current.get(key, (None, None))
+        for stored_mark, current_mark in zip(stored_marks, current_marks):
+            if stored_mark is not None and (current_mark is None or current_mark < stored_mark):
+                return False
+    return True
+
 
 class OrgReader:
     """OrgファイルからBook, BookLog, BookClockLogデータを抽出するReader"""
@@ -13,8 +37,22 @@ class OrgReader:
     EXCLUDED_HEADINGS = {"URL", "Notes"}
     CREATED_AT_PREFIX = "CREATED_AT:"
 
-    def __init__(self, org_file_paths: List[str]):
+    # 合計サイズがこれより小さい場合はプロセスを起動せずに同一プロセスでパースする
+    PARALLEL_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, org_file_paths: List[str], cache_dir: Optional[str] = None,
+                 max_workers: int = 1, parallel_min_bytes: int = PARALLEL_MIN_BYTES):
         self.org_file_paths = org_file_paths
+        # cache_dirを指定すると、変更のないファイルはパースせずにキャッシュを使う
+        self.cache = OrgParseCache(cache_dir) if cache_dir else None
+        # max_workersが2以上の場合、複数ファイルをプロセスプールで並列にパースする
+        self.max_workers = max_workers
+        self.parallel_min_bytes = parallel_min_bytes
+        # 本ごとの保存済みデータの最新時刻（ウォーターマーク）
+        # {(title, url, created_at): (最新のBookLog timestamp, 最新のBookClockLog clock_start)}
+        # これより古いLOGBOOKのエントリは保存済みとみなして抽出しない
+        # （後から古い日時で追記されたエントリも抽出されないため、取り込む場合は空にして読み直す）
+        self.watermarks: Dict[Tuple, Tuple[Optional[str], Optional[str]]] = {}
 
     def load_books(self) -> Tuple[List[Dict], List[Dict], List[Dict]]:
         """Book, BookLog, BookClockLogデータをまとめて取得する"""
@@ -22,29 +60,164 @@ class OrgReader:
         book_logs = []
         book_clock_logs = []
 
-        for path in self.org_file_paths:
-            try:
-                root = orgparse.load(path)
-                for node in root[1:]:
-                    if not self._is_valid_book_node(node):
-                        continue
-
-                    # Bookデータ
-                    book = self._parse_book_node(node)
-                    books.append(book)
+        # 結果はorg_file_pathsの順に結合する（並列時も順序は変わらない）
+        for path, result in zip(self.org_file_paths, self._load_files()):
+            if result is None:
+                print(f"Warning: Org file not found: {path}")
+                continue
+            file_books, file_logs, file_clocks = result
+            books.extend(file_books)
+            book_logs.extend(file_logs)
+            book_clock_logs.extend(file_clocks)
 
-                    # BookLogデータ
-                    book_logs.extend(self._parse_book_logs(node, book))
+        return books, book_logs, book_clock_logs
 
-                    # BookClockLogデータ
-                    book_clock_logs.extend(self._parse_book_clock_logs(node, book))
+    def iter_books(self) -> Iterator[Tuple[Dict, List[Dict], List[Dict]]]:
+        """本のノードごとに (book, book_logs, book_clock_logs) を順に返す
 
+        キャッシュを使わない場合はレベル1見出しのサブツリー単位でパースするため、
+        メモリに載るのは常に1サブツリー分のOrgツリーだけになる。
+        """
+        for path in self.org_file_paths:
+            try:
+                if self.cache is not None:
+                    yield from self._group_by_book(self._load_file(path))
+                else:
+                    yield from self._iter_file(path)
             except FileNotFoundError:
                 print(f"Warning: Org file not found: {path}")
                 continue
 
+    def _iter_file(self, path: str) -> Iterator[Tuple[Dict, List[Dict], List[Dict]]]:
+        """1ファイルをサブツリー単位でパースし、本のノードごとにデータを返す"""
+        with open(path, encoding="utf-8") as f:
+            preamble, subtrees = self._split_book_subtrees(f.read())
+        for subtree in subtrees:
+            root = orgparse.loads(preamble + subtree.text, filename=path)
+            yield from self._iter_root(root)
+
+    def _split_book_subtrees(self, text: str):
+        """Orgテキストをレベル1サブツリーに分割し、本のタグを含むものだけを返す"""
+        preamble, subtrees = split_level1(text)
+        return preamble, select_tagged_subtrees(preamble, subtrees, self.BOOK_TAG)
+
+    def _group_by_book(
+        self, result: Tuple[List[Dict], List[Dict], List[Dict]]
+    ) -> Iterator[Tuple[Dict, List[Dict], List[Dict]]]:
+        """ファイル単位の抽出結果を本ごとにまとめ直す"""
+        books, book_logs, book_clock_logs = result
+        logs_by_book = {id(book): [] for book in books}
+        clocks_by_book = {id(book): [] for book in books}
+        for log in book_logs:
+            logs_by_book[id(log["book"])].append(log)
+        for clock in book_clock_logs:
+            clocks_by_book[id(clock["book"])].append(clock)
+        for book in books:
+            yield book, logs_by_book[id(book)], clocks_by_book[id(book)]
+
+    def _load_files(self) -> List[Optional[Tuple[List[Dict], List[Dict], List[Dict]]]]:
+        """全ファイルのデータをorg_file_pathsの順に取得する。存在しないファイルはNone"""
+        if not self._should_parallelize():
+            return [self._load_file_or_none(path) for path in self.org_file_paths]
+
+        workers = min(self.max_workers, len(self.org_file_paths))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._load_file_or_none, self.org_file_paths))
+
+    def _should_parallelize(self) -> bool:
+        """並列パースするか判定する（小さな入力ではプロセス起動のコストの方が大きい）"""
+        if self.max_workers <= 1 or len(self.org_file_paths) <= 1:
+            return False
+        total_size = sum(
+            os.path.getsize(path) for path in self.org_file_paths if os.path.isfile(path)
+        )
+        return total_size >= self.parallel_min_bytes
+
+    def _load_file_or_none(self, path: str) -> Optional[Tuple[List[Dict], List[Dict], List[Dict]]]:
+        """1ファイル分のデータを取得する。ファイルが存在しない場合はNone"""
+        try:
+            return self._load_file(path)
+        except FileNotFoundError:
+            return None
+
+    def _load_file(self, path: str) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """1ファイル分のデータを取得する（キャッシュがあれば変更箇所だけ再パースする）"""
+        if self.cache is None:
+            with open(path, encoding="utf-8") as f:
+                preamble, subtrees = self._split_book_subtrees(f.read())
+            if not subtrees:
+                return [], [], []
+            text = preamble + "".join(subtree.text for subtree in subtrees)
+            return self._parse_root(orgparse.loads(text, filename=path))
+
+        fingerprint = OrgFileFingerprint.from_stat(path)
+        entry = self.cache.read(path)
+        if entry is not None and not watermarks_cover(entry.watermarks, self.watermarks):
+            # キャッシュ作成時よりウォーターマークが古い（CSVを作り直したなど）場合は使わない
+            entry = None
+        if entry is not None and entry.fingerprint.same_stat(fingerprint):
+            return entry.result
+
+        with open(path, mode="rb") as f:
+            data = f.read()
+        fingerprint.digest = content_digest(data)
+        if entry is not None and entry.fingerprint.digest == fingerprint.digest:
+            entry.fingerprint = fingerprint
+            self.cache.store(entry)
+            return entry.result
+
+        preamble, subtrees = self._split_book_subtrees(data.decode("utf-8"))
+        preamble_digest = text_digest(preamble)
+        previous = {}
+        if entry is not None and entry.preamble_digest == preamble_digest:
+            previous = entry.subtrees
+
+        # 変更のあったサブツリーだけをorgparseに渡す
+        books, book_logs, book_clock_logs = [], [], []
+        current = {}
+        for subtree in subtrees:
+            if subtree.digest in current:
+                # 同じ内容のサブツリーが複数ある場合は、結果を共有しないようにコピーする
+                subtree_result = copy.deepcopy(current[subtree.digest])
+            elif subtree.digest in previous:
+                subtree_result = previous[subtree.digest]
+            else:
+                root = orgparse.loads(preamble + subtree.text, filename=path)
+                subtree_result = self._parse_root(root)
+            current.setdefault(subtree.digest, subtree_result)
+            books.extend(subtree_result[0])
+            book_logs.extend(subtree_result[1])
+            book_clock_logs.extend(subtree_result[2])
+
+        result = (books, book_logs, book_clock_logs)
+        self.cache.store(OrgCacheEntry(fingerprint, result, preamble_digest, current, self.watermarks))
+        return result
+
+    def _parse_root(self, root: OrgNode) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """パース済みのOrgツリーからデータを抽出する"""
+        books = []
+        book_logs = []
+        book_clock_logs = []
+
+        for book, logs, clocks in self._iter_root(root):
+            books.append(book)
+            book_logs.extend(logs)
+            book_clock_logs.extend(clocks)
+
         return books, book_logs, book_clock_logs
 
+    def _iter_root(self, root: OrgNode) -> Iterator[Tuple[Dict, List[Dict], List[Dict]]]:
+        """パース済みのOrgツリーから本のノードごとにデータを返す"""
+        for node in root[1:]:
+            if not self._is_valid_book_node(node):
+                continue
+
+            # Bookデータ
+            book = self._parse_book_node(node)
+
+            # BookLogデータ・BookClockLogデータ
+            yield book, self._parse_book_logs(node, book), self._parse_book_clock_logs(node, book)
+
     def _is_valid_book_node(self, node: OrgNode) -> bool:
         """ノードが本のデータとして有効か判定する"""
         return (
@@ -54,31 +227,62 @@ class OrgReader:
 
     def _parse_book_node(self, node: OrgNode) -> Dict:
         """Bookデータを辞書形式で作成する"""
+        fields = self._extract_node_fields(node)
         return {
             "title": node.heading.strip(),
-            "effort": self._extract_property(node, "Effort"),
+            "effort": fields["effort"],
+            "created_at": fields["created_at"],
+            "ended_at": fields["ended_at"],
+            "scheduled_at": fields["scheduled_at"],
+            "deadline_at": fields["deadline_at"],
+            "url": fields["url"],
+            "tags": ":".join(node.tags) if node.tags else None,
+            "notes": fields["notes"],
+        }
+
+    def _extract_node_fields(self, node: OrgNode) -> Dict:
+        """本のノードに必要な項目を、ボディ行と子ノードをそれぞれ1回だけ走査して抽出する"""
+        child_bodies = {}
+        for child in node.children:
+            heading = child.heading.strip()
+            if heading in self.EXCLUDED_HEADINGS and heading not in child_bodies:
+                child_bodies[heading] = child.body.strip() if child.body else None
+                if len(child_bodies) == len(self.EXCLUDED_HEADINGS):
+                    break
+
+        return {
+            "effort": node.properties.get("Effort"),
             "created_at": self._extract_created_at(node),
             "ended_at": self._format_datetime(node.closed.start),
             "scheduled_at": self._format_datetime(node.scheduled.start),
             "deadline_at": self._format_datetime(node.deadline.start),
-            "url": self._extract_child_body(node, "URL"),
-            "tags": ":".join(node.tags) if node.tags else None,
-            "notes": self._extract_child_body(node, "Notes"),
+            "url": child_bodies.get("URL"),
+            "notes": child_bodies.get("Notes"),
         }
 
     def _parse_book_logs(self, node: OrgNode, book: Dict) -> List[Dict]:
-        """LOGBOOKから状態遷移ログを抽出する"""
+        """LOGBOOKから状態遷移ログを抽出する（ウォーターマークより古いエントリは除く）
+
+        後から古い日時で追記されたエントリもウォーターマークより古ければ除かれる。
+        """
         logs = []
-        for task in node.repeated_tasks:
+        watermark = self._watermark_of(book)[0]
+        tasks = node.repeated_tasks
+        stop_early = watermark is not None and self._is_newest_first([task.start for task in tasks])
+        for task in tasks:
             if not (task.before and task.after):
                 continue
             timestamp = None
             if task.start:
                 timestamp = (
-                    task.start.strftime(self.DATE_FORMAT)
+                    self._format_datetime(task.start)
                     if task.has_time
-                    else task.start.strftime("%Y-%m-%d 00:00")
+                    else self._format_date(task.start)
                 )
+            if watermark is not None and timestamp is not None and timestamp < watermark:
+                if stop_early:
+                    break
+                continue
             logs.append({
                 "state": task.after,
                 "from_status": task.before,
@@ -88,55 +292,84 @@ class OrgReader:
         return logs
 
     def _parse_book_clock_logs(self, node: OrgNode, book: Dict) -> List[Dict]:
-        """LOGBOOKから作業時間ログを抽出する"""
+        """LOGBOOKから作業時間ログを抽出する（ウォーターマークより古いエントリは除く）
+
+        後から古い日時で追記されたCLOCK行もウォーターマークより古ければ除かれる。
+        """
         clocks = []
-        for clock in node.clock:
+        watermark = self._watermark_of(book)[1]
+        node_clocks = node.clock
+        stop_early = watermark is not None and self._is_newest_first([clock.start for clock in node_clocks])
+        for clock in node_clocks:
+            clock_start = self._format_datetime(clock.start)
+            if watermark is not None and clock_start is not None and clock_start < watermark:
+                if stop_early:
+                    break
+                continue
             duration_min = (
                 int(clock.duration.total_seconds() / 60)
                 if clock.duration
                 else None
             )
             clocks.append({
-                "clock_start": self._format_datetime(clock.start),
+                "clock_start": clock_start,
                 "clock_end": self._format_datetime(clock.end),
                 "duration_min": duration_min,
                 "book": book,  # Book情報を保持（book_idを後で解決）
             })
         return clocks
 
-    def _extract_property(self, node: OrgNode, prop: str) -> Optional[str]:
-        """指定されたプロパティを抽出する"""
-        return node.get_property(prop)
+    def _watermark_of(self, book: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """本のウォーターマーク (BookLog, BookClockLog) を取得する"""
+        key = (book["title"], book["url"], book["created_at"])
+        return self.watermarks.get(key, (None, None))
+
+    def _is_newest_first(self, starts: List) -> bool:
+        """LOGBOOKが新しい順に並んでいるか判定する
+
+        orgの既定では新しいエントリが先頭に追加される。古い順に並んでいる場合は
+        途中で打ち切れないため、ウォーターマークより古いエントリを読み飛ばすだけにする。
+        """
+        formatted = [self._format_datetime(start) for start in starts if start]
+        return len(formatted) < 2 or formatted[0] >= formatted[-1]
 
     def _extract_created_at(self, node: OrgNode) -> Optional[str]:
         """CREATED_ATフィールドを抽出する"""
-        if not node.body:
+        body = node.body
+        if not body or self.CREATED_AT_PREFIX not in body:
             return None
-        for line in node.body.splitlines():
+        for line in body.splitlines():
             line = line.strip()
             if line.startswith(self.CREATED_AT_PREFIX):
                 raw_date = line[len(self.CREATED_AT_PREFIX):].strip()
-                # [YYYY-MM-DD Day HH:MM] 形式をパース
-                try:
-                    # ブラケットと曜日を除去
-                    clean_date = raw_date.strip('[]').split()
-                    if len(clean_date) >= 3:
-                        date_str = f"{clean_date[0]} {clean_date[2]}"  # YYYY-MM-DD HH:MM
-                        parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M")
-                        return parsed_date.strftime(self.DATE_FORMAT)
+                # [YYYY-MM-DD Day HH:MM] 形式をパース（ブラケットと曜日を除去）
+                clean_date = raw_date.strip('[]').split()
+                if len(clean_date) < 3:
                     return None
+                date_match = CREATED_AT_DATE_PATTERN.match(clean_date[0])
+                time_match = CREATED_AT_TIME_PATTERN.match(clean_date[2])
+                try:
+                    if not (date_match and time_match):
+                        raise ValueError(raw_date)
+                    parsed_date = datetime(*map(int, date_match.groups() + time_match.groups()))
+                    return self._format_datetime(parsed_date)
                 except ValueError:
                     print(f"Warning: Invalid CREATED_AT format: {raw_date}")
                     return None
         return None
 
-    def _extract_child_body(self, node: OrgNode, title: str) -> Optional[str]:
-        """子ノードのボディを抽出する（URLやNotes）"""
-        for child in node.children:
-            if child.heading.strip() == title:
-                return child.body.strip() if child.body else None
-        return None
+    def _format_datetime(self, value) -> Optional[str]:
+        """日時を DATE_FORMAT（YYYY-MM-DD HH:MM）の文字列に変換する
+
+        strftimeを使わずに固定フォーマットで組み立てる。時刻を持たない日付は00:00とする。
+        """
+        if not value:
+            return None
+        return (
+            f"{value.year:04d}-{value.month:02d}-{value.day:02d} "
+            f"{getattr(value, 'hour', 0):02d}:{getattr(value, 'minute', 0):02d}"
+        )
 
-    def _format_datetime(self, org_date: str) -> Optional[str]:
-        """OrgDateオブジェクトをフォーマットされた文字列に変換する"""
-        return org_date.strftime(self.DATE_FORMAT) if org_date else None
\ No newline at end of file
+    def _format_date(self, value) -> str:
+        """日付部分だけを使い、時刻を00:00として文字列に変換する"""
+        return f"{value.year:04d}-{value.month:02d}-{value.day:02d} 00:00"
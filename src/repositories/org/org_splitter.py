@@ -0,0 +1,117 @@
+"""repositories.org.org_splitter"""
+#########################################################
+# Builtin packages
+#########################################################
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+# (None)
+
+# orgparseと同じく「*」の後に半角スペースが続く行を見出しとみなす
+HEADING_PATTERN = re.compile(r"^\*+ ")
+LEVEL1_HEADING_PATTERN = re.compile(r"^\* ")
+FILETAGS_PATTERN = re.compile(r"^\s*#\+FILETAGS:(.*)$", re.IGNORECASE)
+
+
+@dataclass
+class OrgSubtree:
+    """レベル1見出しから次のレベル1見出しの直前までのテキスト。
+
+    Attributes:
+        start_line: ファイル内の開始行（0始まり）。
+        text: サブツリーのテキスト。
+        digest: テキストのハッシュ。
+    """
+    start_line: int
+    text: str
+    digest: str
+
+
+def text_digest(text: str) -> str:
+    """テキストのハッシュを計算する。"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_level1(text: str) -> Tuple[str, List[OrgSubtree]]:
+    """Orgテキストをプリアンブルとレベル1見出しごとのサブツリーに分割する。
+
+    プリアンブルは最初の見出しより前の行（#+TODO などのファイル設定）で、
+    各サブツリーを単独でパースする際に先頭へ付け加える。
+    最初のレベル1見出しより前にレベル2以下の見出しがある場合は、その部分も1つのサブツリーとする。
+
+    Args:
+        text: Orgファイルの内容。
+
+    Returns:
+        Tuple[str, List[OrgSubtree]]: (プリアンブル, サブツリーのリスト)。
+    """
+    lines = text.splitlines(keepends=True)
+    first_heading = next(
+        (i for i, line in enumerate(lines) if HEADING_PATTERN.match(line)),
+        len(lines)
+    )
+    preamble = "".join(lines[:first_heading])
+
+    starts = [first_heading] if first_heading < len(lines) else []
+    starts += [
+        i for i in range(first_heading + 1, len(lines))
+        if LEVEL1_HEADING_PATTERN.match(lines[i])
+    ]
+
+    subtrees = []
+    for start, end in zip(starts, starts[1:] + [len(lines)]):
+        chunk = "".join(lines[start:end])
+        if not chunk.endswith("\n"):
+            chunk += "\n"
+        subtrees.append(OrgSubtree(start_line=start, text=chunk, digest=text_digest(chunk)))
+    return preamble, subtrees
+
+
+def select_tagged_subtrees(preamble: str, subtrees: List[OrgSubtree], tag: str) -> List[OrgSubtree]:
+    """指定タグの付いた見出しを含むサブツリーだけを返す。
+
+    orgparseに渡す前に行単位で走査し、対象外のサブツリーのパースを省く。
+    タグは子見出しに継承されるため、どこかの見出しにタグがあればサブツリー全体を対象とする。
+    #+FILETAGS でファイル全体にタグが付いている場合は全サブツリーを返す。
+
+    Args:
+        preamble: プリアンブル。
+        subtrees: サブツリーのリスト。
+        tag: 対象のタグ（例: "book"）。
+
+    Returns:
+        List[OrgSubtree]: タグの付いた見出しを含むサブツリー。
+    """
+    if _has_filetag(preamble, tag):
+        return subtrees
+    marker = f":{tag}:"
+    return [subtree for subtree in subtrees if _has_tagged_heading(subtree.text, marker)]
+
+
+def _has_tagged_heading(text: str, marker: str) -> bool:
+    """テキスト内の見出し行に指定タグが含まれるか判定する。"""
+    if marker not in text:
+        return False
+    return any(
+        marker in line and HEADING_PATTERN.match(line)
+        for line in text.splitlines()
+    )
+
+
+def _has_filetag(preamble: str, tag: str) -> bool:
+    """プリアンブルの #+FILETAGS に指定タグが含まれるか判定する。"""
+    for line in preamble.splitlines():
+        match = FILETAGS_PATTERN.match(line)
+        if match and tag in match.group(1).replace(":", " ").split():
+            return True
+    return False
@@ -0,0 +1,293 @@
+"""repositories.parquet_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+#########################################################
+# 3rd party packages
+#########################################################
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import info, warn
+from models import Model
+from repositories.base_repository import BaseRepositoryInterface
+from repositories.columnar_table import ColumnarTable, INT_NA
+from repositories.model_adapter import ModelAdapter
+
+# 1つの行グループに入れる行数
+ROW_GROUP_SIZE = 64 * 1024
+# 日時カラムの欠損値・パーティションなしの行を置くディレクトリ名（pyarrowのhive形式の既定値）
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int32()), ("month", pa.int32())]), flavor="hive")
+
+
+@dataclass
+class ParquetConfig:
+    """Parquetリポジトリの設定クラス。
+
+    Attributes:
+        base_path: データセットのディレクトリ。year=YYYY/month=M/ のサブディレクトリにファイルを置く。
+        columns: カラムリスト。
+        key_map: モデルとカラムのマッピング。
+        model_type: モデルクラス。
+        partition_column: 年月でパーティション分割する日時カラム。
+        column_types: カラム名 -> ColumnarTableのカラムの種類。指定のないカラムは文字列。
+    """
+    base_path: str
+    columns: list[str]
+    key_map: dict
+    model_type: type[Model]
+    partition_column: str
+    column_types: dict[str, str] | None = field(default=None)
+
+
+class ParquetRepository(BaseRepositoryInterface):
+    """年月でパーティション分割したParquetデータセットのリポジトリ。
+
+    追記のたびにパーティションごとの新しいファイルを書き、既存のファイルは書き換えない。
+    読み込み時は日付範囲をフィルタとして渡し、対象外のパーティション・行グループを読み飛ばす。
+
+    Usage:
+        repository = ParquetBookClockLogRepository()
+        table = repository.read(start="2025-04-01", end="2025-05-01")
+        df = table.to_pandas()
+
+    Args:
+        config: Parquetリポジトリの設定。
+    """
+
+    def __init__(self, config: ParquetConfig):
+        self._path = config.base_path
+        self._header = config.columns
+        self._adapter = ModelAdapter(model=config.model_type, key_map=config.key_map)
+        self._partition_column = config.partition_column
+        column_types = config.column_types or {}
+        self._schema = {column: column_types.get(column, "str") for column in config.columns}
+        self._arrow_schema = pa.schema([(column, _arrow_type(kind)) for column, kind in self._schema.items()])
+
+    def all(self) -> list[dict]:
+        """全データを取得する。
+
+        Returns:
+            list[dict]: 全データレコードのリスト。
+        """
+        return self.read().to_pylist()
+
+    def find_by_id(self, id_: int) -> dict | None:
+        """指定されたIDのデータを取得する。
+
+        Args:
+            id_: 取得するデータのID。
+
+        Returns:
+            dict | None: 該当するデータ。見つからない場合はNone。
+        """
+        rows = self.read(filter_=ds.field("id") == int(id_)).to_pylist()
+        return rows[0] if rows else None
+
+    def add(self, data: list[Model]) -> None:
+        """データをパーティションごとの新しいファイルとして追記する。
+
+        Args:
+            data: 追記するデータのリスト。
+        """
+        if not data:
+            return
+        self.add_rows([self._adapter.from_model(model) for model in data])
+
+    def add_rows(self, rows: list[dict]) -> int:
+        """行データをパーティションごとの新しいファイルとして追記する。
+
+        Args:
+            rows: カラム名 -> 値 の辞書のリスト。
+
+        Returns:
+            int: 書き込んだファイル数。
+        """
+        if not rows:
+            return 0
+        table = self._to_arrow(ColumnarTable.from_rows(rows, self._schema))
+        months = _month_index(table.column(self._partition_column))
+        written = 0
+        for month in np.unique(months):
+            part = table.filter(pa.array(months == month))
+            self._write_part(part, None if month == INT_NA else int(month))
+            written += 1
+        info("Added {} rows to Parquet dataset: {} ({} files)", len(table), self._path, written)
+        return written
+
+    def delete_by_id(self, id_: int) -> None:
+        """指定されたIDのデータを削除する（追記専用のため未対応）。
+
+        Args:
+            id_: 削除するデータのID。
+        """
+        warn("Not implemented: Parquet dataset is append-only")
+
+    def read(self, start: str | date | None = None, end: str | date | None = None,
+             columns: list[str] | None = None, filter_: ds.Expression | None = None) -> pa.Table:
+        """データを読み込む。
+
+        日付範囲はパーティション（年月）と行グループの統計情報の両方で絞り込まれるため、
+        対象の月のファイルだけが読み込まれる。
+
+        Args:
+            start: partition_columnの下限（この日時を含む）。
+            end: partition_columnの上限（この日時を含まない）。
+            columns: 読み込むカラム名のリスト。Noneの場合は全カラム。
+            filter_: 追加のフィルタ式。
+
+        Returns:
+            pa.Table: 読み込んだデータ。データセットがない場合は空のテーブル。
+        """
+        columns = columns or self._header
+        expression = self._range_expression(start, end)
+        if filter_ is not None:
+            expression = _and(expression, filter_)
+
+        dataset = self._dataset()
+        if dataset is None:
+            return self._arrow_schema.empty_table().select(columns)
+        return dataset.to_table(columns=columns, filter=expression)
+
+    def find_next_id(self) -> int:
+        """次に使用可能なIDを取得する（idカラムだけを読む）。
+
+        Returns:
+            int: 次に使用するID。データが存在しない場合は1。
+        """
+        ids = self.read(columns=["id"]).column("id")
+        max_id = pc.max(ids).as_py() if len(ids) else None
+        return 1 if max_id is None else max_id + 1
+
+    def export_from(self, repository) -> int:
+        """CSV / SQLiteリポジトリのうち、まだ書き出していないIDの行を追記する。
+
+        Args:
+            repository: iter_all() を持つ書き出し元のリポジトリ。
+
+        Returns:
+            int: 書き出した行数。
+        """
+        next_id = self.find_next_id()
+        rows = [
+            row for row in repository.iter_all(columns=self._header)
+            if row.get("id") not in (None, "") and int(row["id"]) >= next_id
+        ]
+        self.add_rows(rows)
+        return len(rows)
+
+    def _dataset(self) -> ds.Dataset | None:
+        """データセットを開く。ファイルがない場合はNone。"""
+        if not os.path.isdir(self._path):
+            return None
+        dataset = ds.dataset(self._path, schema=self._arrow_schema_with_partitions(),
+                             format="parquet", partitioning=PARTITIONING)
+        return dataset if dataset.files else None
+
+    def _arrow_schema_with_partitions(self) -> pa.Schema:
+        """パーティションカラムを加えたスキーマ。"""
+        return self._arrow_schema.append(pa.field("year", pa.int32())).append(pa.field("month", pa.int32()))
+
+    def _range_expression(self, start, end) -> ds.Expression | None:
+        """日付範囲のフィルタ式（パーティションの絞り込み + 行の絞り込み）を作成する。"""
+        expression = None
+        column = ds.field(self._partition_column)
+        if start is not None:
+            start = _to_datetime(start)
+            expression = _and(
+                expression,
+                (ds.field("year") > start.year)
+                | ((ds.field("year") == start.year) & (ds.field("month") >= start.month))
+            )
+            expression = _and(expression, column >= pa.scalar(start, type=pa.timestamp("ms")))
+        if end is not None:
+            end = _to_datetime(end)
+            # endは含まないため、endの直前の時点が属する月までを対象にする
+            last = end - timedelta(milliseconds=1)
+            expression = _and(
+                expression,
+                (ds.field("year") < last.year)
+                | ((ds.field("year") == last.year) & (ds.field("month") <= last.month))
+            )
+            expression = _and(expression, column < pa.scalar(end, type=pa.timestamp("ms")))
+        return expression
+
+    def _to_arrow(self, table: ColumnarTable) -> pa.Table:
+        """ColumnarTableをArrowのテーブルに変換する。"""
+        arrays = []
+        for column, kind in self._schema.items():
+            values = table.column(column)
+            if kind == "int":
+                arrays.append(pa.array(values, type=pa.int64(), mask=values == INT_NA))
+            elif kind == "datetime":
+                arrays.append(pa.array(values.astype("datetime64[ms]"), type=pa.timestamp("ms"),
+                                       mask=np.isnat(values)))
+            elif kind == "category":
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values, type=pa.int32(), mask=values < 0),
+                    pa.array(table.categories(column), type=pa.string())
+                ))
+            else:
+                arrays.append(pa.array(values.tolist(), type=pa.string()))
+        return pa.Table.from_arrays(arrays, schema=self._arrow_schema)
+
+    def _write_part(self, table: pa.Table, month: int | None) -> None:
+        """1つのパーティションに新しいファイルを書き込む。
+
+        書き込み途中のファイルを読まないよう、「.」で始まる一時ファイルに書いてから置き換える。
+        """
+        if month is None:
+            directory = os.path.join(self._path, f"year={NULL_PARTITION}", f"month={NULL_PARTITION}")
+        else:
+            directory = os.path.join(self._path, f"year={month // 12 + 1970}", f"month={month % 12 + 1}")
+        os.makedirs(directory, exist_ok=True)
+        file_name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(directory, f".{file_name}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, os.path.join(directory, file_name))
+
+
+def _arrow_type(kind: str) -> pa.DataType:
+    """ColumnarTableのカラムの種類に対応するArrowの型。"""
+    if kind == "int":
+        return pa.int64()
+    if kind == "datetime":
+        return pa.timestamp("ms")
+    if kind == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def _month_index(values: pa.ChunkedArray) -> np.ndarray:
+    """日時カラムを1970年1月からの月数にする（欠損値は INT_NA）。"""
+    months = values.to_numpy(zero_copy_only=False).astype("datetime64[M]")
+    result = months.view(np.int64).copy()
+    result[np.isnat(months)] = INT_NA
+    return result
+
+
+def _to_datetime(value: str | date) -> datetime:
+    """日付範囲の指定（文字列・date・datetime）をdatetimeにする。"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(value)
+
+
+def _and(left: ds.Expression | None, right: ds.Expression) -> ds.Expression:
+    """フィルタ式をANDで結合する。"""
+    return right if left is None else left & right
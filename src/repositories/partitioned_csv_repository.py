@@ -0,0 +1,447 @@
+"""repositories.partitioned_csv_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Iterator
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import info, warn
+from models import Model
+from repositories.base_repository import BaseRepositoryInterface
+from repositories.columnar_table import ColumnarTable
+from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
+from repositories.model_adapter import ModelAdapter
+
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+# 日時カラムが空・不正な行を置くパーティション
+UNKNOWN_PARTITION = "unknown"
+# 取り込み時に一度に追記する件数
+IMPORT_BATCH_SIZE = 1000
+
+_MONTH_PATTERN = re.compile(r"^(\d{4})-(\d{2})")
+
+
+@dataclass
+class PartitionedCsvConfig:
+    """年月パーティションCSVリポジトリの設定クラス。
+
+    Attributes:
+        base_path: パーティションのCSV（YYYY-MM.csv）とマニフェストを置くディレクトリ。
+        columns: CSVのカラムリスト。
+        key_map: モデルとCSVカラムのマッピング。
+        model_type: モデルクラス。
+        partition_column: 年月でパーティション分割する日時カラム（"YYYY-MM-DD HH:MM" 形式）。
+        key_columns: 重複チェック用の複合キー。パーティションごとに永続キーインデックスを作成する。
+        column_types: カラム名 -> ColumnarTableのカラムの種類。load_table() で使用する。
+        snapshot: Trueの場合、パーティションごとにバイナリスナップショットを作成する。
+        group_column: 指定した場合、この値ごとのpartition_columnの最新値をマニフェストに記録する（book_idなど）。
+    """
+    base_path: str
+    columns: list[str]
+    key_map: dict
+    model_type: type[Model]
+    partition_column: str
+    key_columns: list[str] | None = field(default=None)
+    column_types: dict[str, str] | None = field(default=None)
+    snapshot: bool = field(default=False)
+    group_column: str | None = field(default=None)
+
+
+class PartitionedCsvRepository(BaseRepositoryInterface):
+    """日時カラムの年月ごとにCSVを分割して保存するリポジトリ。
+
+    各パーティションは通常のCsvBaseRepository（YYYY-MM.csv）で、
+    manifest.json にパーティションごとの行数・最小/最大ID・group_columnごとの最新の日時と
+    CSVの状態（サイズ, 更新時刻）を記録する。
+    日付範囲の読み込み・IDでの検索・重複チェックは、該当するパーティションのCSVだけを読む。
+
+    Usage:
+        repository = PartitionedCsvBookClockLogRepository()
+        rows = repository.iter_range(start="2025-04-01", end="2025-05-01")
+        keys = repository.find_keys(partitions=["2025-04"])
+
+    Args:
+        config: 年月パーティションCSVリポジトリの設定。
+    """
+
+    def __init__(self, config: PartitionedCsvConfig):
+        self._path = config.base_path
+        self._config = config
+        self._header = config.columns
+        self._adapter = ModelAdapter(model=config.model_type, key_map=config.key_map)
+        self._key_columns = config.key_columns
+        self._column_types = config.column_types or {"id": "int"}
+        self._manifest_path = os.path.join(config.base_path, MANIFEST_FILE_NAME)
+        self._manifest: dict[str, dict] | None = None
+        self._shards: dict[str, CsvBaseRepository] = {}
+
+    @property
+    def partition_column(self) -> str:
+        """パーティション分割に使う日時カラム"""
+        return self._config.partition_column
+
+    @staticmethod
+    def partition_of(value) -> str:
+        """日時の値が属するパーティション名（YYYY-MM）を取得する。
+
+        Args:
+            value: "YYYY-MM-DD HH:MM" 形式の日時。
+
+        Returns:
+            str: パーティション名。空・不正な値の場合は UNKNOWN_PARTITION。
+        """
+        match = _MONTH_PATTERN.match(str(value)) if value not in (None, "") else None
+        return f"{match.group(1)}-{match.group(2)}" if match else UNKNOWN_PARTITION
+
+    def partitions(self) -> list[str]:
+        """存在するパーティション名の一覧を取得する。
+
+        Returns:
+            list[str]: パーティション名（昇順）。
+        """
+        return sorted(self._fresh_manifest())
+
+    def all(self) -> list[dict]:
+        """全パーティションのデータを取得する。
+
+        Returns:
+            list[dict]: 全データレコードのリスト（パーティション順）。
+        """
+        return list(self.iter_all())
+
+    def iter_all(self, columns: list[str] | None = None) -> Iterator[dict]:
+        """全パーティションのデータを1行ずつ取得する。
+
+        Args:
+            columns: 取得するカラム名のリスト。Noneの場合は全カラム。
+
+        Yields:
+            dict: 指定したカラムだけを持つデータレコード。
+        """
+        for partition in self.partitions():
+            yield from self._shard(partition).iter_all(columns=columns)
+
+    def iter_range(self, start: str | None = None, end: str | None = None,
+                   columns: list[str] | None = None) -> Iterator[dict]:
+        """partition_columnが日付範囲に入るデータを1行ずつ取得する。
+
+        範囲に重なる年月のCSVだけを読み込む。日時が空の行（unknownパーティション）は返さない。
+
+        Args:
+            start: 下限（この日時を含む）。"YYYY-MM-DD" または "YYYY-MM-DD HH:MM"。
+            end: 上限（この日時を含まない）。
+            columns: 取得するカラム名のリスト。Noneの場合は全カラム。
+
+        Yields:
+            dict: 指定したカラムだけを持つデータレコード。
+        """
+        column = self.partition_column
+        read_columns = columns if columns is None or column in columns else [*columns, column]
+        for partition in self._partitions_in_range(start, end):
+            for row in self._shard(partition).iter_all(columns=read_columns):
+                value = row.get(column) or ""
+                if (start is not None and value < start) or (end is not None and value >= end):
+                    continue
+                if read_columns is not columns:
+                    row.pop(column)
+                yield row
+
+    def load_table(self, columns: list[str] | None = None) -> ColumnarTable:
+        """全パーティションを型付きのカラム指向テーブルとして読み込む。
+
+        Args:
+            columns: 読み込むカラム名のリスト。Noneの場合はcolumn_typesの全カラム。
+
+        Returns:
+            ColumnarTable: パーティション順に連結したテーブル。
+        """
+        columns = columns or list(self._column_types)
+        schema = {column: self._column_types.get(column, "str") for column in columns}
+        tables = [self._shard(partition).load_table(columns) for partition in self.partitions()]
+        return ColumnarTable.concat(tables, schema)
+
+    def refresh_snapshot(self) -> None:
+        """全パーティションのスナップショットを作り直す（snapshotが無効な場合は何もしない）。"""
+        for partition in self.partitions():
+            self._shard(partition).refresh_snapshot()
+
+    def find_by_id(self, id_: int) -> dict | None:
+        """指定されたIDのデータを取得する。
+
+        Args:
+            id_: 取得するデータのID。
+
+        Returns:
+            dict | None: 該当するデータ。見つからない場合はNone。
+        """
+        return self.find_by_ids([id_]).get(int(id_))
+
+    def find_by_ids(self, ids: list[int]) -> dict[int, dict]:
+        """複数IDのデータをまとめて取得する。
+
+        マニフェストの最小/最大IDの範囲に該当するIDがあるパーティションだけを読む。
+
+        Args:
+            ids: 取得するデータのIDのリスト。
+
+        Returns:
+            dict[int, dict]: ID -> データ。見つからないIDは含まない。
+        """
+        wanted = {int(id_) for id_ in ids}
+        result = {}
+        for partition, entry in sorted(self._fresh_manifest().items()):
+            if entry["min_id"] is None:
+                continue
+            candidates = [id_ for id_ in wanted if entry["min_id"] <= id_ <= entry["max_id"]]
+            if not candidates:
+                continue
+            for id_, row in self._shard(partition).find_by_ids(candidates).items():
+                result.setdefault(id_, row)
+        return result
+
+    def add(self, data: list[Model]) -> None:
+        """データを年月ごとのCSVに追記する。
+
+        Args:
+            data: 追記するデータのリスト。
+        """
+        if not data:
+            return
+        self.add_rows([self._adapter.from_model(model) for model in data])
+
+    def add_rows(self, rows: list[dict]) -> None:
+        """行データを年月ごとのCSVに追記し、マニフェストを更新する。
+
+        Args:
+            rows: カラム名 -> 値 の辞書のリスト。
+        """
+        if not rows:
+            return
+        os.makedirs(self._path, exist_ok=True)
+        manifest = self._fresh_manifest()
+        groups: dict[str, list[dict]] = {}
+        for row in rows:
+            groups.setdefault(self.partition_of(row.get(self.partition_column)), []).append(row)
+
+        for partition, group in groups.items():
+            shard = self._shard(partition)
+            shard.add_rows(group)
+            entry = manifest.get(partition) or _empty_entry()
+            ids = [int(row["id"]) for row in group if row.get("id") not in (None, "")]
+            if ids:
+                entry["min_id"] = min(ids) if entry["min_id"] is None else min(entry["min_id"], *ids)
+                entry["max_id"] = max(ids) if entry["max_id"] is None else max(entry["max_id"], *ids)
+            entry["rows"] += len(group)
+            self._update_latest(entry, group)
+            entry["signature"] = list(shard._file_signature())
+            manifest[partition] = entry
+        self._save_manifest()
+        info("Added {} rows to {} partitions: {}", len(rows), len(groups), self._path)
+
+    def delete_by_id(self, id_: int) -> None:
+        """指定されたIDのデータを削除する（未実装）。
+
+        Args:
+            id_: 削除するデータのID。
+        """
+        warn("Not implemented")
+
+    def find_keys(self, partitions: list[str] | None = None) -> dict[tuple, int]:
+        """重複チェック用の複合キーとIDのマッピングを取得する。
+
+        Args:
+            partitions: 対象のパーティション名。Noneの場合は全パーティション。
+
+        Returns:
+            dict[tuple, int]: 複合キー -> ID。空文字のカラムはNoneになる。
+
+        Raises:
+            ValueError: key_columnsが設定されていない場合。
+        """
+        if not self._key_columns:
+            raise ValueError(f"key_columns is not configured: {self._path}")
+        existing = self._fresh_manifest()
+        keys = {}
+        for partition in sorted(existing if partitions is None else set(partitions) & set(existing)):
+            keys.update(self._shard(partition).find_keys())
+        return keys
+
+    def latest_by_group(self) -> dict[str, str]:
+        """group_columnの値ごとのpartition_columnの最新値をマニフェストから取得する（CSVは読まない）。
+
+        Returns:
+            dict[str, str]: group_columnの値 -> partition_columnの最新値。
+
+        Raises:
+            ValueError: group_columnが設定されていない場合。
+        """
+        if not self._config.group_column:
+            raise ValueError(f"group_column is not configured: {self._path}")
+        latest: dict[str, str] = {}
+        for entry in self._fresh_manifest().values():
+            for group, value in entry["latest"].items():
+                if value > latest.get(group, ""):
+                    latest[group] = value
+        return latest
+
+    def find_next_id(self) -> int:
+        """次に使用可能なIDをマニフェストから取得する（CSVは読まない）。
+
+        Returns:
+            int: 次に使用するID。データが存在しない場合は1。
+        """
+        max_ids = [entry["max_id"] for entry in self._fresh_manifest().values() if entry["max_id"] is not None]
+        return max(max_ids) + 1 if max_ids else 1
+
+    def import_csv(self, csv_repository: CsvBaseRepository) -> int:
+        """単一ファイルのCSVのうち、まだ取り込んでいないIDの行を取り込む。
+
+        Args:
+            csv_repository: 取り込み元のCSVリポジトリ。
+
+        Returns:
+            int: 取り込んだ件数。
+        """
+        next_id = self.find_next_id()
+        count = 0
+        batch = []
+        for row in csv_repository.iter_all(columns=self._header):
+            if row.get("id") in (None, "") or int(row["id"]) < next_id:
+                continue
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self.add_rows(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.add_rows(batch)
+            count += len(batch)
+        info("Imported {} rows into partitioned CSV: {}", count, self._path)
+        return count
+
+    def _partitions_in_range(self, start: str | None, end: str | None) -> list[str]:
+        """日付範囲に重なるパーティション名を取得する（unknownは含まない）。"""
+        first = start[:7] if start is not None else None
+        last = end[:7] if end is not None else None
+        return [
+            partition for partition in self.partitions()
+            if partition != UNKNOWN_PARTITION
+            and (first is None or partition >= first)
+            and (last is None or partition <= last)
+        ]
+
+    def _shard(self, partition: str) -> CsvBaseRepository:
+        """パーティションのCSVリポジトリを取得する（初回のみ作成する）。"""
+        shard = self._shards.get(partition)
+        if shard is None:
+            shard = CsvBaseRepository(CsvConfig(
+                file_name=f"{partition}.csv",
+                base_path=self._path,
+                columns=self._header,
+                key_map=self._config.key_map,
+                model_type=self._config.model_type,
+                key_columns=self._key_columns,
+                column_types=self._config.column_types,
+                snapshot=self._config.snapshot
+            ))
+            self._shards[partition] = shard
+        return shard
+
+    def _fresh_manifest(self) -> dict[str, dict]:
+        """CSVの状態と一致するマニフェストを取得する。
+
+        マニフェストにないCSV・サイズか更新時刻が変わったCSVはidカラムを読み直し、
+        削除されたCSVのエントリは取り除く。変更があった場合だけマニフェストを書き直す。
+        """
+        if self._manifest is None:
+            self._manifest = self._load_manifest()
+        files = set()
+        if os.path.isdir(self._path):
+            files = {name[:-len(".csv")] for name in os.listdir(self._path) if name.endswith(".csv")}
+
+        changed = False
+        for partition in list(self._manifest):
+            if partition not in files:
+                del self._manifest[partition]
+                changed = True
+        for partition in files:
+            shard = self._shard(partition)
+            signature = list(shard._file_signature())
+            entry = self._manifest.get(partition)
+            if entry is None or entry["signature"] != signature:
+                self._manifest[partition] = self._scan(shard, signature)
+                changed = True
+        if changed:
+            self._save_manifest()
+        return self._manifest
+
+    def _scan(self, shard: CsvBaseRepository, signature: list[int]) -> dict:
+        """パーティションのid（とgroup_column・partition_column）を読み、マニフェストのエントリを作成する。"""
+        entry = _empty_entry()
+        entry["signature"] = signature
+        columns = ["id"]
+        if self._config.group_column:
+            columns += [self._config.group_column, self.partition_column]
+        ids = []
+        rows = []
+        for row in shard.iter_all(columns=columns):
+            entry["rows"] += 1
+            rows.append(row)
+            try:
+                ids.append(int(row["id"]))
+            except (TypeError, ValueError):
+                continue
+        if ids:
+            entry["min_id"], entry["max_id"] = min(ids), max(ids)
+        self._update_latest(entry, rows)
+        return entry
+
+    def _update_latest(self, entry: dict, rows: list[dict]) -> None:
+        """マニフェストのエントリのgroup_columnごとの最新の日時を更新する（空の値は除く）。"""
+        group_column = self._config.group_column
+        if not group_column:
+            return
+        latest = entry["latest"]
+        for row in rows:
+            group, value = row.get(group_column), row.get(self.partition_column)
+            if group in (None, "") or value in (None, ""):
+                continue
+            group, value = str(group), str(value)
+            if value > latest.get(group, ""):
+                latest[group] = value
+
+    def _load_manifest(self) -> dict[str, dict]:
+        """マニフェストを読み込む。存在しない・壊れている場合は空にする（CSVから作り直される）。"""
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("partitions", {})
+
+    def _save_manifest(self) -> None:
+        """マニフェストを一時ファイルに書いてから置き換える。"""
+        os.makedirs(self._path, exist_ok=True)
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "partitions": self._manifest}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path)
+
+
+def _empty_entry() -> dict:
+    """空のパーティションのマニフェストのエントリ。"""
+    return {"min_id": None, "max_id": None, "rows": 0, "latest": {}, "signature": None}
@@ -0,0 +1,283 @@
+"""repositories.sqlite_base_repository"""
+#########################################################
+# Builtin packages
+#########################################################
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Iterator
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import info
+from models import Model
+from repositories.base_repository import BaseRepositoryInterface
+from repositories.columnar_table import ColumnarTable
+from repositories.csv_base_repository import CsvBaseRepository
+from repositories.model_adapter import ModelAdapter
+
+# executemanyで一度に書き込む件数
+BATCH_SIZE = 500
+# SQLiteのプレースホルダ数の上限を超えないよう分割して問い合わせる件数
+QUERY_CHUNK_SIZE = 500
+
+
+@dataclass
+class SqliteConfig:
+    """SQLiteリポジトリの設定クラス。
+
+    CsvConfigと同じカラム・key_mapの指定で、保存先をSQLiteのテーブルにする。
+
+    Attributes:
+        file_name: SQLiteファイル名。複数のテーブルで同じファイルを共有できる。
+        base_path: SQLiteファイルのベースパス。
+        table_name: テーブル名。
+        columns: カラムリスト。"id" は INTEGER PRIMARY KEY になる。
+        key_map: モデルとカラムのマッピング。
+        model_type: モデルクラス。
+        key_columns: 重複チェック用の複合キー。指定するとインデックスを作成する。
+        column_types: カラム名 -> ColumnarTableのカラムの種類。"int" のカラムはINTEGERで保存する。
+    """
+    file_name: str
+    base_path: str
+    table_name: str
+    columns: list[str]
+    key_map: dict
+    model_type: type[Model]
+    key_columns: list[str] | None = field(default=None)
+    column_types: dict[str, str] | None = field(default=None)
+
+
+class SqliteBaseRepository(BaseRepositoryInterface):
+    """SQLiteベースのリポジトリ基底クラス。
+
+    CsvBaseRepositoryと同じインターフェース（all / find_by_id / add / find_keys / find_next_id など）を持ち、
+    設定でCSVと切り替えられる。WALモードで開き、idと複合キーにインデックスを張る。
+
+    Args:
+        config: SQLiteリポジトリの設定。
+    """
+
+    def __init__(self, config: SqliteConfig):
+        self._path = os.path.join(config.base_path, config.file_name)
+        self._table = config.table_name
+        self._header = config.columns
+        self._adapter = ModelAdapter(model=config.model_type, key_map=config.key_map)
+        self._key_columns = config.key_columns
+        self._column_types = config.column_types or {"id": "int"}
+        self._conn: sqlite3.Connection | None = None
+
+    def all(self) -> list[dict]:
+        """全データを取得する。
+
+        Returns:
+            list[dict]: 全データレコードのリスト（id順）。
+        """
+        return list(self.iter_all())
+
+    def iter_all(self, columns: list[str] | None = None) -> Iterator[dict]:
+        """データを1行ずつ取得する。
+
+        Args:
+            columns: 取得するカラム名のリスト。Noneの場合は全カラム。
+
+        Yields:
+            dict: 指定したカラムだけを持つデータレコード。
+        """
+        columns = columns or self._header
+        cursor = self._connect().execute(
+            f"SELECT {self._column_list(columns)} FROM {self._quote(self._table)} ORDER BY id"
+        )
+        for values in cursor:
+            yield dict(zip(columns, values))
+
+    def load_table(self, columns: list[str] | None = None) -> ColumnarTable:
+        """データを型付きのカラム指向テーブルとして読み込む。
+
+        Args:
+            columns: 読み込むカラム名のリスト。Noneの場合はcolumn_typesの全カラム。
+
+        Returns:
+            ColumnarTable: 読み込んだテーブル。
+        """
+        columns = columns or list(self._column_types)
+        schema = {column: self._column_types.get(column, "str") for column in columns}
+        return ColumnarTable.from_rows(self.iter_all(columns=columns), schema)
+
+    def find_by_id(self, id_: int) -> dict | None:
+        """指定されたIDのデータを取得する。
+
+        Args:
+            id_: 取得するデータのID。
+
+        Returns:
+            dict | None: 該当するデータ。見つからない場合はNone。
+        """
+        return self.find_by_ids([id_]).get(int(id_))
+
+    def find_by_ids(self, ids: list[int]) -> dict[int, dict]:
+        """複数IDのデータをまとめて取得する。
+
+        Args:
+            ids: 取得するデータのIDのリスト。
+
+        Returns:
+            dict[int, dict]: ID -> データ。見つからないIDは含まない。
+        """
+        conn = self._connect()
+        ids = [int(id_) for id_ in ids]
+        result = {}
+        for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+            chunk = ids[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT {self._column_list(self._header)} FROM {self._quote(self._table)} "
+                f"WHERE id IN ({placeholders})",
+                chunk
+            )
+            for values in cursor:
+                row = dict(zip(self._header, values))
+                result[row["id"]] = row
+        return result
+
+    def add(self, data: list[Model]) -> None:
+        """データを追加する。同じIDのデータは置き換える。
+
+        Args:
+            data: 追加するデータのリスト。
+        """
+        if not data:
+            return
+        rows = [self._to_values(self._adapter.from_model(model)) for model in data]
+        self._insert(rows)
+        info("Added data to SQLite table: {}.{}", self._path, self._table)
+
+    def delete_by_id(self, id_: int) -> None:
+        """指定されたIDのデータを削除する。
+
+        Args:
+            id_: 削除するデータのID。
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute(f"DELETE FROM {self._quote(self._table)} WHERE id = ?", (int(id_),))
+
+    def find_keys(self) -> dict[tuple, int]:
+        """重複チェック用の複合キーとIDのマッピングを取得する。
+
+        Returns:
+            dict[tuple, int]: 複合キー -> ID。空文字のカラムはNoneになる。
+
+        Raises:
+            ValueError: key_columnsが設定されていない場合。
+        """
+        if not self._key_columns:
+            raise ValueError(f"key_columns is not configured: {self._table}")
+        cursor = self._connect().execute(
+            f"SELECT id, {self._column_list(self._key_columns)} FROM {self._quote(self._table)}"
+        )
+        return {
+            tuple(None if value in (None, "") else str(value) for value in values): id_
+            for id_, *values in cursor
+        }
+
+    def find_next_id(self) -> int:
+        """次に使用可能なIDを取得する。
+
+        Returns:
+            int: 次に使用するID。データが存在しない場合は1。
+        """
+        max_id = self._connect().execute(f"SELECT MAX(id) FROM {self._quote(self._table)}").fetchone()[0]
+        return 1 if max_id is None else max_id + 1
+
+    def import_csv(self, csv_repository: CsvBaseRepository) -> int:
+        """既存のCSVのデータを取り込む。
+
+        同じIDのデータは置き換えるため、何度実行しても結果は同じになる。
+
+        Args:
+            csv_repository: 取り込み元のCSVリポジトリ。
+
+        Returns:
+            int: 取り込んだ件数。
+        """
+        count = 0
+        batch = []
+        for row in csv_repository.iter_all(columns=self._header):
+            if not row.get("id"):
+                continue
+            batch.append(self._to_values(row))
+            if len(batch) >= BATCH_SIZE:
+                count += self._insert(batch)
+                batch = []
+        if batch:
+            count += self._insert(batch)
+        info("Imported {} rows into SQLite table: {}.{}", count, self._path, self._table)
+        return count
+
+    def close(self) -> None:
+        """SQLite接続を閉じる。"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """SQLiteに接続する（初回のみWALモードの設定とテーブル・インデックスの作成を行う）。"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(self._create_table_sql())
+                if self._key_columns:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self._quote(f'idx_{self._table}_keys')} "
+                        f"ON {self._quote(self._table)} ({self._column_list(self._key_columns)})"
+                    )
+            self._conn = conn
+        return self._conn
+
+    def _create_table_sql(self) -> str:
+        """CREATE TABLE文を作成する（idはINTEGER PRIMARY KEYなので自動でインデックスされる）。"""
+        definitions = []
+        for column in self._header:
+            if column == "id":
+                definitions.append("id INTEGER PRIMARY KEY")
+            elif self._column_types.get(column) == "int":
+                definitions.append(f"{self._quote(column)} INTEGER")
+            else:
+                definitions.append(f"{self._quote(column)} TEXT")
+        return f"CREATE TABLE IF NOT EXISTS {self._quote(self._table)} ({', '.join(definitions)})"
+
+    def _insert(self, rows: list[tuple]) -> int:
+        """行をBATCH_SIZE件ずつexecutemanyで書き込む（全体で1トランザクション）。"""
+        conn = self._connect()
+        placeholders = ",".join("?" * len(self._header))
+        sql = (
+            f"INSERT OR REPLACE INTO {self._quote(self._table)} "
+            f"({self._column_list(self._header)}) VALUES ({placeholders})"
+        )
+        with conn:
+            for i in range(0, len(rows), BATCH_SIZE):
+                conn.executemany(sql, rows[i:i + BATCH_SIZE])
+        return len(rows)
+
+    def _to_values(self, row: dict) -> tuple:
+        """行データをカラム順の値のタプルにする（空文字はNULL）。"""
+        return tuple(None if row.get(column) in (None, "") else row[column] for column in self._header)
+
+    def _column_list(self, columns: list[str]) -> str:
+        """カラム名のリストをSQLのカラムリストにする。"""
+        return ", ".join(self._quote(column) for column in columns)
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        """識別子をダブルクォートで囲む。"""
+        return '"' + name.replace('"', '""') + '"'
@@ -2,16 +2,29 @@
 from typing import List, Tuple, Dict
 from datetime import datetime
 from googleapiclient.errors import HttpError
+from repositories import KeyIndex, PartitionedKeyIndex, PartitionedCsvRepository
 from repositories.org import OrgReader
-from repositories.org.book import GssBookRepository, CsvBookRepository
-from repositories.org.book_log import GssBookLogRepository, CsvBookLogRepository
+from repositories.gss_batch_writer import GssBatchWriter
+from repositories.org.book import GssBookRepository, CsvBookRepository, SqliteBookRepository
+from repositories.org.book_log import GssBookLogRepository, CsvBookLogRepository, SqliteBookLogRepository
+from repositories.org.book_log import PartitionedCsvBookLogRepository
 from repositories.org.book_log import GcalBookLogRepository
 from repositories.org.book_clock_log import GssBookClockLogRepository, CsvBookClockLogRepository
+from repositories.org.book_clock_log import SqliteBookClockLogRepository, PartitionedCsvBookClockLogRepository
 from repositories.org.book_clock_log import GcalBookClockLogRepository
 from models.org import Book, BookLog, BookClockLog
 from common.config import Config
+from common.google_spreadsheet import gss_rate_limiter
 from common.log import info, warn, error_stack_trace
 
+# 重複チェックに使う複合キー
+LOG_KEY_COLUMNS = ["state", "from_status", "timestamp", "book_id"]
+CLOCK_KEY_COLUMNS = ["clock_start", "clock_end", "book_id"]
+KEY_CONVERTERS = {"book_id": int}
+
+# ストリーミング同期で一度に保存する件数
+SYNC_CHUNK_SIZE = 500
+
 
 class OrgService:
     """OrgService - 本に関連するサービス"""
@@ -22,39 +35,61 @@ class OrgService:
             "/opt/org/agendas/tasks.org",
             "/opt/org/agendas/habits.org"
         ]
-        self.reader = OrgReader(org_file_paths)
+        config = Config().config
+        self.reader = OrgReader(
+            org_file_paths,
+            cache_dir="/opt/work/src/cache/org",
+            max_workers=config.getint("ORG", "PARSE_WORKERS", fallback=1)
+        )
 
         # CSVリポジトリ
         self.csv_book_repository = CsvBookRepository()
         self.csv_book_log_repository = CsvBookLogRepository()
         self.csv_book_clock_log_repository = CsvBookClockLogRepository()
 
+        # Trueの場合はウォーターマークを使わず、後から古い日時で追記されたLOGBOOKのエントリも取り込む
+        self.full_rescan = config.getboolean("ORG", "FULL_RESCAN", fallback=False)
+
+        # ローカルの保存先（[ORG] BACKEND で csv / sqlite / partitioned を切り替える）
+        self.backend = config.get("ORG", "BACKEND", fallback="csv").strip().lower()
+        if self.backend == "csv":
+            self.book_repository = self.csv_book_repository
+            self.book_log_repository = self.csv_book_log_repository
+            self.book_clock_log_repository = self.csv_book_clock_log_repository
+        elif self.backend == "sqlite":
+            self.book_repository = SqliteBookRepository()
+            self.book_log_repository = SqliteBookLogRepository()
+            self.book_clock_log_repository = SqliteBookClockLogRepository()
+        elif self.backend == "partitioned":
+            # 本は件数が少ないため1ファイルのまま、ログ・クロックログを年月ごとのCSVに分割する
+            self.book_repository = self.csv_book_repository
+            self.book_log_repository = PartitionedCsvBookLogRepository()
+            self.book_clock_log_repository = PartitionedCsvBookClockLogRepository()
+        else:
+            raise ValueError(f"Unknown ORG BACKEND: {self.backend}")
+
         # GSSリポジトリ
         self.gss_book_repository = GssBookRepository()
         self.gss_book_log_repository = GssBookLogRepository()
         self.gss_book_clock_log_repository = GssBookClockLogRepository()
+        # 3つのシートは同じスプレッドシートにあるため、まとめて1回のリクエストで書き込む
+        self.gss_writer = GssBatchWriter()
 
         # Google Calendarリポジトリ
         self.book_log_calendar_repository = GcalBookLogRepository()
         self.book_clock_log_calendar_repository = GcalBookClockLogRepository()
-        config = Config().config
-        calendar_id = config['CALENDAR']['CALENDAR_ID']
+
+        # 重複チェック用インデックス（get_booksで既存データから構築する）
+        self._log_index = KeyIndex(LOG_KEY_COLUMNS, KEY_CONVERTERS)
+        self._clock_index = KeyIndex(CLOCK_KEY_COLUMNS, KEY_CONVERTERS)
 
     def get_books(self) -> Tuple[List[Book], List[BookLog], List[BookClockLog]]:
         """本・本ログ・本クロックログの一覧を取得する"""
+        book_id_map, next_book_id, next_log_id, next_clock_id = self._load_existing_keys()
         books_dict_from_org, logs_dict_from_org, clocks_dict_from_org = self.reader.load_books()
 
-        existing_books_dict = self.csv_book_repository.all()
-        existing_logs_dict = self.csv_book_log_repository.all()
-        existing_clocks_dict = self.csv_book_clock_log_repository.all()
-
-        next_book_id = self.csv_book_repository.find_next_id()
-        next_log_id = self.csv_book_log_repository.find_next_id()
-        next_clock_id = self.csv_book_clock_log_repository.find_next_id()
-
-        book_id_map = self._create_book_id_map(existing_books_dict)
         new_books, updated_book_id_map = self._process_new_books(
-            books_dict_from_org, existing_books_dict, next_book_id, book_id_map
+            books_dict_from_org, next_book_id, book_id_map
         )
 
         new_logs = self._process_new_logs(logs_dict_from_org, updated_book_id_map, next_log_id)
@@ -66,19 +101,142 @@ class OrgService:
 
         return books, book_logs, book_clock_logs
 
+    def sync_books(self, chunk_size: int = SYNC_CHUNK_SIZE) -> Tuple[int, int, int]:
+        """orgファイルを本のノードごとに読み込み、新しいデータをchunk_size件ごとに保存する
+
+        get_books + save と同じ結果になるが、全件をリストに溜めないためメモリ使用量が一定に保たれる。
+
+        Returns:
+            Tuple[int, int, int]: 保存した本・本ログ・本クロックログの件数
+        """
+        book_id_map, next_book_id, next_log_id, next_clock_id = self._load_existing_keys()
+        pending_books, pending_logs, pending_clocks = [], [], []
+        totals = [0, 0, 0]
+
+        def flush():
+            self.save(pending_books, pending_logs, pending_clocks)
+            totals[0] += len(pending_books)
+            totals[1] += len(pending_logs)
+            totals[2] += len(pending_clocks)
+            pending_books.clear()
+            pending_logs.clear()
+            pending_clocks.clear()
+
+        for book, logs, clocks in self.reader.iter_books():
+            new_books, book_id_map = self._process_new_books([book], next_book_id, book_id_map)
+            new_logs = self._process_new_logs(logs, book_id_map, next_log_id)
+            new_clocks = self._process_new_clocks(clocks, book_id_map, next_clock_id)
+            next_book_id += len(new_books)
+            next_log_id += len(new_logs)
+            next_clock_id += len(new_clocks)
+
+            pending_books.extend(Book.from_dict(b) for b in new_books)
+            pending_logs.extend(BookLog.from_dict(l) for l in new_logs)
+            pending_clocks.extend(BookClockLog.from_dict(c) for c in new_clocks)
+            if max(len(pending_books), len(pending_logs), len(pending_clocks)) >= chunk_size:
+                flush()
+
+        if pending_books or pending_logs or pending_clocks:
+            flush()
+        if self.backend != "sqlite":
+            self._refresh_snapshots()
+        gss_rate_limiter().log_stats()
+        return tuple(totals)
+
+    def sync_gss(self) -> Tuple[int, int]:
+        """ローカルの本・本ログ・本クロックログとGSSを比較し、足りない行と異なる行だけを書き込む
+
+        シートごとに全体を1回読み込み、idで比較した差分をまとめて書き込むため、
+        書き込みの途中で失敗した場合も再実行すれば残りだけが書き込まれる
+
+        Returns:
+            Tuple[int, int]: 追記した行数、更新した行数
+        """
+        appended = updated = 0
+        for gss_repository, repository in (
+            (self.gss_book_repository, self.book_repository),
+            (self.gss_book_log_repository, self.book_log_repository),
+            (self.gss_book_clock_log_repository, self.book_clock_log_repository),
+        ):
+            missing, changed = gss_repository.diff_rows(repository.iter_all(columns=gss_repository.columns))
+            info(f"GSS {gss_repository.sheet_name}: {len(missing)} missing, {len(changed)} changed rows")
+            self.gss_writer.stage_rows(gss_repository, missing)
+            self.gss_writer.stage_updates(gss_repository, changed)
+            appended += len(missing)
+            updated += len(changed)
+        self.gss_writer.flush()
+        gss_rate_limiter().log_stats()
+        return appended, updated
+
+    def import_csv_to_sqlite(self) -> Tuple[int, int, int]:
+        """既存のCSVの本・本ログ・本クロックログをSQLiteに取り込む
+
+        BACKEND を sqlite に切り替える前に一度だけ実行する（再実行しても同じIDの行が置き換わるだけ）
+
+        Returns:
+            Tuple[int, int, int]: 取り込んだ本・本ログ・本クロックログの件数
+        """
+        return (
+            SqliteBookRepository().import_csv(self.csv_book_repository),
+            SqliteBookLogRepository().import_csv(self.csv_book_log_repository),
+            SqliteBookClockLogRepository().import_csv(self.csv_book_clock_log_repository),
+        )
+
+    def import_csv_to_partitioned(self) -> Tuple[int, int]:
+        """既存のCSVの本ログ・本クロックログを年月ごとのCSVに取り込む
+
+        BACKEND を partitioned に切り替える前に一度だけ実行する（取り込み済みのIDより後の行だけを追加する）
+
+        Returns:
+            Tuple[int, int]: 取り込んだ本ログ・本クロックログの件数
+        """
+        return (
+            PartitionedCsvBookLogRepository().import_csv(self.csv_book_log_repository),
+            PartitionedCsvBookClockLogRepository().import_csv(self.csv_book_clock_log_repository),
+        )
+
+    def export_parquet(self) -> Tuple[int, int, int]:
+        """保存済みの本・本ログ・本クロックログのうち、未書き出しの行をParquetに追記する
+
+        Returns:
+            Tuple[int, int, int]: 書き出した本・本ログ・本クロックログの件数
+        """
+        # pyarrowの読み込みに時間がかかるため、同期処理では読み込まず書き出し時だけインポートする
+        from repositories.org.book.parquet_repository import ParquetBookRepository
+        from repositories.org.book_log.parquet_repository import ParquetBookLogRepository
+        from repositories.org.book_clock_log.parquet_repository import ParquetBookClockLogRepository
+
+        return (
+            ParquetBookRepository().export_from(self.book_repository),
+            ParquetBookLogRepository().export_from(self.book_log_repository),
+            ParquetBookClockLogRepository().export_from(self.book_clock_log_repository),
+        )
+
+    def _refresh_snapshots(self) -> None:
+        """同期後のCSVからスナップショットを作り直し、次回の起動時に使えるようにする"""
+        for repository in (
+            self.book_repository,
+            self.book_log_repository,
+            self.book_clock_log_repository,
+        ):
+            repository.refresh_snapshot()
+
     def save(self, books: List[Book], book_logs: List[BookLog], book_clock_logs: List[BookClockLog]) -> None:
         """本・本ログ・本クロックログを保存する"""
         try:
-            # CSVに保存
-            self.csv_book_repository.add(books)
-            self.gss_book_repository.add(books)
-            info(f"Saved {len(books)} books to CSV")
-            self.csv_book_log_repository.add(book_logs)
-            self.gss_book_log_repository.add(book_logs)
-            info(f"Saved {len(book_logs)} book logs to CSV")
-            self.csv_book_clock_log_repository.add(book_clock_logs)
-            self.gss_book_clock_log_repository.add(book_clock_logs)
-            info(f"Saved {len(book_clock_logs)} book clock logs to CSV")
+            # ローカル（CSV / SQLite）に保存
+            self.book_repository.add(books)
+            info(f"Saved {len(books)} books to {self.backend}")
+            self.book_log_repository.add(book_logs)
+            info(f"Saved {len(book_logs)} book logs to {self.backend}")
+            self.book_clock_log_repository.add(book_clock_logs)
+            info(f"Saved {len(book_clock_logs)} book clock logs to {self.backend}")
+
+            # GSSの3シートにまとめて書き込む
+            self.gss_writer.stage(self.gss_book_repository, books)
+            self.gss_writer.stage(self.gss_book_log_repository, book_logs)
+            self.gss_writer.stage(self.gss_book_clock_log_repository, book_clock_logs)
+            self.gss_writer.flush()
 
             # # Google Calendarに同期
             # if book_logs:
@@ -101,35 +259,87 @@ class OrgService:
             error_stack_trace(f"Unexpected error in save: {exc}")
             raise  # その他のエラーは再スロー
 
-    def _create_book_id_map(self, existing_books: List[Dict]) -> Dict:
-        """既存のBookデータから(title, url, created_at) -> book_idのマッピングを作成"""
-        book_id_map = {}
-        for book in existing_books:
-            key = (
-                book.get("title"),
-                book.get("url"),
-                book.get("created_at")
-            )
-            book_id_map[key] = int(book["id"])
-        return book_id_map
+    def _load_existing_keys(self) -> Tuple[Dict, int, int, int]:
+        """既存データのキーと次のIDを読み込み、重複チェック用インデックスを作成する
+
+        CSVの場合はCSV全体ではなく、CSVの横の永続キーインデックスから既存キーを読み込む
+        年月パーティションの場合は、orgのエントリが属する月のキーだけを確認時に読み込む
+
+        Returns:
+            Tuple[Dict, int, int, int]: (book_id_map, 次のbook_id, 次のlog_id, 次のclock_id)
+        """
+        book_id_map = self.book_repository.find_keys()
+        self._log_index = self._build_key_index(self.book_log_repository, LOG_KEY_COLUMNS)
+        self._clock_index = self._build_key_index(self.book_clock_log_repository, CLOCK_KEY_COLUMNS)
+        if self.full_rescan:
+            info("Full rescan: ignoring watermarks and reading every LOGBOOK entry")
+            self.reader.watermarks = {}
+        else:
+            self.reader.watermarks = self._build_watermarks(book_id_map)
+
+        return (
+            book_id_map,
+            self.book_repository.find_next_id(),
+            self.book_log_repository.find_next_id(),
+            self.book_clock_log_repository.find_next_id(),
+        )
+
+    @staticmethod
+    def _build_key_index(repository, key_columns: List[str]) -> KeyIndex:
+        """リポジトリの既存キーから重複チェック用インデックスを作成する"""
+        if isinstance(repository, PartitionedCsvRepository):
+            return PartitionedKeyIndex(repository, key_columns, KEY_CONVERTERS)
+        return KeyIndex.from_keys(repository.find_keys(), key_columns, KEY_CONVERTERS)
+
+    def _build_watermarks(self, book_id_map: Dict) -> Dict[Tuple, Tuple]:
+        """保存済みデータから本ごとのウォーターマークを作成する
+
+        ウォーターマークより古いLOGBOOKのエントリは読まないため、後から古い日時で追記されたエントリは
+        [ORG] FULL_RESCAN を有効にして同期するまで取り込まれない
+
+        Returns:
+            Dict[Tuple, Tuple]: (title, url, created_at) -> (最新のtimestamp, 最新のclock_start)
+        """
+        # スナップショットから型付きテーブルとして読み込み、本ごとの最大値を配列演算で求める
+        # （年月パーティションの場合はマニフェストから取得する）
+        latest_log = self._latest_by_book(self.book_log_repository, "timestamp")
+        latest_clock = self._latest_by_book(self.book_clock_log_repository, "clock_start")
+
+        return {
+            book_key: (latest_log.get(book_id), latest_clock.get(book_id))
+            for book_key, book_id in book_id_map.items()
+            if book_id in latest_log or book_id in latest_clock
+        }
+
+    @staticmethod
+    def _latest_by_book(repository, column: str) -> Dict[int, str]:
+        """book_idごとの日時カラムの最大値を、OrgReaderと同じ書式の文字列で取得する"""
+        if isinstance(repository, PartitionedCsvRepository):
+            # 年月パーティションの場合はマニフェストに記録した最新値を使い、CSVは読まない
+            return {int(book_id): latest for book_id, latest in repository.latest_by_group().items()}
+        table = repository.load_table(["book_id", column])
+        return {
+            book_id: str(latest).replace("T", " ")
+            for book_id, latest in table.aggregate("book_id", column, "max").items()
+        }
 
     def _process_new_books(
         self,
         books_from_org: List[Dict],
-        existing_books: List[Dict],
         next_book_id: int,
         book_id_map: Dict
     ) -> Tuple[List[Dict], Dict]:
-        """新しいBookデータを抽出し、book_idを割り当てる"""
+        """新しいBookデータを抽出し、book_idを割り当てる
+
+        book_id_mapは (title, url, created_at) -> book_id のマッピング
+        """
         new_books = []
         current_book_id = next_book_id
 
         compare_keys = ["title", "url", "created_at"]
-        existing_set = {tuple(b.get(k) for k in compare_keys) for b in existing_books}
-
         for book in books_from_org:
             key = tuple(book.get(k) for k in compare_keys)
-            if key not in existing_set:
+            if key not in book_id_map:
                 book["id"] = current_book_id
                 new_books.append(book)
                 book_id_map[key] = current_book_id
@@ -147,7 +357,6 @@ class OrgService:
         new_logs = []
         current_log_id = next_log_id
 
-        compare_keys = ["state", "from_status", "timestamp"]
         for log in logs_from_org:
             book = log.pop("book")
             book_key = (book["title"], book["url"], book["created_at"])
@@ -156,11 +365,12 @@ class OrgService:
             if book_id is None:
                 continue
 
-            log_key = tuple(log.get(k) for k in compare_keys) + (book_id,)
+            log_key = self._log_index.key_of({**log, "book_id": book_id})
             if not self._is_existing_log(log_key, book_id):
                 log["id"] = current_log_id
                 log["book_id"] = book_id
                 new_logs.append(log)
+                self._log_index.add(log_key)
                 current_log_id += 1
 
         return new_logs
@@ -175,7 +385,6 @@ class OrgService:
         new_clocks = []
         current_clock_id = next_clock_id
 
-        compare_keys = ["clock_start", "clock_end"]
         for clock in clocks_from_org:
             book = clock.pop("book")
             book_key = (book["title"], book["url"], book["created_at"])
@@ -184,38 +393,20 @@ class OrgService:
             if book_id is None:
                 continue
 
-            clock_key = tuple(clock.get(k) for k in compare_keys) + (book_id,)
+            clock_key = self._clock_index.key_of({**clock, "book_id": book_id})
             if not self._is_existing_clock(clock_key, book_id):
                 clock["id"] = current_clock_id
                 clock["book_id"] = book_id
                 new_clocks.append(clock)
+                self._clock_index.add(clock_key)
                 current_clock_id += 1
 
         return new_clocks
 
     def _is_existing_log(self, log_key: Tuple, book_id: int) -> bool:
         """BookLogが既存データに含まれるかチェック"""
-        existing_logs = self.csv_book_log_repository.all()
-        for existing in existing_logs:
-            existing_key = (
-                existing["state"],
-                existing["from_status"],
-                existing["timestamp"],
-                int(existing["book_id"])
-            )
-            if existing_key == log_key:
-                return True
-        return False
+        return log_key in self._log_index
 
     def _is_existing_clock(self, clock_key: Tuple, book_id: int) -> bool:
         """BookClockLogが既存データに含まれるかチェック"""
-        existing_clocks = self.csv_book_clock_log_repository.all()
-        for existing in existing_clocks:
-            existing_key = (
-                existing["clock_start"],
-                existing["clock_end"],
-                int(existing["book_id"])
-            )
-            if existing_key == clock_key:
-                return True
-        return False
+        return clock_key in self._clock_index
@@ -0,0 +1,34 @@
+"""GSS sync entry point
+
+ローカルの本・本ログ・本クロックログとGSSを比較し、GSSにない行と内容が異なる行だけを書き込む。
+GSSへの書き込みが途中で失敗した後に実行する。
+
+Usage:
+    $ python sync_gss.py
+"""
+#########################################################
+# Builtin packages
+#########################################################
+# (None)
+
+#########################################################
+# 3rd party packages
+#########################################################
+# (None)
+
+#########################################################
+# Own packages
+#########################################################
+from common.log import initialize_logger, info
+from controllers.org import OrgController
+
+
+def main():
+    """main"""
+    initialize_logger()
+    appended, updated = OrgController.sync_gss()
+    info("Synced GSS: appended {} rows, updated {} rows", appended, updated)
+
+
+if __name__ == "__main__":
+    main()
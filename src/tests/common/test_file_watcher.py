@@ -0,0 +1,121 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from common.watcher import FileWatcher
+
+# FileWatcherのテスト
+
+
+def touch(path, text="x"):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def touch_later(*steps):
+    # (秒, パス) の順にファイルを書き込むスレッドを開始する
+    def run():
+        for delay, path in steps:
+            time.sleep(delay)
+            touch(path)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def org_files(tmp_path):
+    paths = [tmp_path / "journal.org", tmp_path / "books.org"]
+    for path in paths:
+        touch(path)
+    return [str(path) for path in paths]
+
+
+@pytest.fixture
+def watcher(org_files):
+    watcher = FileWatcher(org_files, debounce_sec=0.5)
+    if not watcher.uses_inotify:
+        watcher.close()
+        pytest.skip("inotify is not available")
+    yield watcher
+    watcher.close()
+
+
+@pytest.fixture
+def polling_watcher(org_files):
+    with patch.object(FileWatcher, "_init_inotify", return_value=None):
+        watcher = FileWatcher(org_files, debounce_sec=0.3, poll_interval_sec=0.02)
+    yield watcher
+    watcher.close()
+
+
+class TestFileWatcherInotify:
+    def test_detect_change(self, watcher, org_files):
+        touch(org_files[0])
+        assert watcher.wait(timeout_sec=2) == {org_files[0]}
+
+    def test_timeout(self, watcher):
+        # 変更がなければタイムアウトまで待って空を返す
+        started = time.monotonic()
+        assert watcher.wait(timeout_sec=0.2) == set()
+        assert time.monotonic() - started >= 0.2
+
+    def test_ignore_unwatched_files(self, watcher, org_files, tmp_path):
+        # 同じディレクトリのエディタのロックファイル・自動保存・バックアップでは返らない
+        for name in [".#journal.org", "#journal.org#", "journal.org~"]:
+            touch(tmp_path / name)
+        started = time.monotonic()
+        assert watcher.wait(timeout_sec=0.3) == set()
+        assert time.monotonic() - started >= 0.3
+
+        # 監視対象外のイベントの後でも、残りの時間で監視対象の変更を待つ
+        thread = touch_later((0.05, tmp_path / ".#journal.org"), (0.1, org_files[0]))
+        assert watcher.wait(timeout_sec=2) == {org_files[0]}
+        thread.join()
+
+    def test_debounce_merges_changes(self, watcher, org_files, tmp_path):
+        # デバウンス中の変更はまとめて通知し、監視対象外のイベントで打ち切らない
+        touch(org_files[0])
+        thread = touch_later((0.1, tmp_path / "#journal.org#"), (0.2, org_files[1]))
+        assert watcher.wait(timeout_sec=2) == set(org_files)
+        thread.join()
+        assert watcher.wait(timeout_sec=0.1) == set()
+
+    def test_same_name_in_two_directories(self, tmp_path):
+        # 同じファイル名でもディレクトリが異なれば、変更されたファイルだけを返す
+        paths = [tmp_path / "a" / "journal.org", tmp_path / "b" / "journal.org"]
+        for path in paths:
+            path.parent.mkdir()
+            touch(path)
+        watcher = FileWatcher([str(path) for path in paths], debounce_sec=0.2)
+        try:
+            if not watcher.uses_inotify:
+                pytest.skip("inotify is not available")
+            touch(paths[1])
+            assert watcher.wait(timeout_sec=2) == {str(paths[1])}
+            touch(paths[0])
+            assert watcher.wait(timeout_sec=2) == {str(paths[0])}
+            # 監視していないディレクトリの同名ファイルは無視する
+            (tmp_path / "c").mkdir()
+            touch(tmp_path / "c" / "journal.org")
+            touch(tmp_path / "journal.org")
+            assert watcher.wait(timeout_sec=0.2) == set()
+        finally:
+            watcher.close()
+
+
+class TestFileWatcherPolling:
+    def test_detect_change(self, polling_watcher, org_files):
+        assert not polling_watcher.uses_inotify
+        touch(org_files[0])
+        assert polling_watcher.wait(timeout_sec=2) == {org_files[0]}
+
+    def test_ignore_unwatched_files(self, polling_watcher, tmp_path):
+        touch(tmp_path / ".#journal.org")
+        assert polling_watcher.wait(timeout_sec=0.1) == set()
+
+    def test_debounce_merges_changes(self, polling_watcher, org_files):
+        touch(org_files[0])
+        thread = touch_later((0.1, org_files[1]))
+        assert polling_watcher.wait(timeout_sec=2) == set(org_files)
+        thread.join()
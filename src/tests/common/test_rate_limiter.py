@@ -0,0 +1,60 @@
+import pytest
+from common.google_spreadsheet.rate_limiter import TokenBucket
+
+# TokenBucketのテスト
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTokenBucket:
+    def test_no_wait_while_tokens_remain(self, clock):
+        # トークンがある間は待たない
+        limiter = TokenBucket(capacity=3, rate=1, clock=clock, sleep=clock.sleep)
+        assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert clock.sleeps == []
+        assert limiter.stats == {"requests": 3, "throttled_requests": 0, "throttled_sec": 0.0}
+
+    def test_wait_when_empty(self, clock):
+        # 空の場合は補充されるまでだけ待ち、待った時間を記録する
+        limiter = TokenBucket(capacity=1, rate=2, clock=clock, sleep=clock.sleep)
+        limiter.acquire()
+        assert limiter.acquire() == pytest.approx(0.5)
+        clock.now += 10
+        assert limiter.acquire() == 0.0
+        assert limiter.stats["throttled_requests"] == 1
+        assert limiter.throttled_sec == pytest.approx(0.5)
+
+    def test_per_minute_stays_under_quota(self, clock):
+        # どの60秒間でもクォータを超えない
+        limiter = TokenBucket.per_minute(60, burst=10, clock=clock, sleep=clock.sleep)
+        times = []
+        for _ in range(200):
+            limiter.acquire()
+            times.append(clock.now)
+        assert max(sum(1 for t in times if start <= t < start + 60) for start in times) <= 60
+
+    def test_penalize(self, clock):
+        # クォータ超過後は指定秒数待ってから再開する
+        limiter = TokenBucket(capacity=5, rate=1, clock=clock, sleep=clock.sleep)
+        limiter.penalize(60)
+        assert limiter.acquire() == pytest.approx(61)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            TokenBucket(capacity=0, rate=1)
@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import MagicMock
+import gspread
+from common.google_spreadsheet.spreadsheet_registry import SpreadsheetRegistry
+
+# SpreadsheetRegistryのテスト
+
+
+def worksheet(title):
+    return MagicMock(title=title)
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    workbook = client.open_by_key.return_value
+    workbook.worksheets.return_value = [worksheet("Books"), worksheet("BookLogs"), worksheet("Bob's")]
+    workbook.values_batch_get.return_value = {"valueRanges": [
+        {"range": "Books!A1:J1", "values": [["id", "title"]]},
+        {"range": "BookLogs!A1:Z1"},
+        {"range": "'Bob''s'!A1:Z1"},
+    ]}
+    return client
+
+
+@pytest.fixture
+def registry(client):
+    return SpreadsheetRegistry(connect=lambda: client, rate_limiter=MagicMock())
+
+
+class TestSpreadsheetRegistry:
+    def test_open_once(self, registry, client):
+        # スプレッドシートは一度だけ開き、全シートのメタデータを1回で取得する
+        assert registry.worksheet("key", "Books").title == "Books"
+        assert registry.worksheet("key", "BookLogs").title == "BookLogs"
+        client.open_by_key.assert_called_once_with("key")
+        client.open_by_key.return_value.worksheets.assert_called_once()
+
+    def test_headers_in_one_request(self, registry, client):
+        # 全シートのヘッダー行を1回のリクエストで取得してキャッシュする
+        assert registry.header("key", "Books") == ["id", "title"]
+        assert registry.header("key", "BookLogs") == []
+        assert registry.header("key", "Missing") == []
+        workbook = client.open_by_key.return_value
+        workbook.values_batch_get.assert_called_once_with(["'Books'!1:1", "'BookLogs'!1:1", "'Bob''s'!1:1"])
+
+        registry.set_header("key", "BookLogs", ["id"])
+        assert registry.header("key", "BookLogs") == ["id"]
+
+    def test_connect_lazily(self, client):
+        # シートを使うまで接続しない
+        connect = MagicMock(return_value=client)
+        registry = SpreadsheetRegistry(connect=connect, rate_limiter=MagicMock())
+        connect.assert_not_called()
+        registry.workbook("key")
+        registry.workbook("key")
+        connect.assert_called_once()
+
+    def test_worksheet_not_found(self, registry):
+        with pytest.raises(gspread.exceptions.WorksheetNotFound):
+            registry.worksheet("key", "Missing")
@@ -0,0 +1,160 @@
+import os
+import orgparse
+import pytest
+from unittest.mock import patch
+from repositories.org.org_reader import OrgReader
+
+ORG_CONTENT = """#+TODO: TODO READING | DONE
+* Diary
+** 2025-04-10
+* READING ゆるストイック :book:
+  CLOSED: [2025-04-12 Sat 21:00]
+  :PROPERTIES:
+  :Effort:   3:00
+  :END:
+  CREATED_AT: [2025-04-10 Thu 10:00]
+  :LOGBOOK:
+  - State "READING"    from "TODO"       [2025-04-11 Fri 09:00]
+  CLOCK: [2025-04-11 Fri 10:00]--[2025-04-11 Fri 10:30] =>  0:30
+  CLOCK: [2025-04-10 Thu 10:00]--[2025-04-10 Thu 11:00] =>  1:00
+  :END:
+** URL
+   https://example.com/book
+** Notes
+   メモ
+* TODO Other task
+"""
+
+# OrgReaderのテスト
+
+
+@pytest.fixture
+def org_path(tmp_path):
+    path = tmp_path / "journal.org"
+    path.write_text(ORG_CONTENT, encoding="utf-8")
+    return str(path)
+
+
+class TestOrgReader:
+    def test_load_books(self, org_path):
+        # 本のノードからBook, BookLog, BookClockLogを抽出する
+        books, logs, clocks = OrgReader([org_path]).load_books()
+        assert len(books) == 1
+        book = books[0]
+        assert book["title"] == "ゆるストイック"
+        assert book["created_at"] == "2025-04-10 10:00"
+        assert book["ended_at"] == "2025-04-12 21:00"
+        assert book["url"] == "https://example.com/book"
+        assert book["notes"] == "メモ"
+        assert [(l["state"], l["from_status"], l["timestamp"]) for l in logs] == [
+            ("READING", "TODO", "2025-04-11 09:00")
+        ]
+        assert [(c["clock_start"], c["duration_min"]) for c in clocks] == [
+            ("2025-04-11 10:00", 30), ("2025-04-10 10:00", 60)
+        ]
+        assert all(c["book"] is book for c in clocks)
+
+    def test_missing_file(self, tmp_path):
+        # ファイルが存在しない場合はスキップする
+        assert OrgReader([str(tmp_path / "none.org")]).load_books() == ([], [], [])
+
+    def test_cache_skips_unchanged_file(self, org_path, tmp_path):
+        # 変更のないファイルは再パースしない
+        reader = OrgReader([org_path], cache_dir=str(tmp_path / "cache"))
+        expected = reader.load_books()
+        with patch("orgparse.loads") as mock_loads:
+            assert reader.load_books() == expected
+            # 更新時刻だけ変わった場合も内容のハッシュが一致すれば再パースしない
+            os.utime(org_path, ns=(0, 0))
+            assert reader.load_books() == expected
+            mock_loads.assert_not_called()
+
+    def test_cache_reparses_modified_file(self, org_path, tmp_path):
+        # 内容が変わったファイルは再パースする
+        reader = OrgReader([org_path], cache_dir=str(tmp_path / "cache"))
+        reader.load_books()
+        with open(org_path, mode="a", encoding="utf-8") as f:
+            f.write("* 自己管理大全 :book:\n")
+        books, _, _ = reader.load_books()
+        assert [b["title"] for b in books] == ["ゆるストイック", "自己管理大全"]
+
+    def test_cache_reparses_only_dirty_subtree(self, org_path, tmp_path):
+        # 変更のあったレベル1サブツリーだけを再パースする
+        reader = OrgReader([org_path], cache_dir=str(tmp_path / "cache"))
+        reader.load_books()
+        content = ORG_CONTENT.replace("   メモ", "   更新したメモ") + "* 自己管理大全 :book:\n"
+        with open(org_path, mode="w", encoding="utf-8") as f:
+            f.write(content)
+        with patch("orgparse.loads", wraps=orgparse.loads) as mock_loads:
+            books, logs, clocks = reader.load_books()
+            assert mock_loads.call_count == 2
+        assert [b["notes"] for b in books] == ["更新したメモ", None]
+        assert OrgReader([org_path]).load_books() == (books, logs, clocks)
+
+    def test_skips_subtrees_without_book_tag(self, org_path, tmp_path):
+        # 本のタグを含まないサブツリーはorgparseに渡さない
+        reader = OrgReader([org_path], cache_dir=str(tmp_path / "cache"))
+        expected = reader.load_books()
+        with open(org_path, mode="a", encoding="utf-8") as f:
+            f.write("* Diary 2\n** 2025-04-11\n")
+        with patch("orgparse.loads") as mock_loads:
+            assert reader.load_books() == expected
+            mock_loads.assert_not_called()
+
+    def test_parallel_load_keeps_order(self, org_path, tmp_path):
+        # 並列パースでもorg_file_pathsの順に結合される
+        other_path = tmp_path / "tasks.org"
+        other_path.write_text("* 自己管理大全 :book:\n", encoding="utf-8")
+        paths = [str(other_path), str(tmp_path / "none.org"), org_path]
+        expected = OrgReader(paths).load_books()
+        reader = OrgReader(paths, max_workers=2, parallel_min_bytes=0)
+        assert reader._should_parallelize()
+        assert reader.load_books() == expected
+        assert [b["title"] for b in expected[0]] == ["自己管理大全", "ゆるストイック"]
+
+    @pytest.mark.parametrize("use_cache", [False, True])
+    def test_iter_books(self, org_path, tmp_path, use_cache):
+        # 本のノードごとにBook, BookLog, BookClockLogを返す
+        cache_dir = str(tmp_path / "cache") if use_cache else None
+        records = list(OrgReader([org_path], cache_dir=cache_dir).iter_books())
+        books, logs, clocks = OrgReader([org_path]).load_books()
+        assert [r[0] for r in records] == books
+        assert [l for r in records for l in r[1]] == logs
+        assert [c for r in records for c in r[2]] == clocks
+
+    def test_watermarks_skip_persisted_entries(self, org_path, tmp_path):
+        # ウォーターマークより古いLOGBOOKのエントリは抽出しない
+        reader = OrgReader([org_path], cache_dir=str(tmp_path / "cache"))
+        book_key = ("ゆるストイック", "https://example.com/book", "2025-04-10 10:00")
+        reader.watermarks = {book_key: ("2025-04-11 09:00", "2025-04-11 10:00")}
+        _, logs, clocks = reader.load_books()
+        assert [l["timestamp"] for l in logs] == ["2025-04-11 09:00"]
+        assert [c["clock_start"] for c in clocks] == ["2025-04-11 10:00"]
+
+        # ウォーターマークが戻った場合はキャッシュを使わずに抽出し直す
+        reader.watermarks = {}
+        _, _, clocks = reader.load_books()
+        assert [c["clock_start"] for c in clocks] == ["2025-04-11 10:00", "2025-04-10 10:00"]
+
+    @pytest.mark.parametrize("use_cache", [False, True])
+    def test_backfilled_entries_need_full_rescan(self, org_path, tmp_path, use_cache):
+        # 後から古い日時で追記したCLOCK行は、ウォーターマークがある間は抽出されない
+        cache_dir = str(tmp_path / "cache") if use_cache else None
+        reader = OrgReader([org_path], cache_dir=cache_dir)
+        book_key = ("ゆるストイック", "https://example.com/book", "2025-04-10 10:00")
+        reader.watermarks = {book_key: ("2025-04-11 09:00", "2025-04-11 10:00")}
+        reader.load_books()
+        with open(org_path, encoding="utf-8") as f:
+            content = f.read()
+        with open(org_path, mode="w", encoding="utf-8") as f:
+            f.write(content.replace(
+                "  CLOCK: [2025-04-11 Fri 10:00]",
+                "  CLOCK: [2025-04-09 Wed 20:00]--[2025-04-09 Wed 20:30] =>  0:30\n  CLOCK: [2025-04-11 Fri 10:00]",
+            ))
+        _, _, clocks = reader.load_books()
+        assert [c["clock_start"] for c in clocks] == ["2025-04-11 10:00"]
+
+        # ウォーターマークを使わずに読み直す（[ORG] FULL_RESCAN）と抽出される
+        reader.watermarks = {}
+        _, _, clocks = reader.load_books()
+        assert [c["clock_start"] for c in clocks] == ["2025-04-09 20:00", "2025-04-11 10:00", "2025-04-10 10:00"]
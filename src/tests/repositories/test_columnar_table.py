@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from repositories.columnar_table import ColumnarTable, INT_NA
+
+# ColumnarTableのテスト
+
+LOG_SCHEMA = {"id": "int", "book_id": "int", "state": "category", "timestamp": "datetime"}
+
+
+@pytest.fixture
+def table():
+    return ColumnarTable.from_rows([
+        {"id": "1", "book_id": "1", "state": "READING", "timestamp": "2025-04-10 10:00"},
+        {"id": "2", "book_id": "1", "state": "DONE", "timestamp": "2025-04-12 21:00"},
+        {"id": "3", "book_id": "2", "state": "READING", "timestamp": ""},
+        {"id": "5", "book_id": "2", "state": "READING", "timestamp": "2025-04-11 09:00"},
+        {"id": "6", "book_id": "1", "state": "DONE", "timestamp": "2025-04-12 21:00"},
+    ], LOG_SCHEMA)
+
+
+class TestColumnarTable:
+    def test_typed_columns(self, table):
+        # 文字列が型付きの配列に変換される
+        assert table.column("id").dtype == np.int64
+        assert table.column("timestamp").dtype == np.dtype("datetime64[m]")
+        assert table.categories("state") == ["READING", "DONE"]
+        assert table.column("state").tolist() == [0, 1, 0, 0, 1]
+        assert table.decode("timestamp")[2] is None
+
+    def test_max(self, table):
+        # 最大値は欠損値を除いて求める
+        assert table.max("id") == 6
+        assert table.max("timestamp") == np.datetime64("2025-04-12T21:00")
+        assert ColumnarTable.from_rows([], {"id": "int"}).max("id") is None
+
+    def test_invalid_values_are_missing(self):
+        # 不正な値は欠損値になる
+        table = ColumnarTable.from_rows(
+            [{"id": "x", "timestamp": "invalid"}, {"id": "2", "timestamp": "2025-04-10"}],
+            {"id": "int", "timestamp": "datetime"}
+        )
+        assert table.column("id").tolist() == [INT_NA, 2]
+        assert table.decode("timestamp") == [None, "2025-04-10 00:00"]
+
+    def test_aggregate(self, table):
+        # グループごとの集計
+        assert table.aggregate("book_id", "id", "count") == {1: 3, 2: 2}
+        assert table.aggregate("book_id", "id", "sum") == {1: 9, 2: 8}
+        assert table.aggregate("book_id", "timestamp", "max") == {
+            1: np.datetime64("2025-04-12T21:00"),
+            2: np.datetime64("2025-04-11T09:00"),
+        }
+        assert table.aggregate("state", "id", "max") == {"READING": 5, "DONE": 6}
+
+    def test_filter_and_decode(self, table):
+        # 絞り込んだ結果をPythonの値に戻せる
+        filtered = table.filter(table.column("book_id") == 2)
+        assert filtered.decode("id") == [3, 5]
+        assert filtered.decode("state") == ["READING", "READING"]
+        assert filtered.decode("timestamp") == [None, "2025-04-11 09:00"]
+
+    def test_concat(self, table):
+        # カテゴリを統合して縦に連結する
+        other = ColumnarTable.from_rows([
+            {"id": "7", "book_id": "3", "state": "TODO", "timestamp": "2025-05-01 08:00"},
+            {"id": "8", "book_id": "3", "state": "DONE", "timestamp": ""},
+        ], LOG_SCHEMA)
+        merged = ColumnarTable.concat([table, other], LOG_SCHEMA)
+        assert len(merged) == 7
+        assert merged.decode("state") == [
+            "READING", "DONE", "READING", "READING", "DONE", "TODO", "DONE"
+        ]
+        assert merged.max("id") == 8
+        assert len(ColumnarTable.concat([], LOG_SCHEMA)) == 0
@@ -3,6 +3,7 @@ import csv
 import os
 from unittest.mock import mock_open, patch, MagicMock
 from dataclasses import dataclass
+from repositories import csv_compression
 from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
 
 # テスト用のダミーモデル
@@ -145,17 +146,33 @@ class TestCsvBaseRepository:
 
     def test_find_next_id_no_records(self, repository):
         # レコードがない場合、ID=1を返す
-        with patch.object(repository, "all", return_value=[]):
+        with patch.object(repository, "iter_all", return_value=iter([])):
             result = repository.find_next_id()
             assert result == 1
 
     def test_find_next_id_with_records(self, repository):
         # レコードがある場合、最大ID+1を返す
         records = [{"id": "1"}, {"id": "3"}, {"id": "2"}]
-        with patch.object(repository, "all", return_value=records):
+        with patch.object(repository, "iter_all", return_value=iter(records)):
             result = repository.find_next_id()
             assert result == 4
 
+    def test_iter_all_projects_columns(self, repository, csv_config, tmp_path):
+        # 指定したカラムだけを1行ずつ返す
+        with open(tmp_path / csv_config.file_name, mode="w", encoding="utf-8", newline="") as f:
+            f.write(",".join(csv_config.columns) + "\n")
+            f.write('1,Book 1,1h,2023-01-01,,,,http://example.com,tag1,"long\nnote"\n')
+            f.write("2,Book 2,,,,,,,,\n")
+        rows = repository.iter_all(columns=["id", "title", "missing"])
+        assert next(rows) == {"id": "1", "title": "Book 1", "missing": None}
+        assert list(rows) == [{"id": "2", "title": "Book 2", "missing": None}]
+        assert [row["notes"] for row in repository.iter_all()] == ["long\nnote", ""]
+
+    def test_iter_all_creates_file(self, repository, csv_config, tmp_path):
+        # ファイルが存在しない場合はヘッダーを書き込み、何も返さない
+        assert list(repository.iter_all(columns=["id"])) == []
+        assert os.path.isfile(tmp_path / csv_config.file_name)
+
     def test_has_header_valid(self, repository):
         # 正しいヘッダーが存在する場合
         csv_content = (
@@ -185,3 +202,143 @@ class TestCsvBaseRepository:
             with patch("csv.DictWriter", return_value=mock_writer):
                 repository._write_header()
                 mock_writer.writeheader.assert_called_once()
+
+
+# キャッシュモードのテスト
+
+
+class TestCsvBaseRepositoryCache:
+    @pytest.fixture
+    def repository(self, csv_config):
+        csv_config.cached = True
+        return CsvBaseRepository(csv_config)
+
+    def _model(self, id_):
+        return DummyModel(
+            id=id_, title=f"Book {id_}", effort="1h", created_at="2023-01-01",
+            ended_at="", scheduled_at="", deadline_at="2023-01-02",
+            url="http://example.com", tags="tag1", notes="Note1"
+        )
+
+    def test_repeated_reads_hit_cache(self, repository):
+        # 2回目以降はファイルを読まない
+        repository.all()
+        with patch("builtins.open") as mock_file:
+            repository.all()
+            repository.find_by_id(1)
+            mock_file.assert_not_called()
+        assert repository.cache_stats == {"hits": 2, "misses": 1}
+
+    def test_iter_all_counts_hits_and_misses(self, repository, csv_config, tmp_path):
+        # ストリーミングで読む場合も、ファイルを読み直した回数をミスとして数える
+        list(repository.iter_all())
+        assert repository.cache_stats == {"hits": 0, "misses": 1}
+        repository.all()
+        list(repository.iter_all(columns=["id"]))
+        assert repository.cache_stats == {"hits": 1, "misses": 2}
+        with open(tmp_path / csv_config.file_name, mode="a", encoding="utf-8") as f:
+            f.write("2,Other,,,,,,,,\n")
+        assert [row["id"] for row in repository.iter_all(columns=["id"])] == ["2"]
+        assert repository.cache_stats == {"hits": 1, "misses": 3}
+
+    def test_add_updates_cache(self, repository):
+        # 追記した行はキャッシュにも反映される
+        repository.all()
+        with patch.object(DummyModel, "to_dict", lambda self, without_none_field=False: vars(self)):
+            repository.add([self._model(1)])
+        with patch("builtins.open") as mock_file:
+            rows = repository.all()
+            mock_file.assert_not_called()
+        assert rows[0]["id"] == "1"
+        assert rows[0]["title"] == "Book 1"
+
+    def test_invalidate_on_file_change(self, repository, csv_config, tmp_path):
+        # ファイルが外部で変更された場合は読み直す
+        repository.all()
+        with open(tmp_path / csv_config.file_name, mode="a", encoding="utf-8") as f:
+            f.write("2,Other,,,,,,,,\n")
+        assert [row["id"] for row in repository.all()] == ["2"]
+        assert repository.cache_stats == {"hits": 0, "misses": 2}
+
+
+# ヘッダー確認のテスト
+
+
+class TestCsvBaseRepositoryHeader:
+    @pytest.fixture
+    def repository(self, csv_config):
+        return CsvBaseRepository(csv_config)
+
+    def _add(self, repository, *ids):
+        models = [
+            DummyModel(id=id_, title=f"Book {id_}", effort="", created_at="", ended_at="",
+                       scheduled_at="", deadline_at="", url="", tags="", notes="")
+            for id_ in ids
+        ]
+        with patch.object(DummyModel, "to_dict", lambda self, without_none_field=False: vars(self)):
+            repository.add(models)
+
+    def test_add_opens_file_once(self, repository, csv_config, tmp_path):
+        # 新規ファイルへの追記もヘッダー確認済みファイルへの追記も1回のオープンで済む
+        with patch("builtins.open", wraps=open) as mock_file:
+            self._add(repository, 1)
+            self._add(repository, 2)
+        assert mock_file.call_count == 2
+        with open(tmp_path / csv_config.file_name, encoding="utf-8") as f:
+            assert f.readline().strip() == ",".join(csv_config.columns)
+        assert [row["id"] for row in repository.iter_all(columns=["id"])] == ["1", "2"]
+
+    def test_header_rechecked_after_external_change(self, repository, csv_config, tmp_path):
+        # 外部でファイルが変更された場合はヘッダーを確認し直す
+        self._add(repository, 1)
+        with open(tmp_path / csv_config.file_name, mode="w", encoding="utf-8") as f:
+            f.write("id,invalid_column\n")
+        self._add(repository, 2)
+        assert [row["id"] for row in repository.all()] == ["2"]
+
+
+# 圧縮CSVのテスト
+
+
+class TestCsvBaseRepositoryCompression:
+    @pytest.fixture(params=[
+        "gzip",
+        pytest.param("zstd", marks=pytest.mark.skipif(
+            csv_compression.zstandard is None, reason="zstandard is not installed")),
+    ])
+    def repository(self, request, csv_config):
+        csv_config.file_name = f"test.csv.{request.param}"
+        csv_config.compression = request.param
+        csv_config.key_columns = ["title"]
+        return CsvBaseRepository(csv_config)
+
+    def _add(self, repository, *ids):
+        models = [
+            DummyModel(id=id_, title=f"Book {id_}", effort="", created_at="", ended_at="",
+                       scheduled_at="", deadline_at="", url="", tags="", notes="長い\nメモ")
+            for id_ in ids
+        ]
+        with patch.object(DummyModel, "to_dict", lambda self, without_none_field=False: vars(self)):
+            repository.add(models)
+
+    def test_append_as_new_members(self, repository, csv_config, tmp_path):
+        # 追記は既存の内容を書き換えず末尾に追加する
+        self._add(repository, 1, 2)
+        path = tmp_path / csv_config.file_name
+        with open(path, mode="rb") as f:
+            first = f.read()
+        self._add(repository, 3)
+        with open(path, mode="rb") as f:
+            assert f.read().startswith(first)
+
+        assert [row["id"] for row in repository.iter_all(columns=["id"])] == ["1", "2", "3"]
+        assert repository.all()[0]["notes"] == "長い\nメモ"
+        assert repository.find_by_id(3)["title"] == "Book 3"
+        assert repository.find_keys() == {("Book 1",): 1, ("Book 2",): 2, ("Book 3",): 3}
+        assert repository.find_next_id() == 4
+
+    def test_unknown_compression(self, csv_config):
+        # 未知の圧縮形式はエラー
+        csv_config.compression = "lz4"
+        with pytest.raises(ValueError):
+            CsvBaseRepository(csv_config)
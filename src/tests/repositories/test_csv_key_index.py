@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import patch
+from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
+from repositories.csv_key_index import CsvKeyIndex
+from models.org import BookClockLog
+
+# CsvKeyIndexのテスト
+
+
+@pytest.fixture
+def csv_config(tmp_path):
+    return CsvConfig(
+        file_name="BookClockLogs.csv",
+        base_path=str(tmp_path),
+        columns=["id", "book_id", "clock_start", "clock_end", "duration_min"],
+        key_map={
+            "id": "id",
+            "book_id": "book_id",
+            "clock_start": "clock_start",
+            "clock_end": "clock_end",
+            "duration_min": "duration_min"
+        },
+        model_type=BookClockLog,
+        key_columns=["clock_start", "clock_end", "book_id"]
+    )
+
+
+class TestCsvKeyIndex:
+    @pytest.fixture
+    def repository(self, csv_config):
+        repository = CsvBaseRepository(csv_config)
+        repository.add([
+            BookClockLog(id=1, book_id=1, clock_start="2025-04-10 10:00", clock_end="2025-04-10 10:30"),
+            BookClockLog(id=2, book_id=2, clock_start="2025-04-10 11:00", clock_end=None),
+        ])
+        return repository
+
+    def test_find_keys(self, repository):
+        # 追記した行のキーがインデックスから取得できる
+        assert repository.find_keys() == {
+            ("2025-04-10 10:00", "2025-04-10 10:30", "1"): 1,
+            ("2025-04-10 11:00", None, "2"): 2,
+        }
+        assert repository.find_next_id() == 3
+
+    def test_offsets_point_to_rows(self, repository, csv_config, tmp_path):
+        # 記録したオフセットが行の先頭を指している
+        index = CsvKeyIndex(str(tmp_path / csv_config.file_name), csv_config.key_columns)
+        with open(tmp_path / csv_config.file_name, mode="rb") as f:
+            f.seek(index.offset_of(2))
+            assert f.readline().startswith(b"2,2,2025-04-10 11:00")
+
+    def test_rebuild_after_manual_edit(self, repository, csv_config, tmp_path):
+        # CSVが手動で編集された場合は再構築される
+        with open(tmp_path / csv_config.file_name, mode="a", encoding="utf-8", newline="") as f:
+            f.write('10,3,2025-04-11 10:00,"2025-04-11\n10:30",30\r\n')
+        keys = repository.find_keys()
+        assert keys[("2025-04-11 10:00", "2025-04-11\n10:30", "3")] == 10
+        assert repository.find_next_id() == 11
+
+    def test_find_by_id_reads_single_row(self, repository):
+        # オフセットから1行だけ読み込む
+        with patch("repositories.csv_base_repository.CsvBaseRepository.all") as mock_all:
+            assert repository.find_by_id(2) == {
+                "id": "2", "book_id": "2", "clock_start": "2025-04-10 11:00",
+                "clock_end": "", "duration_min": ""
+            }
+            assert repository.find_by_id(3) is None
+            mock_all.assert_not_called()
+
+    def test_find_by_ids(self, repository):
+        # 複数IDをまとめて取得する
+        rows = repository.find_by_ids([2, 1, 5])
+        assert sorted(rows) == [1, 2]
+        assert rows[1]["clock_start"] == "2025-04-10 10:00"
@@ -0,0 +1,99 @@
+import os
+import numpy as np
+import pytest
+from unittest.mock import patch
+from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
+from repositories.csv_snapshot import CsvSnapshot
+from models.org import BookLog
+
+# CsvSnapshotのテスト
+
+COLUMN_TYPES = {
+    "id": "int",
+    "book_id": "int",
+    "state": "category",
+    "from_status": "str",
+    "timestamp": "datetime",
+}
+
+
+@pytest.fixture
+def csv_config(tmp_path):
+    return CsvConfig(
+        file_name="BookLogs.csv",
+        base_path=str(tmp_path),
+        columns=["id", "book_id", "state", "from_status", "timestamp"],
+        key_map={
+            "id": "id",
+            "book_id": "book_id",
+            "state": "state",
+            "from_status": "from_status",
+            "timestamp": "timestamp"
+        },
+        model_type=BookLog,
+        column_types=COLUMN_TYPES,
+        snapshot=True
+    )
+
+
+class TestCsvSnapshot:
+    @pytest.fixture
+    def repository(self, csv_config):
+        repository = CsvBaseRepository(csv_config)
+        repository.add([
+            BookLog(id=1, book_id=1, state="READING", from_status="TODO", timestamp="2025-04-11 09:00"),
+            BookLog(id=2, book_id=1, state="DONE", from_status="読書中", timestamp="2025-04-12 21:00"),
+            BookLog(id=3, book_id=2, state="READING", from_status=None, timestamp=None),
+        ])
+        repository.refresh_snapshot()
+        return repository
+
+    def test_round_trip(self, repository, tmp_path):
+        # 書き出したスナップショットをmmapで読み込める
+        snapshot = CsvSnapshot(str(tmp_path / "BookLogs.csv"), COLUMN_TYPES)
+        assert snapshot.is_fresh()
+        table = snapshot.load()
+        assert {name: table.decode(name) for name in table.column_names} == {
+            "id": [1, 2, 3],
+            "book_id": [1, 1, 2],
+            "state": ["READING", "DONE", "READING"],
+            "from_status": ["TODO", "読書中", None],
+            "timestamp": ["2025-04-11 09:00", "2025-04-12 21:00", None],
+        }
+        # 数値カラムはmmap上の配列を参照する（コピーしない）
+        assert not table.column("id").flags.owndata
+        assert not table.column("id").flags.writeable
+
+    def test_load_table_skips_csv(self, repository):
+        # スナップショットが新しい場合はCSVを読まない
+        with patch.object(repository, "iter_all") as mock_iter_all:
+            table = repository.load_table(["id", "timestamp"])
+            mock_iter_all.assert_not_called()
+        assert table.column_names == ["id", "timestamp"]
+        assert table.max("id") == 3
+
+    def test_rebuild_when_behind_csv(self, repository, tmp_path):
+        # CSVに追記された場合は古いと判定され、読み込み時に作り直される
+        repository.add([BookLog(id=4, book_id=2, state="DONE", from_status="READING", timestamp="2025-04-13 08:00")])
+        snapshot = CsvSnapshot(str(tmp_path / "BookLogs.csv"), COLUMN_TYPES)
+        assert not snapshot.is_fresh()
+        assert snapshot.load() is None
+
+        assert repository.load_table(["id"]).max("id") == 4
+        assert snapshot.is_fresh()
+        assert repository.find_next_id() == 5
+
+    def test_ignore_schema_mismatch(self, repository, tmp_path):
+        # スキーマが変わった場合はスナップショットを使わない
+        snapshot = CsvSnapshot(str(tmp_path / "BookLogs.csv"), {"id": "int"})
+        assert not snapshot.is_fresh()
+        assert snapshot.load() is None
+
+    def test_ignore_broken_file(self, repository, tmp_path):
+        # 壊れたスナップショットは使わずにCSVから読み込む
+        snapshot_path = str(tmp_path / "BookLogs.csv.snapshot")
+        with open(snapshot_path, mode="wb") as f:
+            f.write(b"broken")
+        assert CsvSnapshot(str(tmp_path / "BookLogs.csv"), COLUMN_TYPES).load() is None
+        assert repository.load_table(["book_id"]).aggregate("book_id", "book_id", "count") == {1: 2, 2: 1}
+        assert os.path.getsize(snapshot_path) > len(b"broken")
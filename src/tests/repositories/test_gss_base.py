@@ -0,0 +1,157 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import gspread
+from repositories import gss_base
+from repositories.gss_base import GSSBase
+from repositories.model_adapter import ModelAdapter
+from common.exceptions import MyGssException
+from models.org import BookClockLog
+
+# GSSBaseのテスト
+
+COLUMNS = ["id", "book_id", "clock_start", "clock_end", "duration_min"]
+
+
+def clock(id_):
+    return BookClockLog(id=id_, book_id=1, clock_start="2025-04-10 10:00",
+                        clock_end="2025-04-10 10:30", duration_min=30)
+
+
+def api_error(status):
+    response = MagicMock()
+    response.json.return_value = {"error": {"code": 500, "message": status, "status": status}}
+    return gspread.exceptions.APIError(response)
+
+
+@pytest.fixture
+def repository():
+    with patch.object(gss_base, "IS_OFFLINE", True):
+        repository = GSSBase(sheet_key="key", sheet_name="BookClockLogs", columns=COLUMNS,
+                             adapter=ModelAdapter(model=BookClockLog, key_map={c: c for c in COLUMNS}))
+    repository.worksheet = MagicMock()
+    repository.worksheet.col_values.return_value = ["id", "1", "2"]
+    repository.rate_limiter = MagicMock()
+    gss_base._ROW_CURSORS.clear()
+    with patch.object(gss_base, "IS_OFFLINE", False):
+        yield repository
+    gss_base._ROW_CURSORS.clear()
+
+
+class TestGSSBaseRowCursor:
+    def test_first_column_read_once(self, repository):
+        # 1列目は初回だけ取得し、以降はカーソルを進める
+        repository.add([clock(3), clock(4)])
+        repository.add([clock(5)])
+        assert repository.worksheet.col_values.call_count == 1
+        rows = [call.args[1] for call in repository.worksheet.insert_rows.call_args_list]
+        assert rows == [4, 6]
+
+    def test_skip_empty_data(self, repository):
+        # 書き込むデータがない場合はAPIを呼ばない
+        repository.add([])
+        repository.worksheet.col_values.assert_not_called()
+        repository.worksheet.insert_rows.assert_not_called()
+
+    def test_gap_in_first_column(self, repository):
+        # 1列目の途中に空のセルがあっても、最後の値の次の行に書き込む
+        repository.worksheet.col_values.return_value = ["id", "1", "", "3"]
+        repository.add([clock(4)])
+        repository.worksheet.insert_rows.assert_called_once()
+        assert repository.worksheet.insert_rows.call_args.args[1] == 5
+
+    def test_resync_after_error(self, repository):
+        # 書き込みに失敗した後はシートから行番号を読み直す
+        repository.add([clock(3)])
+        repository.worksheet.insert_rows.side_effect = [api_error("INTERNAL"), None]
+        with patch("common.decorator.gss_deco.time.sleep"):
+            repository.add([clock(4)])
+        assert repository.worksheet.col_values.call_count == 2
+        with patch("common.decorator.gss_deco.time.sleep"):
+            repository.worksheet.insert_rows.side_effect = api_error("INTERNAL")
+            with pytest.raises(MyGssException):
+                repository.add([clock(5)])
+        assert ("key", "BookClockLogs") not in gss_base._ROW_CURSORS
+
+
+class TestGSSBaseLazyOpen:
+    def test_open_on_first_write(self):
+        # 作成時は接続せず、最初の書き込みでシートを開いてヘッダー行を確認する
+        registry = MagicMock()
+        registry.header.return_value = COLUMNS
+        with patch.object(gss_base, "spreadsheet_registry", return_value=registry):
+            repository = GSSBase(sheet_key="key", sheet_name="BookClockLogs", columns=COLUMNS,
+                                 adapter=ModelAdapter(model=BookClockLog, key_map={c: c for c in COLUMNS}))
+        registry.worksheet.assert_not_called()
+
+        worksheet = registry.worksheet.return_value
+        worksheet.col_values.return_value = ["id"]
+        repository.rate_limiter = MagicMock()
+        gss_base._ROW_CURSORS.clear()
+        with patch.object(gss_base, "IS_OFFLINE", False):
+            repository.add([clock(1)])
+            repository.add([clock(2)])
+        gss_base._ROW_CURSORS.clear()
+        registry.worksheet.assert_called_once_with("key", "BookClockLogs")
+        worksheet.insert_row.assert_not_called()
+        assert worksheet.insert_rows.call_count == 2
+
+    def test_write_missing_header(self):
+        # ヘッダー行がない場合は書き込み、キャッシュを更新する
+        registry = MagicMock()
+        registry.header.return_value = []
+        with patch.object(gss_base, "spreadsheet_registry", return_value=registry):
+            repository = GSSBase(sheet_key="key", sheet_name="BookClockLogs", columns=COLUMNS,
+                                 adapter=ModelAdapter(model=BookClockLog, key_map={c: c for c in COLUMNS}))
+        repository.rate_limiter = MagicMock()
+        repository.open_worksheet()
+        registry.worksheet.return_value.insert_row.assert_called_once_with(COLUMNS, index=1)
+        registry.set_header.assert_called_once_with("key", "BookClockLogs", COLUMNS)
+
+
+class TestGSSBaseSnapshot:
+    @pytest.fixture
+    def sheet(self, repository):
+        repository.worksheet.get_all_values.return_value = [
+            COLUMNS,
+            ["1", "1", "2025-04-10 10:00", "2025-04-10 10:30", "30"],
+            ["", "", "", "", ""],
+            ["2", "1", "2025-04-11 10:00", "2025-04-11 10:30", "30"],
+        ]
+        return repository
+
+    def test_all(self, sheet):
+        # シート全体を1回で読み込み、idをキーにしたスナップショットを作る
+        records = sheet.all()
+        assert [record["id"] for record in records] == ["1", "2"]
+        assert sheet.snapshot["2"][0] == 4
+        assert sheet.find_by_id(1)["clock_start"] == "2025-04-10 10:00"
+        assert sheet.find_by_id(3) is None
+        sheet.worksheet.get_all_values.assert_called_once()
+        # 最終行の次から追記する
+        assert gss_base._ROW_CURSORS[("key", "BookClockLogs")] == 5
+
+    def test_diff_rows(self, sheet):
+        # シートにない行と内容が異なる行だけを返す（数値の表示形式の違いは無視する）
+        local = [
+            {"id": "1", "book_id": "1", "clock_start": "2025-04-10 10:00",
+             "clock_end": "2025-04-10 10:30", "duration_min": "30.0"},
+            {"id": "2", "book_id": "1", "clock_start": "2025-04-11 10:00",
+             "clock_end": "2025-04-11 10:45", "duration_min": "45"},
+            {"id": "3", "book_id": "2", "clock_start": "2025-04-12 10:00",
+             "clock_end": None, "duration_min": ""},
+            {"id": "", "book_id": "2"},
+        ]
+        missing, changed = sheet.diff_rows(local)
+        assert missing == [[3, 2, "2025-04-12 10:00", "", ""]]
+        assert changed == {4: [2, 1, "2025-04-11 10:00", "2025-04-11 10:45", 45]}
+
+    def test_diff_rows_offline(self, sheet):
+        # オフラインモードではシートを読まず、追記・更新する行もない
+        with patch.object(gss_base, "IS_OFFLINE", True):
+            assert sheet.diff_rows([{"id": "3", "book_id": "2"}]) == ([], {})
+        sheet.worksheet.get_all_values.assert_not_called()
+        assert sheet.snapshot is None
+
+    def test_offline_flag_is_boolean(self):
+        # 設定の "False" は文字列のまま真にならない
+        assert isinstance(gss_base.IS_OFFLINE, bool)
@@ -0,0 +1,171 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import gspread
+from repositories import gss_base
+from repositories.gss_base import GSSBase
+from repositories.gss_batch_writer import GssBatchWriter
+from repositories.model_adapter import ModelAdapter
+from models.org import BookClockLog, BookLog
+
+# GssBatchWriterのテスト
+
+CLOCK_COLUMNS = ["id", "book_id", "clock_start", "clock_end", "duration_min"]
+LOG_COLUMNS = ["id", "book_id", "state", "from_status", "timestamp"]
+
+
+def build_repository(sheet_name, columns, model_type, spreadsheet, first_column, sheet_id=0):
+    with patch.object(gss_base, "IS_OFFLINE", True):
+        repository = GSSBase(sheet_key="key", sheet_name=sheet_name, columns=columns,
+                             adapter=ModelAdapter(model=model_type, key_map={c: c for c in columns}))
+    repository.worksheet = MagicMock(spreadsheet=spreadsheet, row_count=1000, id=sheet_id)
+    repository.worksheet.col_values.return_value = first_column
+    repository.rate_limiter = MagicMock()
+    return repository
+
+
+def clock(id_):
+    return BookClockLog(id=id_, book_id=1, clock_start="2025-04-10 10:00",
+                        clock_end="2025-04-10 10:30", duration_min=30)
+
+
+def log(id_):
+    return BookLog(id=id_, book_id=1, state="DONE", from_status="READING", timestamp="2025-04-10 10:00")
+
+
+def api_error(status):
+    response = MagicMock()
+    response.json.return_value = {"error": {"code": 500, "message": status, "status": status}}
+    return gspread.exceptions.APIError(response)
+
+
+@pytest.fixture
+def spreadsheet():
+    return MagicMock()
+
+
+@pytest.fixture
+def repositories(spreadsheet):
+    gss_base._ROW_CURSORS.clear()
+    clocks = build_repository("BookClockLogs", CLOCK_COLUMNS, BookClockLog, spreadsheet, ["id", "1"], 11)
+    logs = build_repository("BookLogs", LOG_COLUMNS, BookLog, spreadsheet, ["id", "1", "2"], 22)
+    with patch.object(gss_base, "IS_OFFLINE", False):
+        yield clocks, logs
+    gss_base._ROW_CURSORS.clear()
+
+
+def sent_requests(spreadsheet):
+    return [call.args[0]["requests"] for call in spreadsheet.batch_update.call_args_list]
+
+
+def values(row_data):
+    return [cell.get("userEnteredValue", {}) for cell in row_data["values"]]
+
+
+class TestGssBatchWriter:
+    def test_single_request_for_all_sheets(self, repositories, spreadsheet):
+        # 複数シートへの追記を、シートごとの appendCells として1回のbatchUpdateで書き込む
+        clocks, logs = repositories
+        writer = GssBatchWriter()
+        writer.stage(clocks, [clock(2), clock(3)])
+        writer.stage(logs, [log(3)])
+        writer.stage(logs, [])
+        assert writer.flush() == 3
+
+        spreadsheet.batch_update.assert_called_once()
+        spreadsheet.values_batch_update.assert_not_called()
+        requests = sent_requests(spreadsheet)[0]
+        assert [request["appendCells"]["sheetId"] for request in requests] == [11, 22]
+        assert len(requests[0]["appendCells"]["rows"]) == 2
+        assert values(requests[0]["appendCells"]["rows"][1]) == [
+            {"numberValue": 3}, {"numberValue": 1}, {"stringValue": "2025-04-10 10:00"},
+            {"stringValue": "2025-04-10 10:30"}, {"numberValue": 30},
+        ]
+        assert writer.pending_rows == 0
+        # 追記では行番号を使わないため、1列目を読まない
+        clocks.worksheet.col_values.assert_not_called()
+
+    def test_gap_in_first_column(self, repositories, spreadsheet):
+        # 1列目の途中に空のセルがあっても、行番号を指定しないため既存の行を上書きしない
+        clocks, _ = repositories
+        clocks.worksheet.col_values.return_value = ["id", "1", "", "3"]
+        writer = GssBatchWriter()
+        writer.stage(clocks, [clock(4)])
+        writer.flush()
+        requests = sent_requests(spreadsheet)[0]
+        assert list(requests[0]) == ["appendCells"]
+        assert "start" not in requests[0]["appendCells"]
+        clocks.worksheet.col_values.assert_not_called()
+
+    def test_external_append(self, repositories, spreadsheet):
+        # 他のプロセスがシートに追記した後も、前回の行番号ではなく末尾に追記する
+        clocks, _ = repositories
+        writer = GssBatchWriter()
+        writer.stage(clocks, [clock(2)])
+        writer.flush()
+        clocks.worksheet.col_values.return_value = ["id", "1", "2", "3", "4"]
+        writer.stage(clocks, [clock(5)])
+        writer.flush()
+        second = sent_requests(spreadsheet)[1]
+        assert list(second[0]) == ["appendCells"]
+        assert values(second[0]["appendCells"]["rows"][0])[0] == {"numberValue": 5}
+
+        # GSSBase.add の行カーソルも読み直す
+        clocks.add([clock(6)])
+        assert clocks.worksheet.insert_rows.call_args.args[1] == 6
+
+    def test_chunk_by_payload_size(self, repositories, spreadsheet):
+        # ペイロードの上限を超える場合はリクエストを分ける
+        clocks, logs = repositories
+        writer = GssBatchWriter(max_payload_bytes=600)
+        writer.stage(clocks, [clock(i) for i in range(2, 6)])
+        writer.stage(logs, [log(3)])
+        assert writer.flush() == 5
+        calls = sent_requests(spreadsheet)
+        assert len(calls) > 1
+        appended = [
+            values(row)[0]["numberValue"]
+            for requests in calls for request in requests
+            if request["appendCells"]["sheetId"] == 11
+            for row in request["appendCells"]["rows"]
+        ]
+        assert appended == [2, 3, 4, 5]
+
+    def test_retry_resends_failed_request(self, repositories, spreadsheet):
+        # batchUpdateは全体が反映されないため、失敗したリクエストをそのまま送り直す
+        clocks, _ = repositories
+        spreadsheet.batch_update.side_effect = [api_error("INTERNAL"), None]
+        writer = GssBatchWriter()
+        writer.stage(clocks, [clock(2)])
+        with patch("common.decorator.gss_deco.time.sleep"):
+            assert writer.flush() == 1
+        first, second = sent_requests(spreadsheet)
+        assert first == second
+        assert writer.pending_rows == 0
+
+    def test_updates_and_appends(self, repositories, spreadsheet):
+        # 既存の行の更新と追記を1回のリクエストで書き込み、連続した行は1つの updateCells にまとめる
+        clocks, _ = repositories
+        writer = GssBatchWriter()
+        writer.stage_updates(clocks, {2: ["a"], 5: ["c"], 4: [None]})
+        writer.stage_rows(clocks, [["d"], ["e"]])
+        assert writer.pending_rows == 5
+        assert writer.flush() == 5
+        requests = sent_requests(spreadsheet)[0]
+        assert [values(row) for row in requests[0]["appendCells"]["rows"]] == [
+            [{"stringValue": "d"}], [{"stringValue": "e"}]
+        ]
+        assert [request["updateCells"]["start"] for request in requests[1:]] == [
+            {"sheetId": 11, "rowIndex": 1, "columnIndex": 0},
+            {"sheetId": 11, "rowIndex": 3, "columnIndex": 0},
+        ]
+        assert [values(row) for row in requests[2]["updateCells"]["rows"]] == [[{}], [{"stringValue": "c"}]]
+        assert writer.pending_rows == 0
+
+    def test_reject_other_spreadsheet(self, repositories):
+        clocks, _ = repositories
+        other = build_repository("Other", CLOCK_COLUMNS, BookClockLog, MagicMock(), [])
+        other.sheet_key = "other"
+        writer = GssBatchWriter()
+        writer.stage(clocks, [clock(2)])
+        with pytest.raises(ValueError):
+            writer.stage(other, [clock(3)])
@@ -0,0 +1,31 @@
+import pytest
+from repositories.key_index import KeyIndex
+
+# KeyIndexのテスト
+
+
+class TestKeyIndex:
+    @pytest.fixture
+    def index(self):
+        records = [
+            {"id": "1", "book_id": "1", "clock_start": "2025-04-10 10:00", "clock_end": "2025-04-10 10:30"},
+            {"id": "2", "book_id": "2", "clock_start": "2025-04-10 11:00", "clock_end": ""},
+        ]
+        return KeyIndex.from_records(records, ["clock_start", "clock_end", "book_id"], {"book_id": int})
+
+    def test_contains_existing_key(self, index):
+        # CSVの文字列book_idとorgのint book_idが一致する
+        assert ("2025-04-10 10:00", "2025-04-10 10:30", 1) in index
+        assert len(index) == 2
+
+    def test_empty_value_is_none(self, index):
+        # 空文字はNoneとして扱う
+        key = index.key_of({"clock_start": "2025-04-10 11:00", "clock_end": None, "book_id": 2})
+        assert key in index
+
+    def test_add_key(self, index):
+        # 追加したキーが即座に検索できる
+        key = index.key_of({"clock_start": "2025-04-11 10:00", "clock_end": "2025-04-11 10:30", "book_id": 1})
+        assert key not in index
+        index.add(key)
+        assert key in index
@@ -0,0 +1,85 @@
+import os
+from datetime import datetime
+import pytest
+from unittest.mock import patch
+from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
+from repositories.parquet_repository import ParquetRepository, ParquetConfig
+from models.org import BookClockLog
+
+# ParquetRepositoryのテスト
+
+COLUMNS = ["id", "book_id", "clock_start", "clock_end", "duration_min"]
+KEY_MAP = {column: column for column in COLUMNS}
+COLUMN_TYPES = {"id": "int", "book_id": "int", "clock_start": "datetime", "clock_end": "datetime", "duration_min": "int"}
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return ParquetRepository(ParquetConfig(
+        base_path=str(tmp_path / "BookClockLogs"),
+        columns=COLUMNS,
+        key_map=KEY_MAP,
+        model_type=BookClockLog,
+        partition_column="clock_start",
+        column_types=COLUMN_TYPES
+    ))
+
+
+def clock(id_, clock_start, clock_end=None):
+    return BookClockLog(id=id_, book_id=1, clock_start=clock_start, clock_end=clock_end, duration_min=30)
+
+
+class TestParquetRepository:
+    def test_partitioned_by_month(self, repository, tmp_path):
+        # clock_startの年月ごとのディレクトリに書き込む
+        repository.add([clock(1, "2025-04-10 10:00"), clock(2, "2025-05-01 00:00"), clock(3, None)])
+        base = tmp_path / "BookClockLogs"
+        assert len(os.listdir(base / "year=2025" / "month=4")) == 1
+        assert len(os.listdir(base / "year=2025" / "month=5")) == 1
+        assert repository.find_by_id(3)["clock_start"] is None
+        assert repository.find_next_id() == 4
+
+    def test_append_by_new_file(self, repository, tmp_path):
+        # 追記のたびに新しいファイルを作り、既存のファイルは書き換えない
+        repository.add([clock(1, "2025-04-10 10:00", "2025-04-10 10:30")])
+        repository.add([clock(2, "2025-04-11 10:00")])
+        assert len(os.listdir(tmp_path / "BookClockLogs" / "year=2025" / "month=4")) == 2
+        assert sorted(row["id"] for row in repository.all()) == [1, 2]
+        assert repository.find_by_id(1)["clock_end"] == datetime(2025, 4, 10, 10, 30)
+
+    def test_read_date_range(self, repository):
+        # 日付範囲で絞り込み、対象外の月のファイルは読まない
+        repository.add([clock(1, "2025-03-31 23:00"), clock(2, "2025-04-01 00:00"),
+                        clock(3, "2025-04-30 23:59"), clock(4, "2025-05-01 00:00")])
+        table = repository.read(start="2025-04-01", end="2025-05-01", columns=["id"])
+        assert sorted(table.column("id").to_pylist()) == [2, 3]
+
+        opened = []
+        original = ParquetRepository._dataset
+
+        def dataset(self):
+            result = original(self)
+            opened.extend(fragment.path for fragment in result.get_fragments(
+                filter=self._range_expression("2025-04-01", "2025-05-01")))
+            return result
+
+        with patch.object(ParquetRepository, "_dataset", dataset):
+            repository.read(start="2025-04-01", end="2025-05-01")
+        assert opened and all("month=4" in path for path in opened)
+
+    def test_read_empty(self, repository):
+        # データセットがない場合は空のテーブルを返す
+        assert repository.read(columns=["id"]).num_rows == 0
+        assert repository.find_next_id() == 1
+
+    def test_export_from_csv(self, repository, tmp_path):
+        # 未書き出しのIDの行だけを追記する
+        csv_repository = CsvBaseRepository(CsvConfig(
+            file_name="BookClockLogs.csv", base_path=str(tmp_path), columns=COLUMNS,
+            key_map=KEY_MAP, model_type=BookClockLog
+        ))
+        csv_repository.add([clock(1, "2025-04-10 10:00"), clock(2, "2025-05-10 10:00")])
+        assert repository.export_from(csv_repository) == 2
+        csv_repository.add([clock(3, "2025-05-11 10:00")])
+        assert repository.export_from(csv_repository) == 1
+        assert sorted(row["id"] for row in repository.all()) == [1, 2, 3]
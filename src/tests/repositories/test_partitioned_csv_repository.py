@@ -0,0 +1,159 @@
+import json
+import pytest
+from unittest.mock import patch
+from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
+from repositories.key_index import PartitionedKeyIndex
+from repositories.partitioned_csv_repository import PartitionedCsvRepository, PartitionedCsvConfig
+from models.org import BookClockLog
+
+# PartitionedCsvRepositoryのテスト
+
+COLUMNS = ["id", "book_id", "clock_start", "clock_end", "duration_min"]
+KEY_MAP = {column: column for column in COLUMNS}
+KEY_COLUMNS = ["clock_start", "clock_end", "book_id"]
+COLUMN_TYPES = {"id": "int", "book_id": "int", "clock_start": "datetime", "clock_end": "datetime", "duration_min": "int"}
+
+
+def clock(id_, clock_start, book_id=1):
+    clock_end = None if clock_start is None else clock_start[:-2] + "30"
+    return BookClockLog(id=id_, book_id=book_id, clock_start=clock_start, clock_end=clock_end, duration_min=30)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = PartitionedCsvRepository(PartitionedCsvConfig(
+        base_path=str(tmp_path / "BookClockLogs"),
+        columns=COLUMNS,
+        key_map=KEY_MAP,
+        model_type=BookClockLog,
+        partition_column="clock_start",
+        key_columns=KEY_COLUMNS,
+        column_types=COLUMN_TYPES,
+        group_column="book_id"
+    ))
+    repository.add([
+        clock(1, "2025-03-31 23:00"),
+        clock(2, "2025-04-10 10:00"),
+        clock(3, "2025-04-20 10:00", book_id=2),
+        clock(4, "2025-05-01 08:00"),
+        clock(5, None),
+    ])
+    return repository
+
+
+class TestPartitionedCsvRepository:
+    def test_files_and_manifest(self, repository, tmp_path):
+        # 年月ごとのCSVに分割し、マニフェストに最小/最大IDを記録する
+        base_path = tmp_path / "BookClockLogs"
+        assert repository.partitions() == ["2025-03", "2025-04", "2025-05", "unknown"]
+        with open(base_path / "manifest.json", encoding="utf-8") as f:
+            partitions = json.load(f)["partitions"]
+        assert partitions["2025-04"]["min_id"] == 2
+        assert partitions["2025-04"]["max_id"] == 3
+        assert partitions["2025-04"]["rows"] == 2
+        assert repository.find_next_id() == 6
+        assert [row["id"] for row in repository.all()] == ["1", "2", "3", "4", "5"]
+
+    def test_iter_range_reads_only_overlapping_partitions(self, repository):
+        # 範囲に重なる月のCSVだけを読み、範囲外の行を除く
+        read = []
+        original = CsvBaseRepository.iter_all
+
+        def spy(shard, columns=None):
+            read.append(shard._path.rsplit("/", 1)[-1])
+            return original(shard, columns)
+
+        with patch.object(CsvBaseRepository, "iter_all", spy):
+            rows = list(repository.iter_range("2025-04-01", "2025-04-15", columns=["id"]))
+        assert rows == [{"id": "2"}]
+        assert read == ["2025-04.csv"]
+
+    def test_find_by_id_uses_manifest(self, repository):
+        # マニフェストのID範囲に該当するパーティションだけを読む
+        with patch.object(CsvBaseRepository, "find_by_ids", autospec=True,
+                          side_effect=CsvBaseRepository.find_by_ids) as mock_find:
+            assert repository.find_by_id(4)["clock_start"] == "2025-05-01 08:00"
+        assert [call.args[0]._path.rsplit("/", 1)[-1] for call in mock_find.call_args_list] == ["2025-05.csv"]
+        assert repository.find_by_id(99) is None
+
+    def test_find_keys_by_partition(self, repository):
+        # パーティションを指定して複合キーを取得できる
+        assert repository.find_keys(partitions=["2025-05", "2026-01"]) == {
+            ("2025-05-01 08:00", "2025-05-01 08:30", "1"): 4
+        }
+        assert len(repository.find_keys()) == 5
+
+    def test_manifest_rebuilt_when_csv_changes(self, repository, tmp_path):
+        # マニフェストの外でCSVが変わった場合は読み直す
+        CsvBaseRepository(CsvConfig(
+            file_name="2025-05.csv",
+            base_path=str(tmp_path / "BookClockLogs"),
+            columns=COLUMNS,
+            key_map=KEY_MAP,
+            model_type=BookClockLog
+        )).add([clock(10, "2025-05-02 08:00")])
+        reopened = PartitionedCsvRepository(repository._config)
+        assert reopened.find_next_id() == 11
+        assert reopened.find_by_id(10)["clock_start"] == "2025-05-02 08:00"
+
+    def test_latest_by_group_uses_manifest(self, repository):
+        # グループごとの最新の日時はマニフェストから取得し、CSVは読まない
+        reopened = PartitionedCsvRepository(repository._config)
+        with patch.object(CsvBaseRepository, "iter_all") as mock_iter_all:
+            assert reopened.latest_by_group() == {"1": "2025-05-01 08:00", "2": "2025-04-20 10:00"}
+            mock_iter_all.assert_not_called()
+
+    def test_latest_by_group_rebuilt_when_csv_changes(self, repository, tmp_path):
+        # マニフェストの外でCSVが変わった場合や古い形式のマニフェストは、CSVから読み直す
+        CsvBaseRepository(CsvConfig(
+            file_name="2025-03.csv",
+            base_path=str(tmp_path / "BookClockLogs"),
+            columns=COLUMNS,
+            key_map=KEY_MAP,
+            model_type=BookClockLog
+        )).add([clock(10, "2025-03-01 08:00", book_id=3)])
+        with open(tmp_path / "BookClockLogs" / "manifest.json", mode="w", encoding="utf-8") as f:
+            json.dump({"version": 1, "partitions": {}}, f)
+        reopened = PartitionedCsvRepository(repository._config)
+        assert reopened.latest_by_group() == {
+            "1": "2025-05-01 08:00", "2": "2025-04-20 10:00", "3": "2025-03-01 08:00"
+        }
+
+    def test_load_table(self, repository):
+        # 全パーティションを1つのテーブルに連結する
+        table = repository.load_table(["book_id", "clock_start"])
+        assert len(table) == 5
+        assert repository.load_table(["id"]).max("id") == 5
+        assert table.aggregate("book_id", "book_id", "count") == {1: 4, 2: 1}
+
+    def test_import_csv(self, repository, tmp_path):
+        # 単一ファイルのCSVから未取り込みのIDの行だけを取り込む
+        csv_repository = CsvBaseRepository(CsvConfig(
+            file_name="BookClockLogs.csv",
+            base_path=str(tmp_path),
+            columns=COLUMNS,
+            key_map=KEY_MAP,
+            model_type=BookClockLog
+        ))
+        csv_repository.add([clock(4, "2025-05-01 08:00"), clock(6, "2025-06-01 08:00"), clock(7, "2025-06-02 08:00")])
+        assert repository.import_csv(csv_repository) == 2
+        assert repository.import_csv(csv_repository) == 0
+        assert repository.partitions()[-2] == "2025-06"
+
+
+class TestPartitionedKeyIndex:
+    def test_loads_only_checked_partitions(self, repository):
+        # 確認したキーのパーティションだけ既存キーを読み込む
+        index = PartitionedKeyIndex(repository, KEY_COLUMNS, {"book_id": int})
+        assert ("2025-04-20 10:00", "2025-04-20 10:30", 2) in index
+        assert ("2025-04-21 10:00", "2025-04-21 10:30", 2) not in index
+        assert index.loaded_partitions == {"2025-04"}
+
+    def test_add_new_partition(self, repository):
+        # 新しい月のキーを追加しても既存のキーと混ざらない
+        index = PartitionedKeyIndex(repository, KEY_COLUMNS, {"book_id": int})
+        key = index.key_of({"clock_start": "2025-07-01 08:00", "clock_end": "2025-07-01 08:30", "book_id": 1})
+        index.add(key)
+        assert key in index
+        assert ("2025-03-31 23:00", "2025-03-31 23:30", 1) in index
+        assert index.loaded_partitions == {"2025-07", "2025-03"}
@@ -0,0 +1,85 @@
+import sqlite3
+import pytest
+from repositories.csv_base_repository import CsvBaseRepository, CsvConfig
+from repositories.sqlite_base_repository import SqliteBaseRepository, SqliteConfig
+from models.org import BookClockLog
+
+# SqliteBaseRepositoryのテスト
+
+COLUMNS = ["id", "book_id", "clock_start", "clock_end", "duration_min"]
+KEY_MAP = {column: column for column in COLUMNS}
+COLUMN_TYPES = {"id": "int", "book_id": "int", "clock_start": "datetime", "clock_end": "datetime", "duration_min": "int"}
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SqliteBaseRepository(SqliteConfig(
+        file_name="org.sqlite3",
+        base_path=str(tmp_path / "db"),
+        table_name="book_clock_logs",
+        columns=COLUMNS,
+        key_map=KEY_MAP,
+        model_type=BookClockLog,
+        key_columns=["clock_start", "clock_end", "book_id"],
+        column_types=COLUMN_TYPES
+    ))
+    yield repository
+    repository.close()
+
+
+def clock(id_, book_id=1, clock_start="2025-04-10 10:00", clock_end="2025-04-10 10:30"):
+    return BookClockLog(id=id_, book_id=book_id, clock_start=clock_start, clock_end=clock_end, duration_min=30)
+
+
+class TestSqliteBaseRepository:
+    def test_add_and_find(self, repository):
+        # 追加したデータをIDで取得できる
+        repository.add([clock(1), clock(2, book_id=2, clock_end=None)])
+        assert repository.find_by_id(2) == {
+            "id": 2, "book_id": 2, "clock_start": "2025-04-10 10:00", "clock_end": None, "duration_min": 30
+        }
+        assert repository.find_by_id(3) is None
+        assert [row["id"] for row in repository.all()] == [1, 2]
+        assert repository.find_next_id() == 3
+
+    def test_find_keys(self, repository):
+        # CSVリポジトリと同じ形式の複合キーを返す
+        repository.add([clock(1), clock(2, book_id=2, clock_end=None)])
+        assert repository.find_keys() == {
+            ("2025-04-10 10:00", "2025-04-10 10:30", "1"): 1,
+            ("2025-04-10 10:00", None, "2"): 2,
+        }
+
+    def test_delete_by_id(self, repository):
+        # IDを指定して削除できる
+        repository.add([clock(1), clock(2)])
+        repository.delete_by_id(1)
+        assert list(repository.find_by_ids([1, 2])) == [2]
+        assert repository.find_next_id() == 3
+
+    def test_wal_and_indexes(self, repository, tmp_path):
+        # WALモードで開き、複合キーにインデックスを張る
+        repository.add([clock(1)])
+        conn = sqlite3.connect(tmp_path / "db" / "org.sqlite3")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list('book_clock_logs')")]
+        assert "idx_book_clock_logs_keys" in indexes
+        conn.close()
+
+    def test_load_table(self, repository):
+        # 型付きのテーブルとして読み込める
+        repository.add([clock(1, book_id=1), clock(2, book_id=1, clock_start="2025-04-11 10:00"), clock(3, book_id=2)])
+        table = repository.load_table(["book_id", "duration_min"])
+        assert table.aggregate("book_id", "duration_min", "sum") == {1: 60, 2: 30}
+
+    def test_import_csv(self, repository, tmp_path):
+        # 既存のCSVを取り込み、再実行しても重複しない
+        csv_repository = CsvBaseRepository(CsvConfig(
+            file_name="BookClockLogs.csv", base_path=str(tmp_path), columns=COLUMNS,
+            key_map=KEY_MAP, model_type=BookClockLog, key_columns=["clock_start", "clock_end", "book_id"]
+        ))
+        csv_repository.add([clock(1), clock(2, clock_end=None)])
+        assert repository.import_csv(csv_repository) == 2
+        assert repository.import_csv(csv_repository) == 2
+        assert repository.find_keys() == csv_repository.find_keys()
+        assert repository.find_by_id(1)["duration_min"] == 30
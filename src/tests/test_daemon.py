@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock, patch
+import daemon
+
+# daemonのテスト
+
+
+class TestDaemon:
+    def test_sync_only_on_changes(self):
+        # 起動時に1回同期し、以降は監視対象のファイルが変更された場合だけ同期する
+        watcher = MagicMock()
+        watcher.wait.side_effect = [set(), {"/opt/org/journal.org"}, set(), KeyboardInterrupt]
+        with patch.object(daemon, "FileWatcher", return_value=watcher), \
+                patch.object(daemon, "initialize_logger"), \
+                patch.object(daemon.OrgController, "org_file_paths", return_value=["/opt/org/journal.org"]), \
+                patch.object(daemon, "sync") as sync:
+            daemon.main()
+        assert sync.call_count == 2
+        assert watcher.wait.call_count == 4
+        watcher.close.assert_called_once()
+
+    def test_sync_failure_keeps_running(self):
+        # 同期に失敗してもデーモンは止めない
+        with patch.object(daemon.OrgController, "sync_books", side_effect=RuntimeError("boom")), \
+                patch.object(daemon, "error_stack_trace") as error_stack_trace:
+            daemon.sync()
+        error_stack_trace.assert_called_once()